@@ -0,0 +1,4 @@
+"""Micro-benchmarks for indicator and portfolio analytics code.
+
+Run ``python -m benchmarks --help`` for options.
+"""
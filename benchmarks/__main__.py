@@ -0,0 +1,70 @@
+"""Command line entry point: ``python -m benchmarks``."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from . import suite
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark indicators and portfolio analytics.",
+    )
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="only the smaller input sizes (up to 10k points, 50 holdings)",
+    )
+    parser.add_argument("-k", "--filter", help="run cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case")
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=suite.BASELINE_PATH,
+        help="baseline file to save or compare against",
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="write results as the new baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=suite.DEFAULT_THRESHOLD,
+        help="allowed slowdown or memory growth, e.g. 0.25 for 25%%",
+    )
+    parser.add_argument("--output", type=Path, help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        cases = suite.build_cases(suite.SERIES_SIZES[:2], suite.PORTFOLIO_SIZES[:2])
+    else:
+        cases = suite.build_cases()
+    if args.filter:
+        cases = [c for c in cases if args.filter in c.name]
+
+    results = suite.run(cases, repeat=args.repeat)
+    print(suite.format_table(results))
+    if args.output:
+        suite.save(results, args.output)
+    if args.save:
+        suite.save(results, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save to create one")
+        return 0
+    regressions = suite.compare(results, suite.load(args.baseline), args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        print("\n".join(f"  {r}" for r in regressions))
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""Tick latency and upstream load: REST polling versus a pushed feed.
+
+Run ``python -m benchmarks.feeds``. Both modes watch the same simulated
+market, whose price changes every ``--trade-interval`` seconds. Polling
+fetches a quote every ``--poll-interval`` seconds. Feed mode subscribes to
+:class:`stockapp.feeds.SimulatedFeedServer`. Latency is measured from the
+moment a price appeared upstream to the moment a subscriber received it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from stockapp.feeds import SimulatedFeedServer, WebSocketFeed
+
+
+def _app(poll_interval: float) -> Any:
+    from stockapp import realtime
+
+    from .suite import create_bench_app
+
+    app = create_bench_app(PRICE_STREAM_INTERVAL=poll_interval, ADAPTIVE_POLLING=False)
+    realtime.load_indicator_set = lambda symbol: None
+    return app
+
+
+class PolledMarket:
+    """REST quotes for a market whose price moves every ``interval`` seconds."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.calls = 0
+        # (symbol, price) -> when that price last appeared
+        self.appeared: dict[tuple[str, float], float] = {}
+
+    def __call__(self, symbol: str, provider: str | None = None) -> tuple:
+        self.calls += 1
+        bucket = int(time.time() / self.interval)
+        price = round(100 + (bucket * 7919 + sum(map(ord, symbol))) % 1000 / 100, 2)
+        self.appeared[(symbol, price)] = bucket * self.interval
+        return price, 5.0
+
+    def changes(self, symbol: str, first: float, last: float) -> list[float]:
+        start = int(first / self.interval) + 1
+        end = int(last / self.interval)
+        return [k * self.interval for k in range(start, end + 1)]
+
+
+class TimedFeed(WebSocketFeed):
+    """A feed that remembers when each pushed price was traded upstream."""
+
+    def __init__(self, url: str) -> None:
+        super().__init__(url)
+        self.appeared: dict[tuple[str, float], float] = {}
+        self.trades: dict[str, list[float]] = {}
+
+    def start(self, on_trade) -> None:
+        def timed(symbol: str, price: float, ts: int | None) -> None:
+            traded = (ts or 0) / 1000
+            self.appeared[(symbol, price)] = traded
+            self.trades.setdefault(symbol, []).append(traded)
+            on_trade(symbol, price, ts)
+
+        super().start(timed)
+
+    def changes(self, symbol: str, first: float, last: float) -> list[float]:
+        return [t for t in self.trades.get(symbol, []) if first < t <= last]
+
+
+def _collect(
+    hub: Any, symbols: list[str], seconds: float, source: Any
+) -> tuple[int, list[float]]:
+    """Follow ``symbols`` for ``seconds``; return tick count and latencies.
+
+    A latency is the time from an upstream price change to the first tick
+    showing that price or a newer one. Changes skipped over by a later
+    tick count as delivered with it.
+    """
+    seen: dict[str, list[tuple[float, float]]] = {s: [] for s in symbols}
+
+    def read(symbol: str) -> None:
+        with hub.subscribe(symbol) as sub:
+            sub.get(timeout=10)  # the starting snapshot is not a live tick
+            end = time.monotonic() + seconds
+            while time.monotonic() < end:
+                tick = sub.get(timeout=0.1)
+                if tick is None or tick.get("price") is None:
+                    continue
+                appeared = source.appeared.get((symbol, tick["price"]))
+                if appeared is not None:
+                    seen[symbol].append((appeared, time.time()))
+
+    threads = [threading.Thread(target=read, args=(s,)) for s in symbols]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    delays = []
+    for symbol, receipts in seen.items():
+        for (before, _), (appeared, received) in zip(receipts, receipts[1:]):
+            changes = source.changes(symbol, before, appeared)
+            delays += [received - c for c in changes]
+    return sum(len(r) for r in seen.values()), sorted(delays)
+
+
+def _summary(
+    mode: str, received: int, delays: list[float], calls: int, seconds: float
+) -> dict[str, Any]:
+    def pct(q: float) -> float:
+        if not delays:
+            return float("nan")
+        return delays[min(len(delays) - 1, int(q * len(delays)))] * 1000
+
+    return {
+        "mode": mode,
+        "ticks": received,
+        "ticks_per_second": received / seconds,
+        "latency_p50_ms": pct(0.5),
+        "latency_p99_ms": pct(0.99),
+        "upstream_requests": calls,
+    }
+
+
+def run(
+    symbols: int = 20,
+    seconds: float = 3.0,
+    poll_interval: float = 1.0,
+    trade_interval: float = 0.05,
+) -> list[dict[str, Any]]:
+    from stockapp import realtime
+
+    names = [f"S{i:03d}" for i in range(symbols)]
+    app = _app(poll_interval)
+
+    market = PolledMarket(trade_interval)
+    realtime.get_realtime_data = market
+    polled = realtime.PriceHub(app)
+    received, delays = _collect(polled, names, seconds, market)
+    results = [_summary("poll", received, delays, market.calls, seconds)]
+
+    # REST is only used for the starting snapshot in feed mode
+    snapshots = PolledMarket(trade_interval)
+    realtime.get_realtime_data = snapshots
+    with SimulatedFeedServer(interval=trade_interval) as server:
+        feed = TimedFeed(server.url)
+        pushed = realtime.PriceHub(app, feed=feed)
+        received, delays = _collect(pushed, names, seconds, feed)
+        feed.stop()
+    results.append(_summary("feed", received, delays, snapshots.calls, seconds))
+    return results
+
+
+def format_report(results: list[dict[str, Any]]) -> str:
+    keys = [k for k in results[0] if k != "mode"]
+    lines = [f"{'':<20}" + "".join(f"{r['mode']:>12}" for r in results)]
+    for key in keys:
+        cells = "".join(
+            f"{r[key]:>12.1f}" if isinstance(r[key], float) else f"{r[key]:>12}"
+            for r in results
+        )
+        lines.append(f"{key:<20}{cells}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.feeds",
+        description="Compare tick latency of REST polling and a pushed feed.",
+    )
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--trade-interval", type=float, default=0.05)
+    parser.add_argument("--output", type=Path, help="also write results as JSON")
+    args = parser.parse_args(argv)
+    # the simulated feed server would log every connection
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    results = run(args.symbols, args.seconds, args.poll_interval, args.trade_interval)
+    print(format_report(results))
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2, sort_keys=True)
+            fh.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""Concurrent ``/stream_price`` connections served by one gevent process.
+
+Run ``python -m benchmarks.streams --connections 2000``. The app is served
+by gevent's WSGI server, the same cooperative model as the ``gevent``
+gunicorn worker, and every client is a greenlet in the same process reading
+SSE frames. Quotes come from a synthetic random walk instead of an upstream
+provider. Since clients and server share one CPU, the reported figures are a
+lower bound for a dedicated worker.
+"""
+
+from gevent import monkey
+
+monkey.patch_all()
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import random  # noqa: E402
+import resource  # noqa: E402
+import socket  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+from pathlib import Path  # noqa: E402
+from typing import Any  # noqa: E402
+
+import gevent  # noqa: E402
+from gevent.pywsgi import WSGIServer  # noqa: E402
+
+
+class QuoteSource:
+    """Random-walk quotes that count how often upstream would be called."""
+
+    def __init__(self, seed: int = 0) -> None:
+        self.rng = random.Random(seed)
+        self.prices: dict[str, float] = {}
+        self.calls = 0
+
+    def __call__(self, symbol: str, provider: str | None = None) -> tuple:
+        self.calls += 1
+        price = self.prices.get(symbol, 100.0) * (1 + self.rng.gauss(0, 0.002))
+        self.prices[symbol] = round(price, 2)
+        return self.prices[symbol], 5.0
+
+
+def build_app(interval: float, quotes: QuoteSource) -> Any:
+    from stockapp import realtime
+
+    from .suite import create_bench_app
+
+    app = create_bench_app(
+        PRICE_STREAM_INTERVAL=interval,
+        ADAPTIVE_POLLING=False,
+        STREAM_HEARTBEAT_INTERVAL=interval,
+    )
+    realtime.get_realtime_data = quotes
+    realtime.load_indicator_set = lambda symbol: None
+    return app
+
+
+def _raise_fd_limit(needed: int) -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        limit = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (limit, hard))
+
+
+class Client:
+    """One SSE connection that reads ``frames`` events and disconnects."""
+
+    def __init__(self, port: int, symbol: str, frames: int) -> None:
+        self.port = port
+        self.symbol = symbol
+        self.frames = frames
+        self.first: float | None = None
+        self.received = 0
+        self.error: str | None = None
+
+    def run(self, stats: dict[str, int]) -> None:
+        started = time.perf_counter()
+        try:
+            sock = socket.create_connection(("127.0.0.1", self.port), timeout=60)
+        except OSError as exc:
+            self.error = str(exc)
+            return
+        stats["open"] += 1
+        stats["peak"] = max(stats["peak"], stats["open"])
+        try:
+            sock.sendall(
+                f"GET /stream_price?symbol={self.symbol} HTTP/1.1\r\n"
+                "Host: bench\r\n\r\n".encode()
+            )
+            buffer = b""
+            while self.received < self.frames:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    self.error = "closed"
+                    break
+                buffer += chunk
+                # heartbeats are comments, so count only data events
+                self.received = buffer.count(b"\ndata: ") + buffer.startswith(b"data: ")
+                if self.received and self.first is None:
+                    self.first = time.perf_counter() - started
+        except OSError as exc:
+            self.error = str(exc)
+        finally:
+            stats["open"] -= 1
+            sock.close()
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run(
+    connections: int = 1000,
+    symbols: int = 50,
+    frames: int = 3,
+    interval: float = 1.0,
+) -> dict[str, Any]:
+    """Open ``connections`` streams over ``symbols`` tickers at once."""
+    _raise_fd_limit(connections * 2 + 256)
+    quotes = QuoteSource()
+    app = build_app(interval, quotes)
+    server = WSGIServer(("127.0.0.1", 0), app, log=None, error_log=None)
+    server.start()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    stats = {"open": 0, "peak": 0}
+    clients = [
+        Client(server.server_port, f"S{i % symbols:03d}", frames)
+        for i in range(connections)
+    ]
+    started = time.perf_counter()
+    gevent.joinall([gevent.spawn(c.run, stats) for c in clients])
+    elapsed = time.perf_counter() - started
+    server.stop(timeout=1)
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    first = [c.first for c in clients if c.first is not None]
+    completed = sum(c.received >= frames for c in clients)
+    return {
+        "connections": connections,
+        "symbols": symbols,
+        "completed": completed,
+        "errors": sum(c.error is not None for c in clients),
+        "peak_open": stats["peak"],
+        "seconds": elapsed,
+        "frames_per_second": sum(c.received for c in clients) / elapsed,
+        "first_frame_p50_ms": _percentile(first, 0.5) * 1000,
+        "first_frame_p99_ms": _percentile(first, 0.99) * 1000,
+        "upstream_calls": quotes.calls,
+        # ru_maxrss is in KiB on Linux
+        "rss_growth_mib": (rss_after - rss_before) / 1024,
+    }
+
+
+def format_report(result: dict[str, Any]) -> str:
+    return "\n".join(
+        (
+            f"{key:<22}{value:>12.1f}"
+            if isinstance(value, float)
+            else f"{key:<22}{value:>12}"
+        )
+        for key, value in result.items()
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.streams",
+        description="Hold many concurrent price streams in one gevent process.",
+    )
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--symbols", type=int, default=50, help="distinct tickers")
+    parser.add_argument(
+        "--frames", type=int, default=3, help="ticks each client reads before leaving"
+    )
+    parser.add_argument(
+        "--interval", type=float, default=1.0, help="PRICE_STREAM_INTERVAL to use"
+    )
+    parser.add_argument("--output", type=Path, help="also write results as JSON")
+    args = parser.parse_args(argv)
+
+    result = run(args.connections, args.symbols, args.frames, args.interval)
+    print(format_report(result))
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(result, fh, indent=2, sort_keys=True)
+            fh.write("\n")
+    return 0 if result["completed"] == result["connections"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""Timing and peak-memory benchmarks for indicators and portfolio analytics.
+
+Each case runs on deterministic synthetic data from :mod:`benchmarks.synthetic`.
+Results are written as JSON and can be saved as a baseline; comparing a run
+against the baseline reports every case that became slower or used more
+memory than the allowed threshold.
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from .synthetic import SyntheticPortfolio, price_series
+
+SERIES_SIZES = (250, 10_000, 100_000, 1_000_000)
+PORTFOLIO_SIZES = (5, 50, 500)
+# Trading days of history behind each portfolio holding
+PORTFOLIO_DAYS = 252
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+# Relative slowdown or memory growth tolerated before a case fails
+DEFAULT_THRESHOLD = 0.25
+# Timings below this are dominated by noise and compared against it instead
+MIN_SECONDS = 0.001
+
+
+class Case:
+    """A function to benchmark with a factory for its arguments."""
+
+    def __init__(
+        self,
+        name: str,
+        size: int,
+        func: Callable[..., Any],
+        setup: Callable[[], tuple],
+    ) -> None:
+        self.name = name
+        self.size = size
+        self.func = func
+        self.setup = setup
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.size}]"
+
+
+@lru_cache(maxsize=None)
+def _series(n: int) -> dict[str, list]:
+    return price_series(n, seed=n)
+
+
+@lru_cache(maxsize=None)
+def _portfolio(holdings: int) -> SyntheticPortfolio:
+    return SyntheticPortfolio(holdings, days=PORTFOLIO_DAYS, seed=holdings)
+
+
+def create_bench_app(**settings: Any) -> Any:
+    """A ``stockapp`` application on an in-memory database.
+
+    Configuration is passed to the app factory rather than through
+    ``os.environ``, so running benchmarks leaves the environment alone.
+    ``settings`` are applied on top.
+    """
+    from stockapp import create_app
+    from stockapp.config import Config
+
+    class BenchmarkConfig(Config):
+        def __init__(self) -> None:
+            super().__init__()
+            self.SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+
+    app = create_app(BenchmarkConfig)
+    app.config.update(settings)
+    return app
+
+
+@lru_cache(maxsize=None)
+def _app() -> Any:
+    return create_bench_app()
+
+
+@contextmanager
+def _request_context() -> Iterator[None]:
+    """Request context for code that reads ``current_user`` or the locale."""
+    with _app().test_request_context():
+        yield
+
+
+def _portfolio_analysis(portfolio: SyntheticPortfolio) -> dict:
+    from stockapp.portfolio.helpers import calculate_portfolio_analysis
+
+    with _request_context():
+        return calculate_portfolio_analysis(
+            portfolio.items,
+            portfolio.stock_data,
+            portfolio.historical_prices,
+            portfolio.news,
+            days=PORTFOLIO_DAYS,
+        )
+
+
+def build_cases(
+    series_sizes: tuple[int, ...] = SERIES_SIZES,
+    portfolio_sizes: tuple[int, ...] = PORTFOLIO_SIZES,
+) -> list[Case]:
+    """Every benchmark case for the given input sizes."""
+    from stockapp.portfolio.helpers import optimize_portfolio
+    from stockapp.utils import (
+        bollinger_bands,
+        calculate_cci,
+        calculate_macd,
+        calculate_rsi,
+        moving_average,
+    )
+
+    cases = []
+    for n in series_sizes:
+
+        def closes(n=n):
+            return (_series(n)["closes"],)
+
+        def hlc(n=n):
+            bars = _series(n)
+            return bars["highs"], bars["lows"], bars["closes"]
+
+        cases += [
+            Case("moving_average", n, lambda c: moving_average(c, 50), closes),
+            Case("calculate_rsi", n, lambda c: calculate_rsi(c, 14), closes),
+            Case("calculate_macd", n, calculate_macd, closes),
+            Case("bollinger_bands", n, lambda c: bollinger_bands(c, 20, 2), closes),
+            Case(
+                "calculate_cci", n, lambda h, low, c: calculate_cci(h, low, c, 20), hlc
+            ),
+        ]
+    for holdings in portfolio_sizes:
+        cases += [
+            Case(
+                "optimize_portfolio",
+                holdings,
+                optimize_portfolio,
+                lambda h=holdings: (_portfolio(h).returns(),),
+            ),
+            Case(
+                "calculate_portfolio_analysis",
+                holdings,
+                _portfolio_analysis,
+                lambda h=holdings: (_portfolio(h),),
+            ),
+        ]
+    return cases
+
+
+def measure(case: Case, repeat: int = 5, budget: float = 2.0) -> dict[str, float]:
+    """Time ``case`` and record its peak traced memory.
+
+    The case runs once to warm up, then up to ``repeat`` times or until
+    ``budget`` seconds have passed. Memory is traced in a separate call
+    because tracing slows execution down.
+    """
+    args = case.setup()
+    case.func(*args)
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < repeat:
+        gc.collect()
+        t0 = time.perf_counter()
+        case.func(*args)
+        timings.append(time.perf_counter() - t0)
+        if time.perf_counter() - started > budget:
+            break
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        case.func(*args)
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return {
+        "best": min(timings),
+        "median": statistics.median(timings),
+        "runs": len(timings),
+        "peak_bytes": max(peak, 0),
+    }
+
+
+def run(cases: list[Case], **kwargs: Any) -> dict[str, Any]:
+    """Measure every case and return results keyed by ``name[size]``."""
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {case.key: measure(case, **kwargs) for case in cases},
+    }
+
+
+def compare(
+    results: dict[str, Any],
+    baseline: dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[str]:
+    """Describe each case that regressed beyond ``threshold`` of the baseline.
+
+    Best-of-runs times are compared since they are the least noisy; cases
+    missing from either side are skipped.
+    """
+    regressions = []
+    for key, now in results["results"].items():
+        before = baseline.get("results", {}).get(key)
+        if before is None:
+            continue
+        limit = max(before["best"], MIN_SECONDS) * (1 + threshold)
+        if now["best"] > limit:
+            regressions.append(
+                f"{key}: {now['best'] * 1000:.2f} ms vs "
+                f"{before['best'] * 1000:.2f} ms baseline"
+            )
+        # small allocations fluctuate with interpreter caches; allow 64 KiB
+        limit = before["peak_bytes"] * (1 + threshold) + 65536
+        if now["peak_bytes"] > limit:
+            regressions.append(
+                f"{key}: peak {now['peak_bytes'] / 1024:.0f} KiB vs "
+                f"{before['peak_bytes'] / 1024:.0f} KiB baseline"
+            )
+    return regressions
+
+
+def load(path: Path) -> dict[str, Any]:
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def save(results: dict[str, Any], path: Path) -> None:
+    with open(path, "w") as fh:
+        json.dump(results, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+
+
+def format_table(results: dict[str, Any]) -> str:
+    lines = [f"{'case':<40}{'best ms':>12}{'median ms':>12}{'peak KiB':>12}"]
+    for key, r in results["results"].items():
+        lines.append(
+            f"{key:<40}{r['best'] * 1000:>12.2f}{r['median'] * 1000:>12.2f}"
+            f"{r['peak_bytes'] / 1024:>12.0f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,77 @@
+"""Deterministic synthetic prices and portfolios for benchmarks."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+SECTORS = ["Technology", "Financials", "Energy", "Health Care", "Utilities"]
+
+
+def price_series(n: int, seed: int = 0) -> dict[str, list]:
+    """Daily bars following a geometric random walk.
+
+    The same ``n`` and ``seed`` always produce the same bars, so timings
+    from different runs are comparable.
+    """
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, n)))
+    spread = closes * rng.uniform(0.002, 0.02, n)
+    start = date(2000, 1, 3)
+    return {
+        "dates": [(start + timedelta(days=i)).isoformat() for i in range(n)],
+        "closes": np.round(closes, 2).tolist(),
+        "highs": np.round(closes + spread, 2).tolist(),
+        "lows": np.round(closes - spread, 2).tolist(),
+        "volumes": rng.integers(10_000, 1_000_000, n).tolist(),
+    }
+
+
+class SyntheticPortfolio:
+    """Holdings with price, history and news lookups shaped like the app's.
+
+    The lookup methods match the callables that
+    :func:`stockapp.portfolio.helpers.calculate_portfolio_analysis` takes,
+    so analysis can run without network access or a database.
+    """
+
+    def __init__(self, holdings: int, days: int = 30, seed: int = 0) -> None:
+        rng = np.random.default_rng(seed)
+        self.days = days
+        self.symbols = [f"S{i:03d}" for i in range(holdings)]
+        self.items = [
+            SimpleNamespace(
+                symbol=sym,
+                quantity=float(rng.integers(1, 500)),
+                price_paid=round(float(rng.uniform(10, 300)), 2),
+            )
+            for sym in self.symbols
+        ]
+        self.history = {
+            sym: price_series(days, seed=seed * 100_003 + i)
+            for i, sym in enumerate(self.symbols + ["SPY"])
+        }
+        self.sectors = {
+            sym: SECTORS[i % len(SECTORS)] for i, sym in enumerate(self.symbols)
+        }
+
+    def stock_data(self, symbol: str) -> tuple:
+        price = self.history[symbol]["closes"][-1]
+        return (symbol, None, self.sectors[symbol], None, "NYSE", "USD", price)
+
+    def historical_prices(self, symbol: str, days: int = 30):
+        bars = self.history[symbol]
+        return bars["dates"][-days:], bars["closes"][-days:]
+
+    def news(self, symbol: str, limit: int = 3) -> list:
+        return []
+
+    def returns(self) -> dict[str, list[float]]:
+        """Daily returns per holding, as passed to ``optimize_portfolio``."""
+        out = {}
+        for sym in self.symbols:
+            closes = np.asarray(self.history[sym]["closes"])
+            out[sym] = (closes[1:] / closes[:-1] - 1).tolist()
+        return out
@@ -0,0 +1,36 @@
+"""Gunicorn settings, read by ``gunicorn -c gunicorn.conf.py app:app``.
+
+Price streams (``/stream_price`` and ``/ws/price``) stay open for as long
+as a dashboard tab does. With the default ``sync`` worker each one holds a
+whole worker, so the default here is ``gevent``: every connection becomes
+a greenlet that yields while it waits for the next tick, and one worker
+process serves thousands of streams.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gevent")
+# cooperative workers multiplex connections, so a few processes suffice
+default_workers = (
+    multiprocessing.cpu_count() * 2 + 1
+    if worker_class == "sync"
+    else multiprocessing.cpu_count()
+)
+workers = int(os.environ.get("GUNICORN_WORKERS", default_workers))
+# simultaneous connections per gevent worker
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 2000))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+keepalive = 5
+
+
+def post_fork(server, worker):
+    """Make psycopg2 cooperative under gevent when psycogreen is installed."""
+    if worker_class != "gevent":
+        return
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        return
+    patch_psycopg()
@@ -0,0 +1,44 @@
+"""Add persistent fundamentals table"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "fundamentals",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "symbol", sa.String(length=10), nullable=False, unique=True, index=True
+        ),
+        sa.Column("name", sa.String(length=200), nullable=True),
+        sa.Column("logo_url", sa.String(length=300), nullable=True),
+        sa.Column("sector", sa.String(length=100), nullable=True),
+        sa.Column("industry", sa.String(length=100), nullable=True),
+        sa.Column("exchange", sa.String(length=50), nullable=True),
+        sa.Column("currency", sa.String(length=10), nullable=True),
+        sa.Column("debt_to_equity", sa.Float(), nullable=True),
+        sa.Column("pb_ratio", sa.Float(), nullable=True),
+        sa.Column("roe", sa.Float(), nullable=True),
+        sa.Column("roa", sa.Float(), nullable=True),
+        sa.Column("profit_margin", sa.Float(), nullable=True),
+        sa.Column("analyst_rating", sa.String(length=50), nullable=True),
+        sa.Column("dividend_yield", sa.Float(), nullable=True),
+        sa.Column("payout_ratio", sa.Float(), nullable=True),
+        sa.Column("earnings_growth", sa.Float(), nullable=True),
+        sa.Column("price_to_sales", sa.Float(), nullable=True),
+        sa.Column("ev_to_ebitda", sa.Float(), nullable=True),
+        sa.Column("price_to_fcf", sa.Float(), nullable=True),
+        sa.Column("fcf_per_share", sa.Float(), nullable=True),
+        sa.Column("current_ratio", sa.Float(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table("fundamentals")
@@ -0,0 +1,26 @@
+"""Add alert state table for alert de-duplication"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "alert_state",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("user.id"), nullable=False),
+        sa.Column("symbol", sa.String(length=10), nullable=False),
+        sa.Column("condition", sa.String(length=32), nullable=False),
+        sa.Column("active", sa.Boolean(), nullable=False),
+        sa.Column("last_fired", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("user_id", "symbol", "condition"),
+    )
+
+
+def downgrade():
+    op.drop_table("alert_state")
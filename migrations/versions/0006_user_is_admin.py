@@ -0,0 +1,17 @@
+"""Add admin flag to users"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("user", sa.Column("is_admin", sa.Boolean(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("user", "is_admin")
@@ -18,6 +18,9 @@ from .api import api_bp
 from .brokerage_routes import broker_bp
 from .screener import screener_bp
 from .tasks import init_celery
+from .realtime import PriceHub
+from .activity import ActivityRecorder
+from .alert_engine import realtime_alerts_command
 
 
 def create_app(config_class=None):
@@ -46,6 +49,9 @@ def create_app(config_class=None):
     login_manager.login_view = "auth.login"
     csrf.init_app(app)
     sock.init_app(app)
+    PriceHub(app)
+    ActivityRecorder(app)
+    app.cli.add_command(realtime_alerts_command)
     babel.init_app(app)
     oauth.init_app(app)
 
@@ -0,0 +1,367 @@
+"""Write-behind recording of stock searches and lookups.
+
+Every signed-in lookup used to commit a ``History`` row and a
+``StockRecord`` row inside the request. :class:`ActivityRecorder` queues
+the rows instead. A background flusher writes them with one bulk insert
+per table once ``ACTIVITY_FLUSH_SIZE`` rows are waiting or every
+``ACTIVITY_FLUSH_INTERVAL`` seconds. :meth:`ActivityRecorder.recent_history`
+merges queued searches with stored ones, so a search shows up in the
+user's history straight away.
+
+The queue is held in process memory by default and flushed again at exit.
+With ``ACTIVITY_BUFFER=redis`` it is a Redis list shared by every worker,
+which the ``flush_activity_task`` Celery task also drains. Rows are
+deleted from Redis only after they are committed, so queued rows outlive a
+crashed worker. ``ACTIVITY_BUFFER=off`` writes each row in the
+request as before.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable
+
+from flask import Flask, current_app
+from sqlalchemy import insert, text
+
+from . import utils
+from .extensions import db
+from .models import History, StockRecord
+
+logger = logging.getLogger(__name__)
+
+MODELS = {"history": History, "record": StockRecord}
+
+
+class MemoryBuffer:
+    """Queued rows in this process."""
+
+    def __init__(self) -> None:
+        self._rows: deque[dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+
+    def push(self, row: dict[str, Any]) -> int:
+        with self._lock:
+            self._rows.append(row)
+            return len(self._rows)
+
+    def drain(self, limit: int) -> list[dict[str, Any]]:
+        with self._lock:
+            return [self._rows.popleft() for _ in range(min(limit, len(self._rows)))]
+
+    def ack(self) -> None:
+        """Nothing to confirm: drained rows are already out of the queue."""
+
+    def requeue(self, rows: list[dict[str, Any]]) -> None:
+        with self._lock:
+            self._rows.extendleft(reversed(rows))
+
+    def pending(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return list(self._rows)
+
+    def remove(self, match: Callable[[dict[str, Any]], bool]) -> None:
+        with self._lock:
+            self._rows = deque(row for row in self._rows if not match(row))
+
+
+class RedisBuffer:
+    """Queued rows in a Redis list shared between processes.
+
+    :meth:`drain` moves a batch onto a processing list of this worker and
+    :meth:`ack` deletes it once the rows are written, so a batch being
+    written when a worker dies stays in Redis. Each drain first returns
+    the batches of workers whose lease has lapsed to the front of the
+    queue. A row can therefore be written twice but is not lost.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        key: str = "activity:pending",
+        worker_id: str | None = None,
+        lease: int = 300,
+    ) -> None:
+        self.client = client
+        self.key = key
+        self.worker_id = worker_id or (
+            f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        )
+        # seconds a drained batch may take to be written before other
+        # workers treat it as abandoned
+        self.lease = lease
+        self.workers = f"{key}:workers"
+        self.processing = self._processing(self.worker_id)
+
+    def _processing(self, worker_id: str) -> str:
+        return f"{self.key}:processing:{worker_id}"
+
+    def _lease(self, worker_id: str) -> str:
+        return f"{self.key}:lease:{worker_id}"
+
+    def push(self, row: dict[str, Any]) -> int:
+        return self.client.rpush(self.key, json.dumps(row))
+
+    def drain(self, limit: int) -> list[dict[str, Any]]:
+        self._reclaim()
+        # a batch drained but never acknowledged goes back first
+        self._restore(self.processing)
+        pipe = self.client.pipeline()
+        pipe.sadd(self.workers, self.worker_id)
+        pipe.set(self._lease(self.worker_id), 1, ex=self.lease)
+        for _ in range(limit):
+            pipe.lmove(self.key, self.processing, "LEFT", "RIGHT")
+        raw = pipe.execute()[2:]
+        return [json.loads(r) for r in raw if r is not None]
+
+    def ack(self) -> None:
+        """Forget the drained batch now that it has been written."""
+        self.client.delete(self.processing)
+
+    def requeue(self, rows: list[dict[str, Any]]) -> None:
+        # ``rows`` is the drained batch, still held on the processing list
+        self._restore(self.processing)
+
+    def pending(self) -> list[dict[str, Any]]:
+        return [json.loads(r) for r in self.client.lrange(self.key, 0, -1)]
+
+    def remove(self, match: Callable[[dict[str, Any]], bool]) -> None:
+        for raw in self.client.lrange(self.key, 0, -1):
+            if match(json.loads(raw)):
+                self.client.lrem(self.key, 1, raw)
+
+    def _restore(self, processing: str) -> None:
+        """Move the rows on ``processing`` back to the front of the queue."""
+        while self.client.lmove(processing, self.key, "RIGHT", "LEFT") is not None:
+            pass
+
+    def _reclaim(self) -> None:
+        """Requeue batches held by workers whose lease has lapsed."""
+        for member in self.client.smembers(self.workers):
+            worker_id = member.decode() if isinstance(member, bytes) else member
+            if worker_id == self.worker_id or self.client.exists(
+                self._lease(worker_id)
+            ):
+                continue
+            self._restore(self._processing(worker_id))
+            self.client.srem(self.workers, worker_id)
+
+
+class ActivityRecorder:
+    """Queue ``History`` and ``StockRecord`` rows and insert them in bulk."""
+
+    def __init__(
+        self, app: Flask | None = None, buffer: MemoryBuffer | RedisBuffer | None = None
+    ) -> None:
+        self.app: Flask | None = None
+        self.buffer = buffer
+        self.flush_size = 100
+        self.interval = 5.0
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        # one flush at a time, as a Redis buffer holds one drained batch
+        self._flushing = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        self.app = app
+        app.extensions["activity"] = self
+        self.flush_size = app.config.get("ACTIVITY_FLUSH_SIZE", 100)
+        self.interval = app.config.get("ACTIVITY_FLUSH_INTERVAL", 5.0)
+        mode = app.config.get("ACTIVITY_BUFFER", "memory")
+        if self.buffer is None and mode == "redis":
+            if utils._redis is not None:
+                self.buffer = RedisBuffer(utils._redis)
+            else:
+                logger.warning("ACTIVITY_BUFFER=redis needs REDIS_URL; using memory")
+                mode = "memory"
+        if self.buffer is None and mode == "memory":
+            self.buffer = MemoryBuffer()
+        if isinstance(self.buffer, MemoryBuffer):
+            atexit.register(self._flush_at_exit)
+
+    def record_search(self, user_id: int, symbol: str) -> None:
+        """Queue a ``History`` row for a symbol the user looked up."""
+        self._add("history", {"user_id": user_id, "symbol": symbol})
+
+    def record_lookup(
+        self,
+        user_id: int,
+        symbol: str,
+        price: float | None,
+        eps: float | None,
+        pe_ratio: float | None,
+    ) -> None:
+        """Queue a ``StockRecord`` row with the values the user was shown."""
+        self._add(
+            "record",
+            {
+                "user_id": user_id,
+                "symbol": symbol,
+                "price": price,
+                "eps": eps,
+                "pe_ratio": pe_ratio,
+            },
+        )
+
+    def _add(self, kind: str, row: dict[str, Any]) -> None:
+        problem = _invalid(kind, row)
+        if problem:
+            logger.warning(
+                "Not recording %s for user %s: %s", kind, row["user_id"], problem
+            )
+            return
+        row["timestamp"] = datetime.utcnow().isoformat()
+        if self.buffer is None:
+            db.session.add(MODELS[kind](**_values(row)))
+            db.session.commit()
+            return
+        if self.buffer.push({"kind": kind, **row}) >= self.flush_size:
+            self._wake.set()
+        self._start()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="activity-flush", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                with self.app.app_context():
+                    self.flush()
+            except Exception:
+                logger.exception("Writing queued activity failed; will retry")
+
+    def _flush_at_exit(self) -> None:
+        try:
+            with self.app.app_context():
+                self.flush()
+        except Exception:
+            logger.exception("Queued activity lost at exit")
+
+    def flush(self) -> int:
+        """Insert every queued row now and return how many were written.
+
+        When a batch fails its rows are retried one at a time, so a row the
+        database rejects cannot hold back the others. Rejected rows are
+        logged and dropped. If no row can be written and the database does
+        not answer, the batch is put back at the front of the queue and the
+        error is raised.
+        """
+        if self.buffer is None:
+            return 0
+        with self._flushing:
+            return self._flush()
+
+    def _flush(self) -> int:
+        written = 0
+        while True:
+            rows = self.buffer.drain(self.flush_size)
+            if not rows:
+                return written
+            try:
+                _insert(rows)
+                written += len(rows)
+                self.buffer.ack()
+                continue
+            except Exception:
+                logger.warning("Bulk write of %d activity rows failed", len(rows))
+            failed = []
+            for row in rows:
+                try:
+                    _insert([row])
+                except Exception as exc:
+                    failed.append((row, exc))
+            written += len(rows) - len(failed)
+            if len(failed) == len(rows) and not _database_available():
+                self.buffer.requeue(rows)
+                raise failed[-1][1]
+            self.buffer.ack()
+            for row, exc in failed:
+                logger.error("Dropping queued %s row %r: %s", row["kind"], row, exc)
+
+    def discard(self, kind: str, user_id: int) -> None:
+        """Drop queued rows of ``kind`` for a user clearing that data."""
+        if self.buffer is not None:
+            self.buffer.remove(
+                lambda row: row["kind"] == kind and row["user_id"] == user_id
+            )
+
+    def recent_history(self, user_id: int, limit: int = 10) -> list[str]:
+        """The user's latest searched symbols, newest first, queued ones included."""
+        entries = [
+            (h.timestamp, h.symbol)
+            for h in History.query.filter_by(user_id=user_id)
+            .order_by(History.timestamp.desc())
+            .limit(limit)
+        ]
+        if self.buffer is not None:
+            entries += [
+                (datetime.fromisoformat(row["timestamp"]), row["symbol"])
+                for row in self.buffer.pending()
+                if row["kind"] == "history" and row["user_id"] == user_id
+            ]
+        entries.sort(key=lambda entry: entry[0], reverse=True)
+        return [symbol for _timestamp, symbol in entries[:limit]]
+
+
+def _invalid(kind: str, row: dict[str, Any]) -> str | None:
+    """Why ``row`` cannot be stored in the table for ``kind``, if it cannot."""
+    for column in MODELS[kind].__table__.columns:
+        length = getattr(column.type, "length", None)
+        value = row.get(column.name)
+        if length and isinstance(value, str) and len(value) > length:
+            return f"{column.name} is longer than {length} characters"
+    return None
+
+
+def _insert(rows: list[dict[str, Any]]) -> None:
+    """Bulk insert queued ``rows`` and commit, rolling back on failure."""
+    by_kind: dict[str, list[dict[str, Any]]] = {}
+    for row in rows:
+        by_kind.setdefault(row["kind"], []).append(_values(row))
+    try:
+        for kind, values in by_kind.items():
+            db.session.execute(insert(MODELS[kind]), values)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def _database_available() -> bool:
+    try:
+        db.session.execute(text("SELECT 1"))
+        return True
+    except Exception:
+        return False
+    finally:
+        db.session.rollback()
+
+
+def _values(row: dict[str, Any]) -> dict[str, Any]:
+    """Column values of a queued row."""
+    values = {k: v for k, v in row.items() if k != "kind"}
+    values["timestamp"] = datetime.fromisoformat(values["timestamp"])
+    return values
+
+
+def get_activity_recorder() -> ActivityRecorder:
+    """The :class:`ActivityRecorder` of the current application."""
+    return current_app.extensions["activity"]
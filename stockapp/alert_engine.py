@@ -0,0 +1,262 @@
+"""Evaluate watchlist thresholds against realtime ticks.
+
+``check_watchlists_task`` re-scans every watchlist on a cron schedule, so
+an alert can lag a price move by an hour. :class:`AlertEngine` instead
+subscribes to the price hub for every symbol that has a threshold and,
+on each tick, looks up only the thresholds the value moved across. Alerts
+fire on the upward crossing, within one tick of it, and go through
+:func:`~stockapp.alert_state.should_alert` so a condition already reported
+by a page view or the scheduled task is not reported again. Debt/Equity is a
+fundamental that does not move with the price and custom rules need
+historical data, so both remain with the scheduled task.
+
+Run it as a long-lived process with ``flask realtime-alerts``.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from bisect import bisect_left, insort
+from typing import Any, Iterable
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from .alert_state import should_alert
+from .extensions import db
+from .models import Alert, User, WatchlistItem
+from .realtime import COALESCE, PriceHub, SendQueue, Subscription, get_price_hub
+from .utils import ALERT_PE_THRESHOLD, get_historical_prices, latest_indicators
+
+logger = logging.getLogger(__name__)
+
+# condition -> message template; ``value`` exceeded ``threshold``
+MESSAGES = {
+    "pe": "{symbol} P/E ratio {value} exceeds threshold {threshold}",
+    "rsi": "{symbol} RSI {value} exceeds threshold {threshold}",
+    "ma": "{symbol} price deviation {value}% exceeds {threshold}% from 50d MA",
+}
+
+
+class ThresholdIndex:
+    """Sorted thresholds per ``(symbol, condition)``.
+
+    A move of a value from ``before`` to ``after`` crosses exactly the
+    thresholds in ``[before, after)``, found with two binary searches
+    instead of checking every watchlist item.
+    """
+
+    def __init__(self) -> None:
+        self._levels: dict[tuple[str, str], list[tuple[float, int, int]]] = {}
+        # (symbol, condition, user_id) -> the user's lowest threshold
+        self._lowest: dict[tuple[str, str, int], float] = {}
+
+    @classmethod
+    def from_items(cls, items: Iterable[WatchlistItem]) -> "ThresholdIndex":
+        index = cls()
+        for item in items:
+            index.add(item.symbol, "pe", item.pe_threshold or ALERT_PE_THRESHOLD, item)
+            if item.rsi_threshold is not None:
+                index.add(item.symbol, "rsi", item.rsi_threshold, item)
+            if item.ma_threshold is not None:
+                index.add(item.symbol, "ma", item.ma_threshold, item)
+        return index
+
+    def add(
+        self, symbol: str, condition: str, threshold: float, item: WatchlistItem
+    ) -> None:
+        threshold = float(threshold)
+        levels = self._levels.setdefault((symbol, condition), [])
+        insort(levels, (threshold, item.id, item.user_id))
+        key = (symbol, condition, item.user_id)
+        self._lowest[key] = min(threshold, self._lowest.get(key, threshold))
+
+    def lowest(self, symbol: str, condition: str, user_id: int) -> float | None:
+        """The user's lowest threshold; their condition holds above it."""
+        return self._lowest.get((symbol, condition, user_id))
+
+    @property
+    def symbols(self) -> set[str]:
+        return {symbol for symbol, _condition in self._levels}
+
+    def crossed(
+        self, symbol: str, condition: str, before: float, after: float
+    ) -> list[tuple[float, int, int]]:
+        """``(threshold, item_id, user_id)`` for thresholds ``after`` now exceeds."""
+        levels = self._levels.get((symbol, condition))
+        if not levels or after <= before:
+            return []
+        lo = bisect_left(levels, (before,))
+        hi = bisect_left(levels, (after,))
+        return levels[lo:hi]
+
+
+def tick_values(
+    tick: dict[str, Any], history: list[float] | None = None
+) -> dict[str, float]:
+    """Condition values implied by one realtime tick.
+
+    RSI and the deviation from the 50-day MA come from ``history``, the
+    symbol's daily closes, through :func:`~stockapp.utils.latest_indicators`
+    so they match what the scheduled check computes for the same price.
+    """
+    values: dict[str, float] = {}
+    price, eps = tick.get("price"), tick.get("eps")
+    if price is None:
+        return values
+    if eps:
+        values["pe"] = round(price / eps, 2)
+    if history:
+        latest = latest_indicators({"": history}, {"": price}, 14, 50)[""]
+        if latest["rsi"] is not None:
+            values["rsi"] = latest["rsi"]
+        if latest["deviation"] is not None:
+            values["ma"] = latest["deviation"]
+    return values
+
+
+class AlertEngine:
+    """Fire watchlist alerts as realtime ticks cross user thresholds.
+
+    The index is rebuilt from the database every ``refresh`` seconds so
+    new or edited watchlist items are picked up; symbols are subscribed to
+    and released as the index changes.
+    """
+
+    def __init__(self, hub: PriceHub, refresh: float = 60) -> None:
+        self.hub = hub
+        self.refresh = refresh
+        self.index = ThresholdIndex()
+        self.fired = 0
+        # ticks for every symbol arrive through one coalescing queue
+        self.queue = SendQueue(10_000, COALESCE, hub.metrics)
+        self._subs: dict[str, Subscription] = {}
+        self._last: dict[str, dict[str, float]] = {}
+        # daily closes for symbols with RSI or moving average thresholds
+        self._history: dict[str, list[float]] = {}
+
+    def load(self) -> None:
+        """Rebuild the threshold index and follow its symbols."""
+        items = WatchlistItem.query.all()
+        self.index = ThresholdIndex.from_items(items)
+        self._history = {}
+        for symbol in {
+            i.symbol
+            for i in items
+            if i.rsi_threshold is not None or i.ma_threshold is not None
+        }:
+            try:
+                _dates, prices = get_historical_prices(symbol, days=60)
+            except Exception:
+                logger.exception("Failed to load history for %s", symbol)
+                continue
+            if prices:
+                self._history[symbol] = prices
+        wanted = self.index.symbols
+        for symbol in set(self._subs) - wanted:
+            self._subs.pop(symbol).close()
+            self._last.pop(symbol, None)
+        for symbol in wanted - set(self._subs):
+            self._subs[symbol] = self.hub.subscribe(symbol, sink=self.queue)
+
+    def process(self, tick: dict[str, Any]) -> list[Alert]:
+        """Record and send alerts for thresholds crossed by ``tick``."""
+        symbol = tick.get("symbol")
+        if symbol not in self._subs:
+            return []
+        last = self._last.setdefault(symbol, {})
+        by_user: dict[int, list[str]] = {}
+        alerts = []
+        values = tick_values(tick, self._history.get(symbol))
+        for condition, value in values.items():
+            before = last.get(condition)
+            last[condition] = value
+            # the first value only establishes where the symbol stands
+            if before is None:
+                continue
+            # alert state is per user, symbol and condition, so a user's
+            # thresholds count as one: the condition holds above the lowest
+            low, high = sorted((before, value))
+            crossed = self.index.crossed(symbol, condition, low, high)
+            for user_id in dict.fromkeys(u for _t, _i, u in crossed):
+                threshold = self.index.lowest(symbol, condition, user_id)
+                if not should_alert(user_id, symbol, condition, value > threshold):
+                    continue
+                message = MESSAGES[condition].format(
+                    symbol=symbol, value=value, threshold=threshold
+                )
+                alerts.append(Alert(symbol=symbol, message=message, user_id=user_id))
+                by_user.setdefault(user_id, []).append(message)
+        db.session.add_all(alerts)
+        db.session.commit()
+        if not alerts:
+            return []
+        from .tasks import notify_watchlist_alerts
+
+        now = datetime.utcnow()
+        for user_id, messages in by_user.items():
+            user = db.session.get(User, user_id)
+            if user is None:
+                continue
+            # the alert is recorded either way; notifications follow the
+            # user's alert frequency like the scheduled check
+            freq = user.alert_frequency or 24
+            if now - (user.last_alert_time or datetime.min) < timedelta(hours=freq):
+                continue
+            notify_watchlist_alerts(user, messages)
+            user.last_alert_time = now
+        db.session.commit()
+        self.fired += len(alerts)
+        return alerts
+
+    def run(
+        self, stop: threading.Event | None = None, max_ticks: int | None = None
+    ) -> None:
+        """Process ticks until ``stop`` is set or ``max_ticks`` were seen."""
+        stop = stop or threading.Event()
+        seen = 0
+        next_refresh = 0.0
+        try:
+            while not stop.is_set():
+                if time.monotonic() >= next_refresh:
+                    self.load()
+                    next_refresh = time.monotonic() + self.refresh
+                try:
+                    tick = self.queue.get(timeout=1)
+                except queue.Empty:
+                    continue
+                try:
+                    self.process(tick)
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("Alert evaluation failed for %s", tick)
+                seen += 1
+                if max_ticks and seen >= max_ticks:
+                    break
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        for sub in self._subs.values():
+            sub.close()
+        self._subs.clear()
+
+
+@click.command("realtime-alerts")
+@with_appcontext
+def realtime_alerts_command() -> None:
+    """Fire watchlist alerts from realtime ticks until interrupted."""
+    engine = AlertEngine(
+        get_price_hub(), current_app.config.get("ALERT_INDEX_REFRESH", 60)
+    )
+    click.echo("Evaluating watchlist alerts on realtime ticks; Ctrl+C to stop")
+    try:
+        engine.run()
+    except KeyboardInterrupt:
+        pass
+    click.echo(f"Fired {engine.fired} alerts")
@@ -0,0 +1,75 @@
+"""De-duplicate alerts by remembering which conditions already hold.
+
+Alerts are checked on every stock page view, every scheduled watchlist run
+and every realtime tick. Without memory, a P/E that stays above a user's
+threshold raises a new ``Alert`` row and push notification on each check.
+:func:`should_alert` records whether each ``(user, symbol, condition)``
+currently holds and approves an alert only when it starts to hold. A
+condition that clears and holds again within ``ALERT_COOLDOWN`` seconds of
+the last alert stays quiet, so values hovering around a threshold do not
+flap.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from .extensions import db
+from .models import AlertState
+
+
+def should_alert(
+    user_id: int,
+    symbol: str | None,
+    condition: str,
+    active: bool,
+    now: datetime | None = None,
+) -> bool:
+    """Record whether ``condition`` holds and return whether to send an alert.
+
+    State changes are added to the session; the caller commits them with
+    the alerts it creates. Nothing is written while the state is unchanged.
+    """
+    state = _find(user_id, symbol or "", condition)
+    if not active:
+        if state is not None and state.active:
+            state.active = False
+        return False
+    if state is None:
+        state = _create(user_id, symbol or "", condition)
+    if state.active:
+        return False
+    state.active = True
+    now = now or datetime.utcnow()
+    cooldown = timedelta(seconds=current_app.config.get("ALERT_COOLDOWN", 3600))
+    if state.last_fired is not None and now - state.last_fired < cooldown:
+        return False
+    state.last_fired = now
+    return True
+
+
+def _find(user_id: int, symbol: str, condition: str) -> AlertState | None:
+    return AlertState.query.filter_by(
+        user_id=user_id, symbol=symbol, condition=condition
+    ).first()
+
+
+def _create(user_id: int, symbol: str, condition: str) -> AlertState:
+    """Insert a state row, or load the one a concurrent check just inserted.
+
+    The insert runs in a savepoint so losing the race to another request
+    or worker rolls back only this row, not the caller's transaction.
+    """
+    state = AlertState(user_id=user_id, symbol=symbol, condition=condition)
+    state.active = False
+    try:
+        with db.session.begin_nested():
+            db.session.add(state)
+    except IntegrityError:
+        state = AlertState.query.filter_by(
+            user_id=user_id, symbol=symbol, condition=condition
+        ).one()
+    return state
@@ -1,9 +1,21 @@
-from flask import Blueprint, jsonify, request
+from datetime import date
+
+from flask import Blueprint, Response, current_app, jsonify, request
 from flask_login import login_required, current_user
 
 from ..models import WatchlistItem, PortfolioItem, Alert
-from ..utils import get_news_summary
+from ..utils import (
+    cache_timestamp,
+    get_historical_bars,
+    get_news_summary,
+    get_stock_news,
+)
 from ..backtesting import backtest_custom_rule
+from ..intraday import aggregator
+from ..realtime import get_price_hub
+from ..charts import build_chart, chart_etag
+from ..http_cache import cached_view
+from ..indicator_registry import REGISTRY, IndicatorError, parse_request
 
 api_bp = Blueprint("api", __name__, url_prefix="/api")
 
@@ -66,13 +78,93 @@ def get_alerts():
     return jsonify(data)
 
 
+def _news_version(symbol: str) -> tuple:
+    # the articles get_news_summary fetches and summarises
+    return get_stock_news(symbol, limit=20), cache_timestamp(("news", symbol, 20))
+
+
 @api_bp.route("/news_summary/<symbol>")
+@cached_view(_news_version)
 def news_summary(symbol: str):
     period = request.args.get("period", "daily")
     summary = get_news_summary(symbol.upper(), period)
     return jsonify({"symbol": symbol.upper(), "summary": summary})
 
 
+@api_bp.route("/intraday/<symbol>")
+def intraday_bars(symbol: str):
+    """Return 1- or 5-minute OHLC bars built from realtime ticks."""
+    interval = request.args.get("interval", "1")
+    limit = request.args.get("limit", type=int)
+    if interval not in ("1", "5"):
+        return jsonify({"error": "interval must be 1 or 5"}), 400
+    return jsonify(aggregator.get_bars(symbol.upper(), int(interval) * 60, limit))
+
+
+@api_bp.route("/realtime/stats")
+@login_required
+def realtime_stats():
+    """Active pollers, subscribers and send queue depth and drop counters."""
+    if not current_user.is_admin:
+        return jsonify({"error": "forbidden"}), 403
+    return jsonify(get_price_hub().stats())
+
+
+@api_bp.route("/chart/<symbol>")
+def chart_data(symbol: str):
+    """Return price history and requested indicators as columnar arrays.
+
+    ``indicators`` lists registry tokens such as ``sma:20,rsi,macd``; only
+    those are computed. ``days`` sets how much history is loaded,
+    ``start``/``end`` (ISO dates) trim the returned range and
+    ``encoding=f32`` packs float columns as base64 float32. Long series are
+    downsampled unless ``full=1``.
+    """
+    symbol = symbol.upper()
+    days = request.args.get("days", 365, type=int)
+    if not 1 <= days <= 3650:
+        return jsonify({"error": "days must be between 1 and 3650"}), 400
+    encoding = request.args.get("encoding", "json")
+    if encoding not in ("json", "f32"):
+        return jsonify({"error": "encoding must be json or f32"}), 400
+    start = request.args.get("start") or None
+    end = request.args.get("end") or None
+    try:
+        for value in (start, end):
+            if value:
+                date.fromisoformat(value)
+    except ValueError:
+        return jsonify({"error": "start and end must be YYYY-MM-DD"}), 400
+    try:
+        requested = parse_request(request.args.get("indicators", ""))
+    except IndicatorError as exc:
+        return jsonify({"error": str(exc)}), 400
+    max_points = 0
+    if request.args.get("full") != "1":
+        max_points = current_app.config.get("CHART_MAX_POINTS", 0)
+
+    history = get_historical_bars(symbol, days=days)
+    tokens = sorted(f"{indicator.name}{params}" for indicator, params in requested)
+    etag = chart_etag(history, days, start, end, max_points, encoding, *tokens)
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        chart = build_chart(
+            symbol, history, start, end, max_points, encoding, requested
+        )
+        resp = jsonify(chart)
+    resp.set_etag(etag)
+    resp.cache_control.public = True
+    resp.cache_control.max_age = 300
+    return resp
+
+
+@api_bp.route("/indicators")
+def indicator_schemas():
+    """List the chart indicators with their inputs, parameters and outputs."""
+    return jsonify([indicator.schema() for indicator in REGISTRY.values()])
+
+
 @api_bp.route("/backtest_rule")
 @login_required
 def api_backtest_rule():
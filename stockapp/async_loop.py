@@ -0,0 +1,110 @@
+"""A long-lived asyncio event loop for calling async code from sync views.
+
+``asyncio.run`` creates and closes an event loop (and with it any HTTP
+connection pool) on every call. :func:`run_coroutine` instead hands the
+coroutine to one background loop per process, so repeated async fetches
+reuse the loop and the shared :func:`shared_http_client`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import concurrent.futures
+import os
+import threading
+from typing import Any, Coroutine, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+
+class BackgroundLoop:
+    """An event loop running forever in a daemon thread.
+
+    The loop starts on first use and is recreated after ``fork`` (e.g. a
+    gunicorn worker forked from a preloaded master), since threads do not
+    survive into the child process.
+    """
+
+    def __init__(self) -> None:
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._lock = threading.Lock()
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                self._loop = asyncio.new_event_loop()
+                self._client = None
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="async-loop", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> concurrent.futures.Future[T]:
+        """Schedule ``coro`` on the loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop())
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+        """Run ``coro`` on the loop and wait for its result."""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def client(self) -> httpx.AsyncClient | None:
+        """HTTP client shared by coroutines running on this loop.
+
+        Returns ``None`` when called from any other event loop, since an
+        ``AsyncClient`` must stay on the loop that created it.
+        """
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        if running is not self._loop or self._pid != os.getpid():
+            return None
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=10)
+        return self._client
+
+    def stop(self) -> None:
+        """Close the shared client and stop the loop."""
+        with self._lock:
+            loop, client = self._loop, self._client
+            if loop is None or self._pid != os.getpid() or not loop.is_running():
+                return
+            self._loop = self._client = None
+        if client is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(5)
+            except Exception:
+                pass
+        loop.call_soon_threadsafe(loop.stop)
+
+
+background_loop = BackgroundLoop()
+atexit.register(background_loop.stop)
+
+
+def submit(coro: Coroutine[Any, Any, T]) -> concurrent.futures.Future[T]:
+    """Schedule ``coro`` on the process-wide background loop."""
+    return background_loop.submit(coro)
+
+
+def run_coroutine(coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+    """Run ``coro`` on the process-wide background loop and return its result."""
+    return background_loop.run(coro, timeout)
+
+
+def shared_http_client() -> httpx.AsyncClient | None:
+    """The background loop's pooled HTTP client, if running on that loop."""
+    return background_loop.client()
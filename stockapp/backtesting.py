@@ -1,6 +1,7 @@
 import re
 from typing import Any
 
+from .price_frame import PriceFrame
 from .utils import get_historical_prices
 
 
@@ -9,7 +10,8 @@ def backtest_custom_rule(rule: str, days: int = 30) -> list[dict[str, Any]]:
 
     Returns a list of dictionaries with ``date`` and ``result`` keys.
     ``days`` controls how many days are tested counting back from the
-    most recent historical record.
+    most recent historical record. Symbols are aligned on date so rules
+    comparing tickers from different exchanges evaluate matching days.
     """
 
     # Extract symbols and maximum change window from the rule
@@ -32,37 +34,43 @@ def backtest_custom_rule(rule: str, days: int = 30) -> list[dict[str, Any]]:
         dates, prices = get_historical_prices(sym, days=days + max_days)
         history[sym] = (dates, prices)
 
-    if not history:
+    frame = PriceFrame.from_series(history, how="inner")
+    if not len(frame):
         return []
 
-    min_len = min(len(p[1]) for p in history.values())
     results: list[dict[str, Any]] = []
 
-    for idx in range(max_days, min(max_days + days, min_len)):
+    for idx in range(max_days, min(max_days + days, len(frame))):
+
         def price_fn(symbol: str) -> float | None:
-            ds, ps = history.get(symbol, ([], []))
-            if idx < len(ps):
-                return ps[idx]
-            return None
+            if symbol not in frame:
+                return None
+            return float(frame.column(symbol)[idx])
 
         def change_fn(symbol: str, window: int) -> float | None:
-            ds, ps = history.get(symbol, ([], []))
-            if idx < len(ps) and idx - window >= 0:
-                start = ps[idx - window]
-                end = ps[idx]
-                if start and end:
-                    try:
-                        return round((end - start) / start * 100, 2)
-                    except Exception:
-                        return None
+            if symbol not in frame or idx - window < 0:
+                return None
+            col = frame.column(symbol)
+            start = float(col[idx - window])
+            end = float(col[idx])
+            if start and end:
+                try:
+                    return round((end - start) / start * 100, 2)
+                except Exception:
+                    return None
             return None
 
         try:
-            result = bool(eval(rule, {"__builtins__": {}}, {"price": price_fn, "change": change_fn}))
+            result = bool(
+                eval(
+                    rule,
+                    {"__builtins__": {}},
+                    {"price": price_fn, "change": change_fn},
+                )
+            )
         except Exception:
             result = False
 
-        date = next(iter(history.values()))[0][idx] if history else ""
-        results.append({"date": date, "result": result})
+        results.append({"date": frame.dates[idx], "result": result})
 
     return results
@@ -0,0 +1,93 @@
+"""Columnar price history and indicator series for charts."""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Sequence
+
+from .downsample import bucket_ohlc, lttb_indices, take
+from .indicator_registry import Indicator, compute
+from .indicators import to_array
+from .utils import series_fingerprint
+
+_EPOCH = date(1970, 1, 1).toordinal()
+
+Bars = tuple[list[str], list[float], list[float], list[float], list[float], list[float]]
+
+
+def epoch_day(day: str) -> int:
+    """Days since 1970-01-01 for an ISO ``YYYY-MM-DD`` date."""
+    return date.fromisoformat(day[:10]).toordinal() - _EPOCH
+
+
+def encode_f32(values: Sequence[float | None]) -> str:
+    """Base64 of little-endian float32 values with ``NaN`` for gaps."""
+    return base64.b64encode(to_array(values).astype("<f4").tobytes()).decode()
+
+
+def chart_etag(history: Bars, *params: object) -> str:
+    """Entity tag for chart data built from ``history`` with ``params``."""
+    key = series_fingerprint(*history[1:]) + "|" + "|".join(map(str, params))
+    key += "|" + (history[0][-1] if history[0] else "")
+    return hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+
+
+def build_chart(
+    symbol: str,
+    history: Bars,
+    start: str | None = None,
+    end: str | None = None,
+    max_points: int = 0,
+    encoding: str = "json",
+    requested: Sequence[tuple[Indicator, tuple]] = (),
+) -> dict:
+    """Return ``history`` and the ``requested`` indicators as columnar arrays.
+
+    Only the requested indicators are computed, over the whole history
+    before ``start``/``end`` trim it, so values at the start of a range are
+    fully warmed up. Series longer than ``max_points`` are downsampled (LTTB
+    for lines, bucketed candles). With ``encoding="f32"`` float columns are
+    base64 strings of little-endian float32 values instead of JSON lists.
+    """
+    dates, opens, highs, lows, closes, volumes = history
+    prices = {"high": highs, "low": lows, "close": closes, "volume": volumes}
+    columns = {"close": closes, **compute(symbol, prices, list(requested))}
+    lo = bisect_left(dates, start) if start else 0
+    hi = bisect_right(dates, end) if end else len(dates)
+    dates = dates[lo:hi]
+    columns = {k: v[lo:hi] for k, v in columns.items()}
+    candles = {
+        "t": dates,
+        "open": opens[lo:hi],
+        "high": highs[lo:hi],
+        "low": lows[lo:hi],
+        "close": closes[lo:hi],
+    }
+    downsampled = bool(max_points and len(dates) > max_points)
+    if downsampled:
+        candles = bucket_ohlc(
+            dates,
+            candles["open"],
+            candles["high"],
+            candles["low"],
+            candles["close"],
+            max_points,
+        )
+        keep = lttb_indices(columns["close"], max_points)
+        dates = take(dates, keep)
+        columns = {k: take(v, keep) for k, v in columns.items()}
+    candles["t"] = [epoch_day(d) for d in candles["t"]]
+    if encoding == "f32":
+        columns = {k: encode_f32(v) for k, v in columns.items()}
+        candles = {k: v if k == "t" else encode_f32(v) for k, v in candles.items()}
+    return {
+        "symbol": symbol,
+        "encoding": encoding,
+        "downsampled": downsampled,
+        "t": [epoch_day(d) for d in dates],
+        "columns": columns,
+        "candles": candles,
+    }
@@ -28,6 +28,7 @@ class Config:
     CHECK_DIVIDENDS_CRON = "0 9 * * *"
     CLEANUP_OLD_DATA_CRON = "0 3 * * *"
     DATA_SNAPSHOT_CRON = "0 7 * * *"
+    FUNDAMENTALS_REFRESH_CRON = "30 2 * * *"
 
     TWILIO_SID = ""
     TWILIO_TOKEN = ""
@@ -40,8 +41,24 @@ class Config:
     BABEL_TRANSLATION_DIRECTORIES = "translations"
 
     REALTIME_PROVIDER = "fmp"
+    REALTIME_FEED_URL = ""
     PRICE_STREAM_INTERVAL = 5
+    STREAM_HEARTBEAT_INTERVAL = 15
+    STREAM_QUEUE_SIZE = 100
+    STREAM_SLOW_CONSUMER_POLICY = "coalesce"
+    ADAPTIVE_POLLING = True
+    PRICE_STREAM_CLOSED_INTERVAL = 900
     ASYNC_REALTIME = False
+    CHART_MAX_POINTS = 200
+    WS_MAX_SYMBOLS = 50
+    REALTIME_BACKPLANE = False
+    ALERT_INDEX_REFRESH = 60
+    ALERT_COOLDOWN = 3600
+    HTTP_CACHE_MAX_AGE = 60
+    HTTP_CACHE_SHARED_MAX_AGE = 300
+    ACTIVITY_BUFFER = "memory"
+    ACTIVITY_FLUSH_SIZE = 100
+    ACTIVITY_FLUSH_INTERVAL = 5
 
     GOOGLE_CLIENT_ID = ""
     GOOGLE_CLIENT_SECRET = ""
@@ -78,6 +95,9 @@ class Config:
         self.REALTIME_PROVIDER = os.environ.get(
             "REALTIME_PROVIDER", self.REALTIME_PROVIDER
         )
+        self.REALTIME_FEED_URL = os.environ.get(
+            "REALTIME_FEED_URL", self.REALTIME_FEED_URL
+        )
         self.ASYNC_REALTIME = os.environ.get("ASYNC_REALTIME", "0").lower() in [
             "1",
             "true",
@@ -86,6 +106,55 @@ class Config:
         self.PRICE_STREAM_INTERVAL = float(
             os.environ.get("PRICE_STREAM_INTERVAL", self.PRICE_STREAM_INTERVAL)
         )
+        self.STREAM_HEARTBEAT_INTERVAL = float(
+            os.environ.get("STREAM_HEARTBEAT_INTERVAL", self.STREAM_HEARTBEAT_INTERVAL)
+        )
+        self.STREAM_QUEUE_SIZE = int(
+            os.environ.get("STREAM_QUEUE_SIZE", self.STREAM_QUEUE_SIZE)
+        )
+        self.STREAM_SLOW_CONSUMER_POLICY = os.environ.get(
+            "STREAM_SLOW_CONSUMER_POLICY", self.STREAM_SLOW_CONSUMER_POLICY
+        )
+        self.ADAPTIVE_POLLING = os.environ.get("ADAPTIVE_POLLING", "1").lower() in [
+            "1",
+            "true",
+            "yes",
+        ]
+        self.PRICE_STREAM_CLOSED_INTERVAL = float(
+            os.environ.get(
+                "PRICE_STREAM_CLOSED_INTERVAL", self.PRICE_STREAM_CLOSED_INTERVAL
+            )
+        )
+        self.CHART_MAX_POINTS = int(
+            os.environ.get("CHART_MAX_POINTS", self.CHART_MAX_POINTS)
+        )
+        self.WS_MAX_SYMBOLS = int(os.environ.get("WS_MAX_SYMBOLS", self.WS_MAX_SYMBOLS))
+        self.REALTIME_BACKPLANE = os.environ.get("REALTIME_BACKPLANE", "0").lower() in [
+            "1",
+            "true",
+            "yes",
+        ]
+        self.ALERT_INDEX_REFRESH = float(
+            os.environ.get("ALERT_INDEX_REFRESH", self.ALERT_INDEX_REFRESH)
+        )
+        self.ALERT_COOLDOWN = float(
+            os.environ.get("ALERT_COOLDOWN", self.ALERT_COOLDOWN)
+        )
+        self.HTTP_CACHE_MAX_AGE = int(
+            os.environ.get("HTTP_CACHE_MAX_AGE", self.HTTP_CACHE_MAX_AGE)
+        )
+        self.HTTP_CACHE_SHARED_MAX_AGE = int(
+            os.environ.get("HTTP_CACHE_SHARED_MAX_AGE", self.HTTP_CACHE_SHARED_MAX_AGE)
+        )
+        self.ACTIVITY_BUFFER = os.environ.get(
+            "ACTIVITY_BUFFER", self.ACTIVITY_BUFFER
+        ).lower()
+        self.ACTIVITY_FLUSH_SIZE = int(
+            os.environ.get("ACTIVITY_FLUSH_SIZE", self.ACTIVITY_FLUSH_SIZE)
+        )
+        self.ACTIVITY_FLUSH_INTERVAL = float(
+            os.environ.get("ACTIVITY_FLUSH_INTERVAL", self.ACTIVITY_FLUSH_INTERVAL)
+        )
         self.CHECK_WATCHLISTS_CRON = os.environ.get(
             "CHECK_WATCHLISTS_CRON", self.CHECK_WATCHLISTS_CRON
         )
@@ -104,6 +173,9 @@ class Config:
         self.DATA_SNAPSHOT_CRON = os.environ.get(
             "DATA_SNAPSHOT_CRON", self.DATA_SNAPSHOT_CRON
         )
+        self.FUNDAMENTALS_REFRESH_CRON = os.environ.get(
+            "FUNDAMENTALS_REFRESH_CRON", self.FUNDAMENTALS_REFRESH_CRON
+        )
         self.GOOGLE_CLIENT_ID = os.environ.get(
             "GOOGLE_CLIENT_ID", self.GOOGLE_CLIENT_ID
         )
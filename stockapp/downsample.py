@@ -0,0 +1,93 @@
+"""Reduce chart series to a bounded number of points before rendering."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+from .indicators import to_array
+
+
+def _ffill_for_selection(y: np.ndarray) -> np.ndarray:
+    """Fill gaps so point selection can compare areas; leading gaps become 0."""
+    mask = np.isnan(y)
+    if not mask.any():
+        return y
+    idx = np.where(~mask, np.arange(len(y)), 0)
+    np.maximum.accumulate(idx, out=idx)
+    filled = y[idx]
+    filled[np.isnan(filled)] = 0.0
+    return filled
+
+
+def lttb_indices(y: Sequence[float | None] | np.ndarray, threshold: int) -> np.ndarray:
+    """Indices kept by Largest-Triangle-Three-Buckets for an evenly spaced series.
+
+    The first and last points are always kept. Every bucket in between
+    contributes the point forming the largest triangle with the previously
+    selected point and the average of the next bucket, which preserves
+    peaks and troughs that plain striding would drop.
+    """
+    values = _ffill_for_selection(to_array(y))
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    keep = np.empty(threshold, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    prev = 0
+    for b in range(threshold - 2):
+        start, stop = edges[b], edges[b + 1]
+        nxt_start, nxt_stop = stop, edges[b + 2] if b + 2 < len(edges) else n
+        avg_x = (nxt_start + nxt_stop - 1) / 2
+        avg_y = values[nxt_start:nxt_stop].mean()
+        xs = np.arange(start, stop)
+        area = np.abs(
+            (prev - avg_x) * (values[start:stop] - values[prev])
+            - (prev - xs) * (avg_y - values[prev])
+        )
+        prev = start + int(area.argmax())
+        keep[b + 1] = prev
+    return keep
+
+
+def bucket_ohlc(
+    dates: Sequence[str],
+    opens: Sequence[float | None],
+    highs: Sequence[float | None],
+    lows: Sequence[float | None],
+    closes: Sequence[float | None],
+    threshold: int,
+) -> dict[str, list]:
+    """Merge consecutive candles into at most ``threshold`` buckets.
+
+    Each bucket opens at its first candle, closes at its last and spans
+    the extreme high and low; it is dated by its first candle.
+    """
+    n = min(len(dates), len(opens), len(highs), len(lows), len(closes))
+    if threshold >= n or threshold < 1:
+        return {
+            "t": list(dates[:n]),
+            "open": list(opens[:n]),
+            "high": list(highs[:n]),
+            "low": list(lows[:n]),
+            "close": list(closes[:n]),
+        }
+    starts = np.unique(np.linspace(0, n, threshold + 1).astype(int)[:-1])
+    ends = np.append(starts[1:], n) - 1
+    with np.errstate(invalid="ignore"):
+        high = np.fmax.reduceat(to_array(highs[:n]), starts)
+        low = np.fmin.reduceat(to_array(lows[:n]), starts)
+    return {
+        "t": [dates[i] for i in starts],
+        "open": [opens[i] for i in starts],
+        "high": [None if v != v else v for v in high.tolist()],
+        "low": [None if v != v else v for v in low.tolist()],
+        "close": [closes[i] for i in ends],
+    }
+
+
+def take(values: Sequence, indices: np.ndarray) -> list:
+    """Return ``values`` at ``indices`` as a list."""
+    return [values[i] for i in indices.tolist()]
@@ -0,0 +1,240 @@
+"""Push-based market data feeds for the realtime price hub.
+
+Polling REST quotes delivers a price at most once per
+``PRICE_STREAM_INTERVAL``. A streaming feed pushes every trade as it
+happens, so ticks reach subscribers within milliseconds and upstream
+requests no longer grow with time. :class:`WebSocketFeed` speaks the
+widely used Finnhub-style trade protocol::
+
+    -> {"type": "subscribe", "symbol": "AAPL"}
+    <- {"type": "trade", "data": [{"s": "AAPL", "p": 187.3, "t": 1700000000000}]}
+
+:class:`SimulatedFeedServer` serves the same protocol locally with random
+walk prices for tests and benchmarks.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable
+
+import simple_websocket
+from flask import Flask
+from flask_sock import Sock
+from werkzeug.serving import make_server
+
+logger = logging.getLogger(__name__)
+
+# on_trade(symbol, price, timestamp in epoch milliseconds or None)
+TradeHandler = Callable[[str, float, "int | None"], None]
+
+
+class Feed(ABC):
+    """A source of pushed trades for a changing set of symbols."""
+
+    @abstractmethod
+    def start(self, on_trade: TradeHandler) -> None:
+        """Begin delivering trades to ``on_trade``."""
+
+    @abstractmethod
+    def subscribe(self, symbol: str) -> None:
+        """Start receiving trades for ``symbol``."""
+
+    @abstractmethod
+    def unsubscribe(self, symbol: str) -> None:
+        """Stop receiving trades for ``symbol``."""
+
+    @abstractmethod
+    def stop(self) -> None:
+        """Close the feed."""
+
+
+class WebSocketFeed(Feed):
+    """Trades from a Finnhub-style WebSocket stream.
+
+    One reader thread owns the connection. Subscription changes are queued
+    to it, and after a dropped connection it reconnects with exponential
+    backoff and subscribes to every symbol again. When one message carries
+    several trades for a symbol only the last is passed on.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        connect: Callable[[str], Any] = simple_websocket.Client.connect,
+        max_backoff: float = 30,
+    ) -> None:
+        self.url = url
+        self._connect = connect
+        self.max_backoff = max_backoff
+        self.symbols: set[str] = set()
+        self.connected = threading.Event()
+        self._commands: queue.Queue = queue.Queue()
+        self._on_trade: TradeHandler | None = None
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self, on_trade: TradeHandler) -> None:
+        with self._lock:
+            self._on_trade = on_trade
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="price-feed", daemon=True
+                )
+                self._thread.start()
+
+    def subscribe(self, symbol: str) -> None:
+        with self._lock:
+            self.symbols.add(symbol)
+        self._commands.put(("subscribe", symbol))
+
+    def unsubscribe(self, symbol: str) -> None:
+        with self._lock:
+            self.symbols.discard(symbol)
+        self._commands.put(("unsubscribe", symbol))
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        backoff = 0.5
+        while not self._stopped.is_set():
+            try:
+                ws = self._connect(self.url)
+            except Exception as exc:
+                logger.warning("Price feed %s unavailable: %s", self.url, exc)
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+            backoff = 0.5
+            try:
+                self._stream(ws)
+            except Exception:
+                logger.exception("Price feed connection lost")
+            finally:
+                self.connected.clear()
+                try:
+                    ws.close()
+                except Exception:
+                    pass
+
+    def _stream(self, ws: Any) -> None:
+        # commands queued before this connection are covered by the resync
+        while not self._commands.empty():
+            self._commands.get_nowait()
+        with self._lock:
+            symbols = sorted(self.symbols)
+        for symbol in symbols:
+            ws.send(json.dumps({"type": "subscribe", "symbol": symbol}))
+        self.connected.set()
+        while not self._stopped.is_set():
+            while True:
+                try:
+                    action, symbol = self._commands.get_nowait()
+                except queue.Empty:
+                    break
+                ws.send(json.dumps({"type": action, "symbol": symbol}))
+            message = ws.receive(timeout=0.1)
+            if message is not None:
+                self._handle(message)
+
+    def _handle(self, message: str | bytes) -> None:
+        try:
+            msg = json.loads(message)
+        except ValueError:
+            logger.warning("Ignoring malformed feed message")
+            return
+        if not isinstance(msg, dict) or msg.get("type") != "trade":
+            return
+        latest: dict[str, dict[str, Any]] = {}
+        for trade in msg.get("data") or []:
+            if isinstance(trade, dict) and trade.get("s") and "p" in trade:
+                latest[trade["s"]] = trade
+        on_trade = self._on_trade
+        if on_trade is None:
+            return
+        for symbol, trade in latest.items():
+            if symbol in self.symbols:
+                on_trade(symbol, float(trade["p"]), trade.get("t"))
+
+
+class SimulatedFeedServer:
+    """A local trade stream with random walk prices.
+
+    Every ``interval`` seconds each subscribed symbol gets one trade. Use
+    as a context manager; :attr:`url` is valid once started.
+    """
+
+    def __init__(self, interval: float = 0.05, seed: int = 0) -> None:
+        self.interval = interval
+        self.trades_sent = 0
+        self.connections = 0
+        self._rng = random.Random(seed)
+        self._prices: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._server: Any = None
+        self._thread: threading.Thread | None = None
+        self.app = Flask("simulated-feed")
+        Sock(self.app).route("/")(self._serve)
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self._server.server_port}/"
+
+    def start(self) -> "SimulatedFeedServer":
+        self._server = make_server("127.0.0.1", 0, self.app, threaded=True)
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="simulated-feed", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+
+    def __enter__(self) -> "SimulatedFeedServer":
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    def _trade(self, symbol: str) -> dict[str, Any]:
+        with self._lock:
+            price = self._prices.get(symbol, 100.0)
+            price = round(price * (1 + self._rng.gauss(0, 0.001)), 2)
+            self._prices[symbol] = price
+            self.trades_sent += 1
+        return {"s": symbol, "p": price, "t": int(time.time() * 1000), "v": 100}
+
+    def _serve(self, ws: Any) -> None:
+        with self._lock:
+            self.connections += 1
+        symbols: set[str] = set()
+        next_tick = time.monotonic()
+        while True:
+            message = ws.receive(timeout=max(0, next_tick - time.monotonic()))
+            if message is not None:
+                try:
+                    msg = json.loads(message)
+                except ValueError:
+                    continue
+                if msg.get("type") == "subscribe":
+                    symbols.add(msg.get("symbol"))
+                elif msg.get("type") == "unsubscribe":
+                    symbols.discard(msg.get("symbol"))
+                continue
+            next_tick = time.monotonic() + self.interval
+            if symbols:
+                trades = [self._trade(s) for s in sorted(symbols)]
+                ws.send(json.dumps({"type": "trade", "data": trades}))
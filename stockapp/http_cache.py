@@ -0,0 +1,107 @@
+"""HTTP caching for anonymous symbol views.
+
+Anonymous visitors to the same symbol see the same page until the market
+data behind it refreshes, so :func:`cached_view` renders such a response
+once and replays it. The entity tag hashes the route, symbol, locale,
+currency and query string together with the data the view is built from.
+``Last-Modified`` is when that data was fetched. Revalidations are answered
+with ``304 Not Modified`` before anything is rendered, and ``Cache-Control``
+lets a CDN or reverse proxy share the response between visitors.
+
+Signed-in users get personalised pages, which are always rendered and
+marked private.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Any, Callable
+
+from flask import Response, current_app, make_response, request
+from flask_login import current_user
+from werkzeug.http import is_resource_modified
+
+from .utils import _get_cached, _set_cached, get_locale
+
+logger = logging.getLogger(__name__)
+
+# version(symbol) -> (data the view renders, when it was fetched or None)
+Version = Callable[[str], "tuple[Any, float | None]"]
+
+
+def response_etag(symbol: str, data: Any, symbol_arg: str = "symbol") -> str:
+    """Entity tag for the current request's view of ``symbol`` and ``data``."""
+    currency = ""
+    if current_user.is_authenticated:
+        currency = current_user.default_currency or ""
+    query = sorted((k, v) for k, v in request.args.items(multi=True) if k != symbol_arg)
+    key = "|".join(
+        map(str, (request.endpoint, symbol, get_locale(), currency, query, data))
+    )
+    return hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+
+
+def _shared(resp: Response, etag: str, modified: datetime | None) -> Response:
+    resp.set_etag(etag)
+    if modified is not None:
+        resp.last_modified = modified
+    resp.cache_control.public = True
+    resp.cache_control.max_age = current_app.config.get("HTTP_CACHE_MAX_AGE", 60)
+    resp.cache_control.s_maxage = current_app.config.get(
+        "HTTP_CACHE_SHARED_MAX_AGE", 300
+    )
+    # the locale comes from Accept-Language and the session decides who is
+    # signed in
+    resp.vary.update(("Accept-Language", "Cookie"))
+    return resp
+
+
+def cached_view(version: Version, symbol_arg: str = "symbol") -> Callable:
+    """Serve anonymous GETs of a symbol view from a rendered-response cache.
+
+    ``symbol_arg`` names the URL variable or query parameter holding the
+    symbol. ``version`` returns what the view is built from, so a refresh
+    of that data changes the entity tag and retires the cached response.
+    """
+
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if request.method != "GET" or current_user.is_authenticated:
+                resp = make_response(view(*args, **kwargs))
+                resp.cache_control.private = True
+                resp.cache_control.no_cache = True
+                resp.vary.add("Cookie")
+                return resp
+            symbol = str(
+                kwargs.get(symbol_arg) or request.args.get(symbol_arg, "")
+            ).upper()
+            try:
+                data, fetched = version(symbol) if symbol else (None, None)
+            except Exception:
+                logger.exception("Could not version %s for %s", request.path, symbol)
+                return view(*args, **kwargs)
+            etag = response_etag(symbol, data, symbol_arg)
+            modified = None
+            if fetched is not None:
+                modified = datetime.fromtimestamp(fetched, timezone.utc)
+            if not is_resource_modified(
+                request.environ, etag=etag, last_modified=modified
+            ):
+                return _shared(Response(status=304), etag, modified)
+            stored = _get_cached(f"response:{etag}")
+            if stored:
+                body, mimetype = stored
+                return _shared(Response(body, mimetype=mimetype), etag, modified)
+            resp = make_response(view(*args, **kwargs))
+            if resp.status_code != 200:
+                return resp
+            _set_cached(f"response:{etag}", (resp.get_data(), resp.mimetype))
+            return _shared(resp, etag, modified)
+
+        return wrapper
+
+    return decorator
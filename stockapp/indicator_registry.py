@@ -0,0 +1,243 @@
+"""Registry of chart indicators with parameter schemas.
+
+Clients ask for indicators with compact tokens such as ``sma:20`` or
+``bollinger:20:2``; parameters are positional and fall back to their
+defaults. :func:`compute` evaluates only the requested indicators over a
+single set of price columns and memoises each result in the shared cache.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable
+
+import numpy as np
+
+from . import indicators
+from .utils import _get_cached, _set_cached, series_fingerprint
+
+# Upper bound on indicators evaluated for one request
+MAX_INDICATORS = 12
+
+
+class IndicatorError(ValueError):
+    """Raised for unknown indicators or invalid parameters."""
+
+
+class Param:
+    """A numeric indicator parameter with bounds."""
+
+    def __init__(
+        self,
+        name: str,
+        default: int | float,
+        minimum: int | float = 1,
+        maximum: int | float = 500,
+        kind: type = int,
+    ) -> None:
+        self.name = name
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.kind = kind
+
+    def parse(self, raw: str | None) -> int | float:
+        if raw in (None, ""):
+            return self.default
+        try:
+            value = self.kind(raw)
+        except ValueError:
+            kind = "an integer" if self.kind is int else "a number"
+            raise IndicatorError(f"{self.name} must be {kind}")
+        if not self.minimum <= value <= self.maximum:
+            raise IndicatorError(
+                f"{self.name} must be between {self.minimum} and {self.maximum}"
+            )
+        return value
+
+    def schema(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "type": "integer" if self.kind is int else "number",
+            "default": self.default,
+            "minimum": self.minimum,
+            "maximum": self.maximum,
+        }
+
+
+class Indicator:
+    """An indicator computed from named price columns.
+
+    ``func`` receives the ``inputs`` columns followed by the parameter
+    values and returns one array per entry in ``outputs``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        label: str,
+        func: Callable[..., Any],
+        inputs: tuple[str, ...] = ("close",),
+        params: tuple[Param, ...] = (),
+        outputs: tuple[str, ...] = ("value",),
+        overlay: bool = False,
+    ) -> None:
+        self.name = name
+        self.label = label
+        self.func = func
+        self.inputs = inputs
+        self.params = params
+        self.outputs = outputs
+        self.overlay = overlay
+
+    def schema(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "label": self.label,
+            "inputs": list(self.inputs),
+            "params": [p.schema() for p in self.params],
+            "outputs": list(self.outputs),
+            "overlay": self.overlay,
+        }
+
+
+REGISTRY: dict[str, Indicator] = {}
+
+
+def register(indicator: Indicator) -> Indicator:
+    """Add ``indicator`` to the registry, replacing any with the same name."""
+    REGISTRY[indicator.name] = indicator
+    return indicator
+
+
+def _period(default: int) -> Param:
+    return Param("period", default)
+
+
+for _indicator in (
+    Indicator(
+        "sma",
+        "Simple Moving Average",
+        indicators.sma,
+        params=(_period(20),),
+        overlay=True,
+    ),
+    Indicator(
+        "ema",
+        "Exponential Moving Average",
+        indicators.ema,
+        params=(_period(20),),
+        overlay=True,
+    ),
+    Indicator("rsi", "Relative Strength Index", indicators.rsi, params=(_period(14),)),
+    Indicator(
+        "macd",
+        "MACD",
+        indicators.macd,
+        params=(Param("slow", 26), Param("fast", 12), Param("signal", 9)),
+        outputs=("macd", "signal"),
+    ),
+    Indicator(
+        "bollinger",
+        "Bollinger Bands",
+        indicators.bollinger,
+        params=(_period(20), Param("num_std", 2, 0.5, 5, float)),
+        outputs=("upper", "lower"),
+        overlay=True,
+    ),
+    Indicator(
+        "cci",
+        "Commodity Channel Index",
+        indicators.cci,
+        ("high", "low", "close"),
+        (_period(20),),
+    ),
+    Indicator(
+        "atr",
+        "Average True Range",
+        indicators.atr,
+        ("high", "low", "close"),
+        (_period(14),),
+    ),
+    Indicator(
+        "stochastic",
+        "Stochastic Oscillator",
+        indicators.stochastic,
+        ("high", "low", "close"),
+        (_period(14), Param("smooth", 3, 1, 50)),
+        outputs=("k", "d"),
+    ),
+    Indicator("obv", "On-Balance Volume", indicators.obv, ("close", "volume")),
+    Indicator(
+        "vwap",
+        "Volume-Weighted Average Price",
+        indicators.vwap,
+        ("high", "low", "close", "volume"),
+        (_period(20),),
+        overlay=True,
+    ),
+):
+    register(_indicator)
+
+
+def parse_request(tokens: str) -> list[tuple[Indicator, tuple]]:
+    """Parse ``"sma:20,rsi,bollinger:20:2"`` into indicators with parameters."""
+    parsed = []
+    for token in (t.strip() for t in tokens.split(",")):
+        if not token:
+            continue
+        name, *raw = token.split(":")
+        indicator = REGISTRY.get(name.lower())
+        if indicator is None:
+            raise IndicatorError(f"Unknown indicator: {name}")
+        if len(raw) > len(indicator.params):
+            raise IndicatorError(f"Too many parameters for {indicator.name}")
+        raw += [None] * (len(indicator.params) - len(raw))
+        params = tuple(p.parse(r) for p, r in zip(indicator.params, raw))
+        if (indicator, params) not in parsed:
+            parsed.append((indicator, params))
+    if len(parsed) > MAX_INDICATORS:
+        raise IndicatorError(f"At most {MAX_INDICATORS} indicators per request")
+    return parsed
+
+
+def column_key(indicator: Indicator, params: tuple, output: str) -> str:
+    """Column name for one output, e.g. ``sma:20`` or ``bollinger:20:2.upper``."""
+    key = ":".join([indicator.name, *(format(p, "g") for p in params)])
+    return key if len(indicator.outputs) == 1 else f"{key}.{output}"
+
+
+def compute(
+    symbol: str,
+    columns: dict[str, list[float | None]],
+    requested: list[tuple[Indicator, tuple]],
+) -> dict[str, list[float | None]]:
+    """Evaluate ``requested`` indicators over ``columns``.
+
+    Price columns are converted to arrays once and shared by every
+    indicator. Results are cached per symbol and indicator parameters
+    together with the series fingerprint they were computed from.
+    """
+    arrays: dict[str, np.ndarray] = {}
+    fingerprints: dict[tuple[str, ...], str] = {}
+    out: dict[str, list[float | None]] = {}
+    for indicator, params in requested:
+        inputs = indicator.inputs
+        if inputs not in fingerprints:
+            fingerprints[inputs] = series_fingerprint(*(columns[c] for c in inputs))
+        # one entry per indicator and parameters, replaced when the series changes
+        key = f"indicator:{symbol}:{column_key(indicator, params, '')}"
+        cached = _get_cached(key)
+        if cached is not None and cached[0] == fingerprints[inputs]:
+            values = cached[1]
+        else:
+            for name in inputs:
+                if name not in arrays:
+                    arrays[name] = indicators.to_array(columns[name])
+            result = indicator.func(*(arrays[c] for c in inputs), *params)
+            if len(indicator.outputs) == 1:
+                result = (result,)
+            values = [indicators.to_list(r) for r in result]
+            _set_cached(key, (fingerprints[inputs], values))
+        for output, series in zip(indicator.outputs, values):
+            out[column_key(indicator, params, output)] = series
+    return out
@@ -0,0 +1,371 @@
+"""NumPy implementations of the technical indicators used in charts and alerts.
+
+Functions here take sequences of prices and return float arrays padded with
+``nan`` where a value is not yet defined. :mod:`stockapp.utils` wraps them to
+return the rounded, ``None``-padded lists the views and templates expect.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Rows processed at once when a window has to be materialised
+_CHUNK = 65536
+
+
+def to_array(values: Sequence[float | None] | np.ndarray) -> np.ndarray:
+    """Return ``values`` as a float array with ``None`` mapped to ``nan``."""
+    if isinstance(values, np.ndarray):
+        return values.astype(float, copy=False)
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+
+def to_list(values: np.ndarray, ndigits: int = 2) -> list[float | None]:
+    """Round ``values`` and replace ``nan`` with ``None``."""
+    return [None if v != v else round(v, ndigits) for v in values.tolist()]
+
+
+def _check_period(period: int) -> None:
+    if period < 1:
+        raise ValueError("period must be positive")
+
+
+def rolling_sum(values: np.ndarray, period: int) -> np.ndarray:
+    """Sum of each trailing ``period`` window, aligned to the window end.
+
+    Uses a cumulative sum so the cost is O(n) regardless of ``period``.
+    The first ``period - 1`` entries and windows containing a gap are ``nan``.
+    """
+    _check_period(period)
+    n = len(values)
+    out = np.full(n, np.nan)
+    if n < period:
+        return out
+    # centre the data first to limit cancellation error in long series
+    missing = np.isnan(values)
+    finite = values[~missing]
+    shift = finite.mean() if finite.size else 0.0
+    csum = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, values - shift))))
+    out[period - 1 :] = csum[period:] - csum[:-period] + shift * period
+    if missing.any():
+        gaps = np.concatenate(([0], np.cumsum(missing)))
+        out[period - 1 :][gaps[period:] - gaps[:-period] > 0] = np.nan
+    return out
+
+
+def sma(prices: Sequence[float | None] | np.ndarray, period: int) -> np.ndarray:
+    """Simple moving average."""
+    return rolling_sum(to_array(prices), period) / period
+
+
+def rolling_std(prices: Sequence[float | None] | np.ndarray, period: int) -> np.ndarray:
+    """Population standard deviation of each trailing window."""
+    x = to_array(prices)
+    finite = x[np.isfinite(x)]
+    centred = x - (finite.mean() if finite.size else 0.0)
+    mean = rolling_sum(centred, period) / period
+    mean_sq = rolling_sum(centred * centred, period) / period
+    return np.sqrt(np.clip(mean_sq - mean * mean, 0.0, None))
+
+
+def smooth_wilder(values: np.ndarray, period: int) -> np.ndarray:
+    """Wilder smoothing seeded with the simple mean of the first window.
+
+    Missing values are skipped: they come out as ``nan`` and smoothing
+    carries on from the last average once values resume.
+    """
+    _check_period(period)
+    out = np.full(len(values), np.nan)
+    alpha = 1.0 / period
+    seed: list[float] = []
+    avg = None
+    for i, v in enumerate(values.tolist()):
+        if v != v:
+            continue
+        if avg is None:
+            seed.append(v)
+            if len(seed) < period:
+                continue
+            avg = sum(seed) / period
+        else:
+            avg += alpha * (v - avg)
+        out[i] = avg
+    return out
+
+
+def rsi(
+    prices: Sequence[float | None] | np.ndarray,
+    period: int = 14,
+    method: str = "simple",
+) -> np.ndarray:
+    """Relative Strength Index.
+
+    ``method="simple"`` averages gains and losses over the trailing window,
+    matching the historic output of :func:`stockapp.utils.calculate_rsi`.
+    ``method="wilder"`` applies Wilder's smoothing instead.
+    """
+    _check_period(period)
+    x = to_array(prices)
+    n = len(x)
+    out = np.full(n, np.nan)
+    if n <= period:
+        return out
+    deltas = np.diff(x)
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+    gains[np.isnan(deltas)] = np.nan
+    losses[np.isnan(deltas)] = np.nan
+    if method == "simple":
+        avg_gain = rolling_sum(gains, period)[period - 1 :] / period
+        avg_loss = rolling_sum(losses, period)[period - 1 :] / period
+        # count losing days exactly so flat or rising windows give 100
+        losing = rolling_sum((deltas < 0).astype(float), period)[period - 1 :]
+        no_loss = losing < 0.5
+    elif method == "wilder":
+        avg_gain = smooth_wilder(gains, period)[period - 1 :]
+        avg_loss = smooth_wilder(losses, period)[period - 1 :]
+        no_loss = avg_loss == 0
+    else:
+        raise ValueError(f"Unknown RSI method: {method}")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = 100 - 100 / (1 + avg_gain / avg_loss)
+    values[no_loss & np.isfinite(avg_gain)] = 100.0
+    out[period:] = values
+    return out
+
+
+def bollinger(
+    prices: Sequence[float | None] | np.ndarray, period: int = 20, num_std: float = 2
+) -> tuple[np.ndarray, np.ndarray]:
+    """Upper and lower Bollinger Bands."""
+    x = to_array(prices)
+    mid = sma(x, period)
+    width = num_std * rolling_std(x, period)
+    return mid + width, mid - width
+
+
+def cci(
+    highs: Sequence[float | None] | np.ndarray,
+    lows: Sequence[float | None] | np.ndarray,
+    closes: Sequence[float | None] | np.ndarray,
+    period: int = 20,
+) -> np.ndarray:
+    """Commodity Channel Index.
+
+    The moving average is O(n). Mean absolute deviation has no running-sum
+    form, so it is evaluated on strided window views in bounded chunks.
+    """
+    _check_period(period)
+    h, lo, c = to_array(highs), to_array(lows), to_array(closes)
+    n = min(len(h), len(lo), len(c))
+    typical = (h[:n] + lo[:n] + c[:n]) / 3
+    out = np.full(n, np.nan)
+    if n < period:
+        return out
+    mean = sma(typical, period)[period - 1 :]
+    windows = sliding_window_view(typical, period)
+    mean_dev = np.empty(len(windows))
+    for start in range(0, len(windows), _CHUNK):
+        stop = start + _CHUNK
+        block = windows[start:stop]
+        mean_dev[start:stop] = np.abs(block - mean[start:stop, None]).mean(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = (typical[period - 1 :] - mean) / (0.015 * mean_dev)
+    # a flat window has no deviation; treat rounding residue as zero too
+    values[mean_dev <= 1e-12 * np.abs(mean)] = 0.0
+    out[period - 1 :] = values
+    return out
+
+
+def align_right(
+    series: Sequence[Sequence[float | None]], length: int | None = None
+) -> np.ndarray:
+    """Stack ``series`` into a ``(len(series), length)`` array.
+
+    Rows are aligned on their most recent value; shorter series are padded
+    on the left with ``nan``. ``length`` defaults to the longest series.
+    """
+    if length is None:
+        length = max((len(s) for s in series), default=0)
+    out = np.full((len(series), length), np.nan)
+    for row, values in enumerate(series):
+        values = to_array(values)[-length:] if length else values[:0]
+        if len(values):
+            out[row, length - len(values) :] = values
+    return out
+
+
+def latest_sma(closes: np.ndarray, period: int) -> np.ndarray:
+    """Latest simple moving average for each row of ``closes``.
+
+    Rows without ``period`` trailing values are ``nan``.
+    """
+    _check_period(period)
+    if closes.shape[1] < period:
+        return np.full(closes.shape[0], np.nan)
+    return closes[:, -period:].mean(axis=1)
+
+
+def latest_rsi(
+    closes: np.ndarray, period: int = 14, method: str = "simple"
+) -> np.ndarray:
+    """Latest RSI for each row of ``closes``, matching :func:`rsi`."""
+    _check_period(period)
+    rows = closes.shape[0]
+    if closes.shape[1] <= period:
+        return np.full(rows, np.nan)
+    if method == "simple":
+        deltas = np.diff(closes[:, -(period + 1) :], axis=1)
+        avg_gain = np.where(deltas > 0, deltas, 0.0).sum(axis=1) / period
+        avg_loss = np.where(deltas < 0, -deltas, 0.0).sum(axis=1) / period
+        no_loss = ~(deltas < 0).any(axis=1)
+        valid = ~np.isnan(deltas).any(axis=1)
+    elif method == "wilder":
+        deltas = np.diff(closes, axis=1)
+        gains = np.where(deltas > 0, deltas, 0.0)
+        losses = np.where(deltas < 0, -deltas, 0.0)
+        seen = np.zeros(rows, dtype=int)
+        avg_gain = np.zeros(rows)
+        avg_loss = np.zeros(rows)
+        # walk the columns once, smoothing every row from its own first bar
+        for col in range(deltas.shape[1]):
+            present = ~np.isnan(deltas[:, col])
+            seen += present
+            warm = present & (seen <= period)
+            avg_gain[warm] += gains[warm, col] / period
+            avg_loss[warm] += losses[warm, col] / period
+            hot = present & (seen > period)
+            avg_gain[hot] += (gains[hot, col] - avg_gain[hot]) / period
+            avg_loss[hot] += (losses[hot, col] - avg_loss[hot]) / period
+        no_loss = avg_loss == 0
+        valid = seen >= period
+    else:
+        raise ValueError(f"Unknown RSI method: {method}")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100 - 100 / (1 + avg_gain / avg_loss)
+    out[no_loss] = 100.0
+    out[~valid] = np.nan
+    return out
+
+
+def deviation_pct(prices: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """Absolute percentage distance of ``prices`` from ``reference``."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.abs(prices - reference) / reference * 100
+    out[~np.isfinite(out)] = np.nan
+    return out
+
+
+def ema(values: Sequence[float | None] | np.ndarray, span: int) -> np.ndarray:
+    """Exponential moving average seeded with the first value.
+
+    Missing values are skipped: they come out as ``nan`` and the average
+    carries on from the last known value.
+    """
+    _check_period(span)
+    x = to_array(values)
+    out = np.full(len(x), np.nan)
+    alpha = 2 / (span + 1)
+    current = None
+    for i, v in enumerate(x.tolist()):
+        if v != v:
+            continue
+        current = v if current is None else current + alpha * (v - current)
+        out[i] = current
+    return out
+
+
+def macd(
+    prices: Sequence[float | None] | np.ndarray,
+    slow: int = 26,
+    fast: int = 12,
+    signal: int = 9,
+) -> tuple[np.ndarray, np.ndarray]:
+    """MACD line and signal line, as in :func:`stockapp.utils.calculate_macd`."""
+    x = to_array(prices)
+    line = ema(x, fast) - ema(x, slow)
+    return line, ema(line, signal)
+
+
+def _rolling_extreme(values: np.ndarray, period: int, func) -> np.ndarray:
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        out[period - 1 :] = func(sliding_window_view(values, period), axis=1)
+    return out
+
+
+def atr(
+    highs: Sequence[float | None] | np.ndarray,
+    lows: Sequence[float | None] | np.ndarray,
+    closes: Sequence[float | None] | np.ndarray,
+    period: int = 14,
+) -> np.ndarray:
+    """Average True Range with Wilder smoothing."""
+    h, lo, c = to_array(highs), to_array(lows), to_array(closes)
+    n = min(len(h), len(lo), len(c))
+    h, lo, c = h[:n], lo[:n], c[:n]
+    out = np.full(n, np.nan)
+    if n < 2:
+        return out
+    prev = c[:-1]
+    true_range = np.maximum.reduce(
+        [h[1:] - lo[1:], np.abs(h[1:] - prev), np.abs(lo[1:] - prev)]
+    )
+    out[1:] = smooth_wilder(true_range, period)
+    return out
+
+
+def stochastic(
+    highs: Sequence[float | None] | np.ndarray,
+    lows: Sequence[float | None] | np.ndarray,
+    closes: Sequence[float | None] | np.ndarray,
+    period: int = 14,
+    smooth: int = 3,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Stochastic oscillator %K and its ``smooth``-bar average %D."""
+    _check_period(period)
+    h, lo, c = to_array(highs), to_array(lows), to_array(closes)
+    n = min(len(h), len(lo), len(c))
+    highest = _rolling_extreme(h[:n], period, np.max)
+    lowest = _rolling_extreme(lo[:n], period, np.min)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = (c[:n] - lowest) / (highest - lowest) * 100
+    # a flat window has no range; report the midpoint
+    k[(highest == lowest) & np.isfinite(highest)] = 50.0
+    return k, sma(k, smooth)
+
+
+def obv(
+    closes: Sequence[float | None] | np.ndarray,
+    volumes: Sequence[float | None] | np.ndarray,
+) -> np.ndarray:
+    """On-Balance Volume, starting from zero at the first bar."""
+    c, v = to_array(closes), to_array(volumes)
+    n = min(len(c), len(v))
+    out = np.zeros(n)
+    if n > 1:
+        direction = np.sign(np.diff(c[:n]))
+        out[1:] = np.nancumsum(direction * v[1:n])
+    return out
+
+
+def vwap(
+    highs: Sequence[float | None] | np.ndarray,
+    lows: Sequence[float | None] | np.ndarray,
+    closes: Sequence[float | None] | np.ndarray,
+    volumes: Sequence[float | None] | np.ndarray,
+    period: int = 20,
+) -> np.ndarray:
+    """Rolling volume-weighted average of the typical price over ``period`` bars."""
+    h, lo, c, v = (to_array(a) for a in (highs, lows, closes, volumes))
+    n = min(len(h), len(lo), len(c), len(v))
+    typical = (h[:n] + lo[:n] + c[:n]) / 3
+    weighted = rolling_sum(typical * v[:n], period)
+    volume = rolling_sum(v[:n], period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = weighted / volume
+    out[~np.isfinite(out)] = np.nan
+    return out
@@ -0,0 +1,90 @@
+"""In-memory intraday OHLC bars built from realtime price ticks."""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any
+
+# Supported bar sizes in seconds (1 minute and 5 minutes)
+INTERVALS = (60, 300)
+# Bars kept per symbol and interval; 390 covers a full US session of 1m bars
+INTRADAY_MAX_BARS = int(os.environ.get("INTRADAY_MAX_BARS", 390))
+
+
+class BarAggregator:
+    """Aggregate price ticks into fixed-size OHLC bars per symbol.
+
+    Each ``(symbol, interval)`` pair keeps a ring buffer of at most
+    ``max_bars`` bars so memory use stays bounded however long the
+    process runs. Bars are stored as ``[start, open, high, low, close]``
+    lists with ``start`` in epoch seconds.
+    """
+
+    def __init__(
+        self, intervals: tuple[int, ...] = INTERVALS, max_bars: int = INTRADAY_MAX_BARS
+    ) -> None:
+        self.intervals = intervals
+        self.max_bars = max_bars
+        self._bars: dict[tuple[str, int], deque] = {}
+        self._lock = threading.Lock()
+
+    def add_tick(
+        self, symbol: str, price: float | None, ts: float | None = None
+    ) -> None:
+        """Record ``price`` for ``symbol`` observed at ``ts`` (defaults to now)."""
+        if price is None:
+            return
+        try:
+            price = float(price)
+        except (TypeError, ValueError):
+            return
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            for interval in self.intervals:
+                start = int(ts // interval * interval)
+                key = (symbol, interval)
+                bars = self._bars.get(key)
+                if bars is None:
+                    bars = self._bars[key] = deque(maxlen=self.max_bars)
+                if bars and bars[-1][0] == start:
+                    bar = bars[-1]
+                    bar[2] = max(bar[2], price)
+                    bar[3] = min(bar[3], price)
+                    bar[4] = price
+                elif not bars or start > bars[-1][0]:
+                    bars.append([start, price, price, price, price])
+                # ticks older than the current bar arrive late and are ignored
+
+    def get_bars(
+        self, symbol: str, interval: int = 60, limit: int | None = None
+    ) -> dict[str, Any]:
+        """Return bars for ``symbol`` as columnar lists, oldest first."""
+        if interval not in self.intervals:
+            raise ValueError(f"Unsupported interval: {interval}")
+        with self._lock:
+            bars = list(self._bars.get((symbol, interval), ()))
+        if limit:
+            bars = bars[-limit:]
+        return {
+            "symbol": symbol,
+            "interval": interval,
+            "t": [b[0] for b in bars],
+            "open": [b[1] for b in bars],
+            "high": [b[2] for b in bars],
+            "low": [b[3] for b in bars],
+            "close": [b[4] for b in bars],
+        }
+
+    def clear(self, symbol: str | None = None) -> None:
+        """Drop stored bars for ``symbol`` or for every symbol."""
+        with self._lock:
+            if symbol is None:
+                self._bars.clear()
+            else:
+                for key in [k for k in self._bars if k[0] == symbol]:
+                    del self._bars[key]
+
+
+# Process-wide aggregator fed by the realtime price endpoints
+aggregator = BarAggregator()
@@ -0,0 +1,456 @@
+"""Incremental indicators for realtime price streams.
+
+Each indicator keeps just enough state to fold in one new price in O(1)
+(CCI is O(period) because mean deviation needs the whole window).
+``update`` commits a completed bar while ``peek`` returns the value the
+indicator would have if the current tick closed the bar, without changing
+state. That lets a stream seeded with daily closes report live values for
+today's still-forming bar. State round-trips through ``to_state`` and
+``from_state`` so seeded indicators can be kept in the cache.
+"""
+
+from __future__ import annotations
+
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Iterable
+
+from .utils import _get_cached, _set_cached, get_historical_prices
+
+logger = logging.getLogger(__name__)
+
+# Calendar days of history used to seed live indicators (covers a 50-bar SMA)
+SEED_DAYS = 120
+
+
+class StreamingIndicator(ABC):
+    """Base class for incremental indicators."""
+
+    kind = ""
+
+    @abstractmethod
+    def update(self, price: float) -> Any:
+        """Fold ``price`` into the state and return the new value."""
+
+    @abstractmethod
+    def peek(self, price: float) -> Any:
+        """Return the value after ``price`` without changing the state."""
+
+    @property
+    @abstractmethod
+    def value(self) -> Any:
+        """Latest committed value, ``None`` until enough prices were seen."""
+
+    def seed(self, prices: Iterable[float | None]) -> "StreamingIndicator":
+        """Update with every non-missing price in ``prices``."""
+        for price in prices:
+            if price is not None:
+                self.update(price)
+        return self
+
+    def to_state(self) -> dict[str, Any]:
+        """Return a picklable and JSON-serialisable snapshot."""
+        state = {
+            k: list(v) if isinstance(v, deque) else v for k, v in vars(self).items()
+        }
+        state["kind"] = self.kind
+        return state
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> "StreamingIndicator":
+        """Rebuild an indicator from :meth:`to_state` output."""
+        state = dict(state)
+        kind = _KINDS[state.pop("kind")]
+        obj = kind.__new__(kind)
+        for key, val in state.items():
+            if key == "window":
+                val = deque(val, maxlen=state["period"])
+            setattr(obj, key, val)
+        return obj
+
+
+class SMA(StreamingIndicator):
+    """Simple moving average using a running window sum."""
+
+    kind = "sma"
+
+    def __init__(self, period: int) -> None:
+        if period < 1:
+            raise ValueError("period must be positive")
+        self.period = period
+        self.window: deque = deque(maxlen=period)
+        self.total = 0.0
+
+    def _next_total(self, price: float) -> float:
+        dropped = self.window[0] if len(self.window) == self.period else 0.0
+        return self.total + price - dropped
+
+    def update(self, price: float) -> float | None:
+        self.total = self._next_total(price)
+        self.window.append(price)
+        return self.value
+
+    def peek(self, price: float) -> float | None:
+        if len(self.window) + 1 < self.period:
+            return None
+        return self._next_total(price) / self.period
+
+    @property
+    def value(self) -> float | None:
+        if len(self.window) < self.period:
+            return None
+        return self.total / self.period
+
+
+class EMA(StreamingIndicator):
+    """Exponential moving average seeded with the first price."""
+
+    kind = "ema"
+
+    def __init__(self, span: int) -> None:
+        if span < 1:
+            raise ValueError("span must be positive")
+        self.span = span
+        self.alpha = 2 / (span + 1)
+        self.current: float | None = None
+
+    def peek(self, price: float) -> float:
+        if self.current is None:
+            return price
+        return self.current + self.alpha * (price - self.current)
+
+    def update(self, price: float) -> float:
+        self.current = self.peek(price)
+        return self.current
+
+    @property
+    def value(self) -> float | None:
+        return self.current
+
+
+class MACD(StreamingIndicator):
+    """MACD line and signal line, matching :func:`stockapp.utils.calculate_macd`."""
+
+    kind = "macd"
+
+    def __init__(self, slow: int = 26, fast: int = 12, signal: int = 9) -> None:
+        self.slow = slow
+        self.fast = fast
+        self.signal = signal
+        self.ema_fast: float | None = None
+        self.ema_slow: float | None = None
+        self.macd = 0.0
+        self.signal_line = 0.0
+
+    def _step(self, price: float) -> tuple[float, float, float, float]:
+        if self.ema_fast is None:
+            return price, price, 0.0, 0.0
+        ema_fast = self.ema_fast + (2 / (self.fast + 1)) * (price - self.ema_fast)
+        ema_slow = self.ema_slow + (2 / (self.slow + 1)) * (price - self.ema_slow)
+        macd = ema_fast - ema_slow
+        signal = self.signal_line + (2 / (self.signal + 1)) * (macd - self.signal_line)
+        return ema_fast, ema_slow, macd, signal
+
+    def update(self, price: float) -> tuple[float, float]:
+        self.ema_fast, self.ema_slow, self.macd, self.signal_line = self._step(price)
+        return self.value
+
+    def peek(self, price: float) -> tuple[float, float]:
+        _fast, _slow, macd, signal = self._step(price)
+        return macd, signal
+
+    @property
+    def value(self) -> tuple[float, float] | None:
+        if self.ema_fast is None:
+            return None
+        return self.macd, self.signal_line
+
+
+class RSI(StreamingIndicator):
+    """Relative Strength Index.
+
+    ``method="wilder"`` applies Wilder's smoothing; ``method="simple"``
+    averages the trailing window like :func:`stockapp.utils.calculate_rsi`.
+    """
+
+    kind = "rsi"
+
+    def __init__(self, period: int = 14, method: str = "wilder") -> None:
+        if period < 1:
+            raise ValueError("period must be positive")
+        if method not in ("wilder", "simple"):
+            raise ValueError(f"Unknown RSI method: {method}")
+        self.period = period
+        self.method = method
+        self.last: float | None = None
+        self.count = 0
+        # trailing price changes with their gain/loss sums and losing count
+        self.window: deque = deque(maxlen=period)
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        self.losing = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def _step(self, price: float) -> dict[str, Any]:
+        delta = price - self.last
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        state = {
+            "count": self.count + 1,
+            "gain_sum": self.gain_sum + gain,
+            "loss_sum": self.loss_sum + loss,
+            "losing": self.losing + (delta < 0),
+            "avg_gain": self.avg_gain,
+            "avg_loss": self.avg_loss,
+        }
+        if len(self.window) == self.period:
+            old = self.window[0]
+            state["gain_sum"] -= max(old, 0.0)
+            state["loss_sum"] -= max(-old, 0.0)
+            state["losing"] -= old < 0
+        if state["count"] == self.period:
+            state["avg_gain"] = state["gain_sum"] / self.period
+            state["avg_loss"] = state["loss_sum"] / self.period
+        elif state["count"] > self.period:
+            state["avg_gain"] += (gain - self.avg_gain) / self.period
+            state["avg_loss"] += (loss - self.avg_loss) / self.period
+        return state
+
+    def _value(self, state: dict[str, Any]) -> float | None:
+        if state["count"] < self.period:
+            return None
+        if self.method == "simple":
+            if not state["losing"]:
+                return 100.0
+            return 100 - 100 / (1 + state["gain_sum"] / state["loss_sum"])
+        if state["avg_loss"] == 0:
+            return 100.0
+        return 100 - 100 / (1 + state["avg_gain"] / state["avg_loss"])
+
+    def update(self, price: float) -> float | None:
+        if self.last is not None:
+            state = self._step(price)
+            self.window.append(price - self.last)
+            for key, val in state.items():
+                setattr(self, key, val)
+        self.last = price
+        return self.value
+
+    def peek(self, price: float) -> float | None:
+        if self.last is None:
+            return None
+        return self._value(self._step(price))
+
+    @property
+    def value(self) -> float | None:
+        return self._value(
+            {
+                "count": self.count,
+                "gain_sum": self.gain_sum,
+                "loss_sum": self.loss_sum,
+                "losing": self.losing,
+                "avg_gain": self.avg_gain,
+                "avg_loss": self.avg_loss,
+            }
+        )
+
+
+class Bollinger(StreamingIndicator):
+    """Bollinger Bands from running sums of price and squared price.
+
+    Prices are offset by the first observation so the running variance
+    does not lose precision for large price levels.
+    """
+
+    kind = "bollinger"
+
+    def __init__(self, period: int = 20, num_std: float = 2) -> None:
+        if period < 1:
+            raise ValueError("period must be positive")
+        self.period = period
+        self.num_std = num_std
+        self.offset: float | None = None
+        self.window: deque = deque(maxlen=period)
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def _sums(self, price: float) -> tuple[float, float, float]:
+        offset = price if self.offset is None else self.offset
+        x = price - offset
+        if len(self.window) == self.period:
+            old = self.window[0]
+            return offset, self.total + x - old, self.total_sq + x * x - old * old
+        return offset, self.total + x, self.total_sq + x * x
+
+    def _bands(self, offset: float, total: float, total_sq: float):
+        mean = total / self.period
+        std = max(total_sq / self.period - mean * mean, 0.0) ** 0.5
+        mid = mean + offset
+        return mid + self.num_std * std, mid - self.num_std * std
+
+    def update(self, price: float) -> tuple[float, float] | None:
+        self.offset, self.total, self.total_sq = self._sums(price)
+        self.window.append(price - self.offset)
+        return self.value
+
+    def peek(self, price: float) -> tuple[float, float] | None:
+        if len(self.window) + 1 < self.period:
+            return None
+        return self._bands(*self._sums(price))
+
+    @property
+    def value(self) -> tuple[float, float] | None:
+        if len(self.window) < self.period:
+            return None
+        return self._bands(self.offset, self.total, self.total_sq)
+
+
+class CCI(StreamingIndicator):
+    """Commodity Channel Index over typical prices.
+
+    ``update`` takes a close plus optional high and low; with only a price
+    the typical price is the price itself, as for realtime ticks.
+    """
+
+    kind = "cci"
+
+    def __init__(self, period: int = 20) -> None:
+        if period < 1:
+            raise ValueError("period must be positive")
+        self.period = period
+        self.window: deque = deque(maxlen=period)
+        self.total = 0.0
+
+    @staticmethod
+    def _typical(close: float, high: float | None, low: float | None) -> float:
+        high = close if high is None else high
+        low = close if low is None else low
+        return (high + low + close) / 3
+
+    def _cci(self, window: list[float], total: float) -> float:
+        mean = total / self.period
+        mean_dev = sum(abs(x - mean) for x in window) / self.period
+        if mean_dev <= 1e-12 * abs(mean):
+            return 0.0
+        return (window[-1] - mean) / (0.015 * mean_dev)
+
+    def update(
+        self, price: float, high: float | None = None, low: float | None = None
+    ) -> float | None:
+        typical = self._typical(price, high, low)
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(typical)
+        self.total += typical
+        return self.value
+
+    def peek(
+        self, price: float, high: float | None = None, low: float | None = None
+    ) -> float | None:
+        if len(self.window) + 1 < self.period:
+            return None
+        typical = self._typical(price, high, low)
+        window = list(self.window)
+        total = self.total + typical
+        if len(window) == self.period:
+            total -= window.pop(0)
+        return self._cci(window + [typical], total)
+
+    @property
+    def value(self) -> float | None:
+        if len(self.window) < self.period:
+            return None
+        return self._cci(list(self.window), self.total)
+
+
+_KINDS = {cls.kind: cls for cls in (SMA, EMA, MACD, RSI, Bollinger, CCI)}
+
+
+def _round(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, tuple):
+        return [round(v, 2) for v in value]
+    return round(value, 2)
+
+
+class IndicatorSet:
+    """A named group of streaming indicators fed the same prices."""
+
+    def __init__(self, indicators: dict[str, StreamingIndicator]) -> None:
+        self.indicators = indicators
+        self.last_date: str | None = None
+
+    @classmethod
+    def default(cls) -> "IndicatorSet":
+        """Indicators shown alongside live prices."""
+        return cls(
+            {
+                "sma20": SMA(20),
+                "sma50": SMA(50),
+                "rsi14": RSI(14),
+                "macd": MACD(),
+                "bollinger": Bollinger(20, 2),
+            }
+        )
+
+    def seed(self, prices: Iterable[float | None]) -> "IndicatorSet":
+        for price in prices:
+            if price is not None:
+                self.update(price)
+        return self
+
+    def update(self, price: float) -> dict[str, Any]:
+        """Commit ``price`` as a completed bar and return rounded values."""
+        return {k: _round(ind.update(price)) for k, ind in self.indicators.items()}
+
+    def peek(self, price: float) -> dict[str, Any]:
+        """Rounded values if ``price`` closed the current bar."""
+        return {k: _round(ind.peek(price)) for k, ind in self.indicators.items()}
+
+    def values(self) -> dict[str, Any]:
+        return {k: _round(ind.value) for k, ind in self.indicators.items()}
+
+    def to_state(self) -> dict[str, Any]:
+        return {
+            "last_date": self.last_date,
+            "indicators": {k: ind.to_state() for k, ind in self.indicators.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> "IndicatorSet":
+        obj = cls(
+            {
+                k: StreamingIndicator.from_state(s)
+                for k, s in state["indicators"].items()
+            }
+        )
+        obj.last_date = state.get("last_date")
+        return obj
+
+
+def load_indicator_set(symbol: str) -> IndicatorSet | None:
+    """Return the default indicators for ``symbol`` seeded with daily closes.
+
+    Seeded state is cached so concurrent streams for one symbol share the
+    history download. Returns ``None`` when no history is available.
+    """
+    cache_key = ("live_indicators", symbol)
+    state = _get_cached(cache_key)
+    if state:
+        try:
+            return IndicatorSet.from_state(state)
+        except Exception:
+            logger.exception("Invalid cached indicator state for %s", symbol)
+    try:
+        dates, prices = get_historical_prices(symbol, days=SEED_DAYS)
+    except Exception:
+        logger.exception("Failed to load history for live indicators on %s", symbol)
+        return None
+    if not prices:
+        return None
+    live = IndicatorSet.default().seed(prices)
+    live.last_date = dates[-1] if dates else None
+    _set_cached(cache_key, live.to_state())
+    return live
@@ -11,31 +11,37 @@ from flask import (
 from flask_login import current_user
 from babel.numbers import format_currency, format_decimal
 import json
+from typing import Iterator
 from ..utils import (
     get_stock_data,
-    get_realtime_data,
-    get_realtime_data_async,
     get_historical_ohlc,
     get_locale,
     ALERT_PE_THRESHOLD,
     moving_average,
     calculate_rsi,
-    calculate_macd,
-    bollinger_bands,
-    calculate_cci,
+    cached_indicator,
     notify_user_push,
     convert_currency,
+    cache_timestamp,
 )
-import asyncio
 from .export_helpers import (
     csv_response,
     xlsx_response,
     json_response,
     pdf_response,
 )
-import time
 from ..extensions import db, sock
-from ..models import History, Alert, WatchlistItem, StockRecord
+from ..http_cache import cached_view
+from ..activity import get_activity_recorder
+from ..alert_state import should_alert
+from ..models import History, Alert, WatchlistItem
+from ..realtime import (
+    DeltaEncoder,
+    SlowConsumerError,
+    get_price_hub,
+    stream_symbols,
+    valid_symbol,
+)
 
 main_bp = Blueprint("main", __name__)
 
@@ -53,388 +59,343 @@ def health() -> tuple[str, int]:
 
 @main_bp.route("/stream_price")
 def stream_price() -> Response:
-    """Server-Sent Events endpoint streaming price and EPS."""
-    symbol = request.args.get("symbol", "").upper()
+    """Server-Sent Events endpoint streaming price, EPS and live indicators."""
+    symbol = request.args.get("symbol", "").strip().upper()
     if not symbol:
         return "Symbol required", 400
+    if not valid_symbol(symbol):
+        return "Invalid symbol", 400
+
+    # a reconnecting EventSource sends the id of the last event it received
+    since = request.headers.get("Last-Event-ID", type=int)
+    if since is None:
+        since = request.args.get("since", type=int)
+    hub = get_price_hub()
+    encoder = DeltaEncoder(hub.state_at(symbol, since))
+    heartbeat = current_app.config.get("STREAM_HEARTBEAT_INTERVAL", 15)
+    testing = current_app.config.get("TESTING")
 
     def generate():
-        loops = 0
-        while True:
-            try:
-                if current_app.config.get("ASYNC_REALTIME"):
-                    price, eps = asyncio.run(
-                        get_realtime_data_async(
-                            symbol,
-                            current_app.config.get("REALTIME_PROVIDER", "fmp"),
-                        )
-                    )
+        # subscribe only once the body is streamed, so a HEAD request or a
+        # response closed before it starts never holds a subscription
+        with hub.subscribe(symbol) as sub:
+            sent = 0
+            while True:
+                try:
+                    tick = sub.get(timeout=heartbeat)
+                except SlowConsumerError:
+                    # the client reconnects and resumes from Last-Event-ID
+                    break
+                if tick is None:
+                    yield ": heartbeat\n\n"
                 else:
-                    price, eps = get_realtime_data(
-                        symbol,
-                        current_app.config.get("REALTIME_PROVIDER", "fmp"),
-                    )
-                data = json.dumps({"price": price, "eps": eps})
-            except Exception:
-                data = json.dumps({"error": "fetch"})
-            yield f"data: {data}\n\n"
-            loops += 1
-            if current_app.config.get("TESTING") and loops >= 2:
-                break
-            time.sleep(current_app.config.get("PRICE_STREAM_INTERVAL", 5))
-
-    return Response(generate(), mimetype="text/event-stream")
+                    delta = encoder.encode(tick)
+                    if delta is None:
+                        continue
+                    yield f"id: {delta['seq']}\ndata: {json.dumps(delta)}\n\n"
+                sent += 1
+                if testing and sent >= 2:
+                    break
+
+    # keep reverse proxies such as nginx from buffering the stream
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
-@sock.route("/ws/price")
+@sock.route("/ws/price", bp=main_bp)
 def ws_price(ws) -> None:
-    """WebSocket endpoint streaming price and EPS."""
-    symbol = (ws.receive() or "").upper()
+    """WebSocket endpoint streaming price, EPS and live indicators.
+
+    A plain ticker as the first message streams that one symbol as delta
+    frames; ``?since=<seq>`` resumes after a reconnect. A JSON subscribe
+    message switches to the multi-symbol protocol handled by
+    :func:`stockapp.realtime.stream_symbols`.
+    """
+    heartbeat = current_app.config.get("STREAM_HEARTBEAT_INTERVAL", 15)
+    first = (ws.receive() or "").strip()
+    if first.startswith("{"):
+        stream_symbols(
+            ws,
+            first,
+            get_price_hub(),
+            current_app.config.get("WS_MAX_SYMBOLS", 50),
+            current_app.config.get("PRICE_STREAM_INTERVAL", 5),
+            heartbeat=heartbeat,
+            max_frames=2 if current_app.config.get("TESTING") else None,
+        )
+        return
+    symbol = first.upper()
     if not symbol:
         ws.send(json.dumps({"error": "symbol required"}))
         return
+    if not valid_symbol(symbol):
+        ws.send(json.dumps({"error": "invalid symbol"}))
+        return
 
-    loops = 0
-    while True:
-        try:
-            if current_app.config.get("ASYNC_REALTIME"):
-                price, eps = asyncio.run(
-                    get_realtime_data_async(
-                        symbol,
-                        current_app.config.get("REALTIME_PROVIDER", "fmp"),
-                    )
-                )
+    hub = get_price_hub()
+    encoder = DeltaEncoder(hub.state_at(symbol, request.args.get("since", type=int)))
+    testing = current_app.config.get("TESTING")
+    with hub.subscribe(symbol) as sub:
+        sent = 0
+        while True:
+            try:
+                tick = sub.get(timeout=heartbeat)
+            except SlowConsumerError as exc:
+                ws.send(json.dumps({"type": "error", "error": str(exc)}))
+                break
+            if tick is None:
+                ws.send(json.dumps({"type": "heartbeat"}))
             else:
-                price, eps = get_realtime_data(
-                    symbol,
-                    current_app.config.get("REALTIME_PROVIDER", "fmp"),
-                )
-            data = json.dumps({"price": price, "eps": eps})
-        except Exception:
-            data = json.dumps({"error": "fetch"})
-        ws.send(data)
-        loops += 1
-        if current_app.config.get("TESTING") and loops >= 2:
-            break
-        time.sleep(current_app.config.get("PRICE_STREAM_INTERVAL", 5))
+                delta = encoder.encode(tick)
+                if delta is None:
+                    continue
+                ws.send(json.dumps(delta))
+            sent += 1
+            if testing and sent >= 2:
+                break
+
+
+# fields returned by ``get_stock_data``, in order
+_STOCK_FIELDS = (
+    "company_name",
+    "logo_url",
+    "sector",
+    "industry",
+    "exchange",
+    "currency",
+    "price",
+    "eps",
+    "market_cap",
+    "debt_to_equity",
+    "pb_ratio",
+    "roe",
+    "roa",
+    "profit_margin",
+    "analyst_rating",
+    "dividend_yield",
+    "payout_ratio",
+    "earnings_growth",
+    "forward_pe",
+    "price_to_sales",
+    "ev_to_ebitda",
+    "price_to_fcf",
+    "current_ratio",
+)
+# rounded as they are; the percentage fields are stored as fractions
+_RATIO_FIELDS = (
+    "debt_to_equity",
+    "pb_ratio",
+    "forward_pe",
+    "price_to_sales",
+    "ev_to_ebitda",
+    "price_to_fcf",
+    "current_ratio",
+)
+_PERCENT_FIELDS = (
+    "roe",
+    "roa",
+    "profit_margin",
+    "dividend_yield",
+    "payout_ratio",
+    "earnings_growth",
+)
+
+
+def _quote(symbol: str) -> dict:
+    """Stock data for ``symbol`` with price and EPS in the viewer's currency."""
+    data = dict(zip(_STOCK_FIELDS, get_stock_data(symbol)))
+    currency = data["currency"]
+    target_currency = currency
+    if current_user.is_authenticated and current_user.default_currency:
+        target_currency = current_user.default_currency
+    for key in ("price", "eps"):
+        if data[key] is not None and currency != target_currency:
+            data[key] = convert_currency(data[key], currency, target_currency)
+    data["currency"] = target_currency
+    return data
+
+
+def _pe_ratio(data: dict) -> float | None:
+    if data["price"] is not None and data["eps"]:
+        return round(data["price"] / data["eps"], 2)
+    return None
+
+
+def _stock_version(symbol: str) -> tuple:
+    return get_stock_data(symbol), cache_timestamp(("stock", symbol))
 
 
 @main_bp.route("/", methods=["GET", "POST"])
 def index() -> str:
-    symbol = ""
-    price = eps = pe_ratio = valuation = company_name = logo_url = market_cap = None
-    sector = industry = exchange = currency = debt_to_equity = None
-    pb_ratio = roe = roa = profit_margin = analyst_rating = dividend_yield = (
-        payout_ratio
-    ) = None
-    earnings_growth = forward_pe = price_to_sales = ev_to_ebitda = price_to_fcf = (
-        current_ratio
-    ) = None
-    peg_ratio = None
-    error_message = alert_message = None
-    history_dates = history_prices = []
-    ma20 = ma50 = rsi_values = []
-    macd_vals = macd_signal = []
-    bb_upper = bb_lower = []
-    # calculators moved to separate blueprint
-
-    if request.method == "GET":
-        symbol = request.args.get("ticker", "").upper() or symbol
-
-    if current_user.is_authenticated:
-        history_entries = (
-            History.query.filter_by(user_id=current_user.id)
-            .order_by(History.timestamp.desc())
-            .limit(10)
-            .all()
-        )
-        history = [h.symbol for h in history_entries]
-    else:
-        history = session.get("history", [])
+    """Render the lookup page shell.
 
+    Nothing here waits on market data: the summary, alerts and chart are
+    fetched by the browser in parallel from their own endpoints, so the
+    page arrives at once and each part shows as soon as it is ready.
+    """
+    symbol = request.args.get("ticker", "").upper()
     if request.method == "POST":
         symbol = request.form.get("ticker", "").upper()
 
-    if symbol:
-        try:
-            (
-                company_name,
-                logo_url,
-                sector,
-                industry,
-                exchange,
-                currency,
-                price,
-                eps,
-                market_cap,
-                debt_to_equity,
-                pb_ratio,
-                roe,
-                roa,
-                profit_margin,
-                analyst_rating,
-                dividend_yield,
-                payout_ratio,
-                earnings_growth,
-                forward_pe,
-                price_to_sales,
-                ev_to_ebitda,
-                price_to_fcf,
-                current_ratio,
-            ) = get_stock_data(symbol)
+    # anonymous history is kept by the browser: a session cookie would make
+    # every visitor's fragment requests uncacheable for shared caches
+    history = []
+    if current_user.is_authenticated:
+        recorder = get_activity_recorder()
+        if symbol:
+            recorder.record_search(current_user.id, symbol)
+        history = recorder.recent_history(current_user.id)
 
-            target_currency = currency
-            if current_user.is_authenticated and current_user.default_currency:
-                target_currency = current_user.default_currency
-            if price is not None and currency != target_currency:
-                price = convert_currency(price, currency, target_currency)
-            if eps is not None and currency != target_currency:
-                eps = convert_currency(eps, currency, target_currency)
-            currency = target_currency
+    return render_template("index.html", symbol=symbol, history=history)
 
-            (
-                history_dates,
-                history_opens,
-                history_highs,
-                history_lows,
-                history_prices,
-            ) = get_historical_ohlc(symbol, days=365)
-            ma20 = moving_average(history_prices, 20)
-            ma50 = moving_average(history_prices, 50)
-            rsi_values = calculate_rsi(history_prices, 14)
-            cci_values = calculate_cci(history_highs, history_lows, history_prices, 20)
-            macd_vals, macd_signal = calculate_macd(history_prices)
-            bb_upper, bb_lower = bollinger_bands(history_prices, 20, 2)
-
-            raw_price = price
-            raw_eps = eps
-            raw_pe_ratio_val = None
 
-            if price is not None and eps:
-                pe_ratio_val = round(price / eps, 2)
-                pe_ratio = format_decimal(pe_ratio_val, locale=get_locale())
-                raw_pe_ratio_val = pe_ratio_val
-                peg_ratio_val = None
-                if earnings_growth not in (None, 0):
-                    try:
-                        growth_pct = float(earnings_growth)
-                        if growth_pct != 0:
-                            peg_ratio_val = pe_ratio_val / (growth_pct * 100)
-                    except (TypeError, ValueError):
-                        peg_ratio_val = None
-                if peg_ratio_val is not None:
-                    peg_ratio = format_decimal(
-                        round(peg_ratio_val, 2), locale=get_locale()
-                    )
-                if pe_ratio_val < 15:
-                    valuation = "Undervalued?"
-                elif pe_ratio_val > 25:
-                    valuation = "Overvalued?"
-                else:
-                    valuation = "Fairly Valued"
-                threshold = ALERT_PE_THRESHOLD
-                de_thr = rsi_thr = ma_thr = None
-                if current_user.is_authenticated:
-                    item = WatchlistItem.query.filter_by(
-                        user_id=current_user.id, symbol=symbol
-                    ).first()
-                    if item:
-                        if item.pe_threshold is not None:
-                            threshold = item.pe_threshold
-                        de_thr = item.de_threshold
-                        rsi_thr = item.rsi_threshold
-                        ma_thr = item.ma_threshold
-                if pe_ratio_val > threshold:
-                    alert_message = (
-                        f"P/E ratio {pe_ratio_val} exceeds threshold of {threshold}"
-                    )
-                    if current_user.is_authenticated:
-                        db.session.add(
-                            Alert(
-                                symbol=symbol,
-                                message=alert_message,
-                                user_id=current_user.id,
-                            )
-                        )
-                        db.session.commit()
-                        notify_user_push(current_user.id, alert_message)
-                elif (
-                    de_thr is not None
-                    and debt_to_equity is not None
-                    and debt_to_equity > de_thr
-                ):
-                    alert_message = f"Debt/Equity {round(debt_to_equity,2)} exceeds threshold of {de_thr}"
-                    if current_user.is_authenticated:
-                        db.session.add(
-                            Alert(
-                                symbol=symbol,
-                                message=alert_message,
-                                user_id=current_user.id,
-                            )
-                        )
-                        db.session.commit()
-                        notify_user_push(current_user.id, alert_message)
-                elif rsi_thr is not None or ma_thr is not None:
-                    if history_prices:
-                        if rsi_thr is not None:
-                            rsi_val = calculate_rsi(history_prices, 14)
-                            if (
-                                rsi_val
-                                and rsi_val[-1] is not None
-                                and rsi_val[-1] > rsi_thr
-                            ):
-                                alert_message = (
-                                    f"RSI {rsi_val[-1]} exceeds threshold of {rsi_thr}"
-                                )
-                        if (
-                            alert_message is None
-                            and ma_thr is not None
-                            and price is not None
-                        ):
-                            ma_val = moving_average(history_prices, 50)
-                            if ma_val and ma_val[-1] is not None:
-                                diff = abs(price - ma_val[-1]) / ma_val[-1] * 100
-                                if diff > ma_thr:
-                                    alert_message = f"Price deviation {round(diff,2)}% exceeds {ma_thr}% from 50d MA"
-                        if alert_message and current_user.is_authenticated:
-                            db.session.add(
-                                Alert(
-                                    symbol=symbol,
-                                    message=alert_message,
-                                    user_id=current_user.id,
-                                )
-                            )
-                            db.session.commit()
-                            notify_user_push(current_user.id, alert_message)
-            elif price is None or eps is None:
-                error_message = "Price or EPS data is missing."
-            if debt_to_equity is not None:
-                debt_to_equity = format_decimal(
-                    round(debt_to_equity, 2), locale=get_locale()
-                )
-            if pb_ratio is not None:
-                pb_ratio = format_decimal(round(pb_ratio, 2), locale=get_locale())
-            if roe is not None:
-                roe = format_decimal(round(roe * 100, 2), locale=get_locale())
-            if roa is not None:
-                roa = format_decimal(round(roa * 100, 2), locale=get_locale())
-            if profit_margin is not None:
-                profit_margin = format_decimal(
-                    round(profit_margin * 100, 2), locale=get_locale()
-                )
-            if dividend_yield is not None:
-                dividend_yield = format_decimal(
-                    round(dividend_yield * 100, 2), locale=get_locale()
-                )
-            if payout_ratio is not None:
-                payout_ratio = format_decimal(
-                    round(payout_ratio * 100, 2), locale=get_locale()
-                )
-            if earnings_growth is not None:
-                earnings_growth = format_decimal(
-                    round(earnings_growth * 100, 2), locale=get_locale()
-                )
-            if forward_pe is not None:
-                forward_pe = format_decimal(round(forward_pe, 2), locale=get_locale())
-            if price_to_sales is not None:
-                price_to_sales = format_decimal(
-                    round(price_to_sales, 2), locale=get_locale()
-                )
-            if ev_to_ebitda is not None:
-                ev_to_ebitda = format_decimal(
-                    round(ev_to_ebitda, 2), locale=get_locale()
-                )
-            if price_to_fcf is not None:
-                price_to_fcf = format_decimal(
-                    round(price_to_fcf, 2), locale=get_locale()
-                )
-            if current_ratio is not None:
-                current_ratio = format_decimal(
-                    round(current_ratio, 2), locale=get_locale()
-                )
-            if price is not None:
-                price = format_currency(price, currency, locale=get_locale())
-            if eps is not None:
-                eps = format_currency(eps, currency, locale=get_locale())
-
-            if symbol:
-                if current_user.is_authenticated:
-                    db.session.add(History(symbol=symbol, user_id=current_user.id))
-                    db.session.add(
-                        StockRecord(
-                            symbol=symbol,
-                            price=raw_price,
-                            eps=raw_eps,
-                            pe_ratio=raw_pe_ratio_val,
-                            user_id=current_user.id,
-                        )
-                    )
-                    db.session.commit()
-                    history.insert(0, symbol)
-                    history = history[:10]
-                else:
-                    if symbol in history:
-                        history.remove(symbol)
-                    history.insert(0, symbol)
-                    history = history[:10]
-                    session["history"] = history
-        except Exception as e:
-            error_message = str(e)
+@main_bp.route("/fragments/summary")
+@cached_view(_stock_version, "ticker")
+def summary_fragment() -> str | tuple[str, int]:
+    """Fundamentals and valuation for the index page."""
+    symbol = request.args.get("ticker", "").upper()
+    if not symbol:
+        return "Symbol required", 400
+    context: dict = {"symbol": symbol, "error_message": None}
+    try:
+        data = _quote(symbol)
+        locale = get_locale()
+        pe_ratio_val = _pe_ratio(data)
+        peg_ratio = valuation = pe_ratio = None
+        if pe_ratio_val is not None:
+            pe_ratio = format_decimal(pe_ratio_val, locale=locale)
+            peg_ratio_val = None
+            if data["earnings_growth"] not in (None, 0):
+                try:
+                    growth_pct = float(data["earnings_growth"])
+                    if growth_pct != 0:
+                        peg_ratio_val = pe_ratio_val / (growth_pct * 100)
+                except (TypeError, ValueError):
+                    peg_ratio_val = None
+            if peg_ratio_val is not None:
+                peg_ratio = format_decimal(round(peg_ratio_val, 2), locale=locale)
+            if pe_ratio_val < 15:
+                valuation = "Undervalued?"
+            elif pe_ratio_val > 25:
+                valuation = "Overvalued?"
+            else:
+                valuation = "Fairly Valued"
+        elif data["price"] is None or data["eps"] is None:
+            context["error_message"] = "Price or EPS data is missing."
+
+        if current_user.is_authenticated:
+            get_activity_recorder().record_lookup(
+                current_user.id, symbol, data["price"], data["eps"], pe_ratio_val
+            )
+
+        for key in _RATIO_FIELDS:
+            if data[key] is not None:
+                data[key] = format_decimal(round(data[key], 2), locale=locale)
+        for key in _PERCENT_FIELDS:
+            if data[key] is not None:
+                data[key] = format_decimal(round(data[key] * 100, 2), locale=locale)
+        for key in ("price", "eps"):
+            if data[key] is not None:
+                data[key] = format_currency(data[key], data["currency"], locale=locale)
+        context.update(
+            data, pe_ratio=pe_ratio, peg_ratio=peg_ratio, valuation=valuation
+        )
+    except Exception as e:
+        context["error_message"] = str(e)
+    return render_template("index_summary.html", **context)
 
-    return render_template(
-        "index.html",
-        symbol=symbol,
-        price=price,
-        eps=eps,
-        pe_ratio=pe_ratio,
-        peg_ratio=peg_ratio,
-        valuation=valuation,
-        company_name=company_name,
-        logo_url=logo_url,
-        market_cap=market_cap,
-        sector=sector,
-        industry=industry,
-        exchange=exchange,
-        currency=currency,
-        debt_to_equity=debt_to_equity,
-        pb_ratio=pb_ratio,
-        roe=roe,
-        roa=roa,
-        profit_margin=profit_margin,
-        analyst_rating=analyst_rating,
-        dividend_yield=dividend_yield,
-        payout_ratio=payout_ratio,
-        earnings_growth=earnings_growth,
-        forward_pe=forward_pe,
-        price_to_sales=price_to_sales,
-        ev_to_ebitda=ev_to_ebitda,
-        price_to_fcf=price_to_fcf,
-        current_ratio=current_ratio,
-        error_message=error_message,
-        alert_message=alert_message,
-        history_dates=history_dates,
-        history_prices=history_prices,
-        history_opens=history_opens,
-        history_highs=history_highs,
-        history_lows=history_lows,
-        ma20=ma20,
-        ma50=ma50,
-        rsi_values=rsi_values,
-        cci_values=cci_values,
-        macd_values=macd_vals,
-        macd_signal=macd_signal,
-        bb_upper=bb_upper,
-        bb_lower=bb_lower,
-        history=history,
-    )
+
+def _threshold_checks(symbol: str, data: dict) -> Iterator[tuple[str, bool, str]]:
+    """Evaluate watchlist thresholds in order as ``(condition, holds, message)``.
+
+    Checks are lazy, so history is only loaded when the earlier conditions
+    do not hold.
+    """
+    pe_ratio_val = _pe_ratio(data)
+    if pe_ratio_val is None:
+        return
+    threshold = ALERT_PE_THRESHOLD
+    de_thr = rsi_thr = ma_thr = None
+    if current_user.is_authenticated:
+        item = WatchlistItem.query.filter_by(
+            user_id=current_user.id, symbol=symbol
+        ).first()
+        if item:
+            if item.pe_threshold is not None:
+                threshold = item.pe_threshold
+            de_thr = item.de_threshold
+            rsi_thr = item.rsi_threshold
+            ma_thr = item.ma_threshold
+    message = f"P/E ratio {pe_ratio_val} exceeds threshold of {threshold}"
+    yield "pe", pe_ratio_val > threshold, message
+    debt_to_equity = data["debt_to_equity"]
+    if de_thr is not None and debt_to_equity is not None:
+        message = f"Debt/Equity {round(debt_to_equity,2)} exceeds threshold of {de_thr}"
+        yield "de", debt_to_equity > de_thr, message
+    if rsi_thr is None and ma_thr is None:
+        return
+    *_ohlc, history_prices = get_historical_ohlc(symbol, days=365)
+    if not history_prices:
+        return
+    if rsi_thr is not None:
+        rsi_val = cached_indicator(symbol, calculate_rsi, history_prices, 14)
+        if rsi_val and rsi_val[-1] is not None:
+            message = f"RSI {rsi_val[-1]} exceeds threshold of {rsi_thr}"
+            yield "rsi", rsi_val[-1] > rsi_thr, message
+    price = data["price"]
+    if ma_thr is not None and price is not None:
+        ma_val = cached_indicator(symbol, moving_average, history_prices, 50)
+        if ma_val and ma_val[-1] is not None:
+            diff = abs(price - ma_val[-1]) / ma_val[-1] * 100
+            message = f"Price deviation {round(diff,2)}% exceeds {ma_thr}% from 50d MA"
+            yield "ma", diff > ma_thr, message
+
+
+@main_bp.route("/fragments/alerts")
+@cached_view(_stock_version, "ticker")
+def alerts_fragment() -> str | tuple[str, int]:
+    """Threshold alert for the index page.
+
+    For signed-in users an alert is saved and pushed only when its condition
+    starts to hold; see :func:`stockapp.alert_state.should_alert`.
+    """
+    symbol = request.args.get("ticker", "").upper()
+    if not symbol:
+        return "Symbol required", 400
+    alert_message = None
+    notify = False
+    try:
+        for condition, holds, message in _threshold_checks(symbol, _quote(symbol)):
+            if current_user.is_authenticated:
+                notify = should_alert(current_user.id, symbol, condition, holds)
+            if holds:
+                alert_message = message
+                break
+    except Exception:
+        # the summary fragment reports lookup failures
+        current_app.logger.warning("Alert check failed for %s", symbol, exc_info=True)
+    if current_user.is_authenticated:
+        if notify:
+            db.session.add(
+                Alert(symbol=symbol, message=alert_message, user_id=current_user.id)
+            )
+        db.session.commit()
+        if notify:
+            notify_user_push(current_user.id, alert_message)
+    return render_template("index_alerts.html", alert_message=alert_message)
 
 
 @main_bp.route("/clear_history")
 def clear_history() -> Response:
     if current_user.is_authenticated:
+        get_activity_recorder().discard("history", current_user.id)
         History.query.filter_by(user_id=current_user.id).delete()
         db.session.commit()
     else:
+        # drop history left in the cookie by earlier versions
         session.pop("history", None)
     return redirect(url_for("main.index"))
 
@@ -670,10 +631,10 @@ def download() -> Response | tuple[str, int]:
 
 
 @main_bp.route("/dashboard")
+@cached_view(_stock_version)
 def dashboard() -> str:
     """Display real-time price chart with candlestick overlay."""
     symbol = request.args.get("symbol", "").upper()
-    dates = opens = highs = lows = closes = []
     price = eps = pe_ratio = None
     if symbol:
         try:
@@ -688,7 +649,6 @@ def dashboard() -> str:
                 eps,
                 *_rest,
             ) = get_stock_data(symbol)
-            dates, opens, highs, lows, closes = get_historical_ohlc(symbol, days=60)
             if price is not None and eps:
                 pe_ratio = round(price / eps, 2)
         except Exception:
@@ -699,9 +659,4 @@ def dashboard() -> str:
         price=price,
         eps=eps,
         pe_ratio=pe_ratio,
-        dates=dates,
-        opens=opens,
-        highs=highs,
-        lows=lows,
-        closes=closes,
     )
@@ -0,0 +1,241 @@
+"""Exchange trading calendars and adaptive realtime polling intervals.
+
+Only the two markets the app special-cases are covered: US listings
+(NYSE/Nasdaq) and ASX listings, recognised by their ``.AX`` suffix. The
+holiday rules follow each exchange's published schedule; one-off closures
+(e.g. national days of mourning) are not known in advance and are simply
+polled at the regular rate.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+REGULAR = "regular"
+EXTENDED = "extended"
+CLOSED = "closed"
+
+
+def _easter(year: int) -> date:
+    """Western Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7  # noqa: E741
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """The ``n``-th ``weekday`` (Monday is 0) of a month; ``n=-1`` is the last."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    following = date(year + month // 12, month % 12 + 1, 1)
+    last = following - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _nearest_weekday(day: date) -> date:
+    """US observance: Saturday holidays move to Friday, Sunday to Monday."""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def _next_weekday(day: date) -> date:
+    """Australian observance: weekend holidays move to the next Monday."""
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day
+
+
+def us_holidays(year: int) -> set[date]:
+    """NYSE full-day closures in ``year``."""
+    days = {
+        _nth_weekday(year, 1, 0, 3),  # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),  # Washington's Birthday
+        _easter(year) - timedelta(days=2),  # Good Friday
+        _nth_weekday(year, 5, 0, -1),  # Memorial Day
+        _nearest_weekday(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),  # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        _nearest_weekday(date(year, 12, 25)),
+    }
+    # a Saturday New Year's Day is not observed on the Friday before
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        days.add(_nearest_weekday(new_year))
+    if year >= 2022:
+        days.add(_nearest_weekday(date(year, 6, 19)))  # Juneteenth
+    return days
+
+
+def asx_holidays(year: int) -> set[date]:
+    """ASX full-day closures in ``year``."""
+    easter = _easter(year)
+    christmas = _next_weekday(date(year, 12, 25))
+    boxing_day = christmas + timedelta(days=1)
+    if boxing_day.weekday() >= 5:
+        boxing_day = _next_weekday(boxing_day)
+    return {
+        _next_weekday(date(year, 1, 1)),
+        _next_weekday(date(year, 1, 26)),  # Australia Day
+        easter - timedelta(days=2),  # Good Friday
+        easter + timedelta(days=1),  # Easter Monday
+        date(year, 4, 25),  # Anzac Day, not moved when on a weekend
+        _nth_weekday(year, 6, 0, 2),  # King's Birthday
+        christmas,
+        boxing_day,
+    }
+
+
+class Exchange:
+    """Trading hours of one exchange in its local time zone.
+
+    ``pre_open`` and ``post_close`` bound the extended session; they equal
+    the regular open and close for markets without one.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        tz: str,
+        open: time,
+        close: time,
+        holidays,
+        pre_open: time | None = None,
+        post_close: time | None = None,
+    ) -> None:
+        self.name = name
+        self.tz = ZoneInfo(tz)
+        self.open = open
+        self.close = close
+        self.pre_open = pre_open or open
+        self.post_close = post_close or close
+        self._holidays = holidays
+        self._years: dict[int, set[date]] = {}
+
+    def is_trading_day(self, day: date) -> bool:
+        if day.weekday() >= 5:
+            return False
+        if day.year not in self._years:
+            self._years[day.year] = self._holidays(day.year)
+        return day not in self._years[day.year]
+
+    def session(self, now: datetime | None = None) -> str:
+        """``regular``, ``extended`` or ``closed`` at ``now`` (default: now)."""
+        local = self._local(now)
+        if not self.is_trading_day(local.date()):
+            return CLOSED
+        clock = local.time()
+        if self.open <= clock < self.close:
+            return REGULAR
+        if self.pre_open <= clock < self.post_close:
+            return EXTENDED
+        return CLOSED
+
+    def next_open(self, now: datetime | None = None) -> datetime:
+        """Start of the next session (extended hours included) after ``now``."""
+        local = self._local(now)
+        day = local.date()
+        if local.time() >= self.pre_open:
+            day += timedelta(days=1)
+        while not self.is_trading_day(day):
+            day += timedelta(days=1)
+        return datetime.combine(day, self.pre_open, tzinfo=self.tz)
+
+    def _local(self, now: datetime | None) -> datetime:
+        if now is None:
+            return datetime.now(self.tz)
+        if now.tzinfo is None:
+            raise ValueError("now must be timezone-aware")
+        return now.astimezone(self.tz)
+
+
+US = Exchange(
+    "US",
+    "America/New_York",
+    time(9, 30),
+    time(16, 0),
+    us_holidays,
+    pre_open=time(4, 0),
+    post_close=time(20, 0),
+)
+ASX = Exchange("ASX", "Australia/Sydney", time(10, 0), time(16, 0), asx_holidays)
+
+
+def exchange_for(symbol: str) -> Exchange:
+    """The exchange whose calendar applies to ``symbol``."""
+    return ASX if symbol.lower().endswith(".ax") else US
+
+
+class PollScheduler:
+    """Choose how long a symbol's poller waits before its next quote.
+
+    ``base`` (``PRICE_STREAM_INTERVAL``) applies during regular hours.
+    Extended hours poll ``extended_factor`` times less often. A closed
+    market is polled once, then again at the next open, with at most
+    ``closed_interval`` seconds between checks. Quotes that keep coming back
+    unchanged (illiquid or delisted tickers) double the wait up to
+    ``max_backoff`` times ``base``; a volatile symbol, or one with at least
+    ``hot_subscribers`` viewers, is polled at up to twice the base rate.
+    """
+
+    # mean absolute move per poll that counts as calm or as volatile
+    CALM = 0.0002
+    VOLATILE = 0.002
+
+    def __init__(
+        self,
+        base: float,
+        closed_interval: float = 900,
+        extended_factor: float = 3,
+        max_backoff: float = 8,
+        hot_subscribers: int = 25,
+    ) -> None:
+        self.base = base
+        self.closed_interval = closed_interval
+        self.extended_factor = extended_factor
+        self.max_backoff = max_backoff
+        self.hot_subscribers = hot_subscribers
+
+    def interval(
+        self,
+        symbol: str,
+        subscribers: int = 1,
+        volatility: float | None = None,
+        unchanged: int = 0,
+        now: datetime | None = None,
+    ) -> float:
+        """Seconds to wait before polling ``symbol`` again.
+
+        ``volatility`` is the mean absolute relative price change per poll
+        (``None`` until known) and ``unchanged`` the number of consecutive
+        polls that returned the same quote.
+        """
+        exchange = exchange_for(symbol)
+        session = exchange.session(now)
+        if session == CLOSED:
+            current = exchange._local(now)
+            until_open = (exchange.next_open(now) - current).total_seconds()
+            return max(self.base, min(until_open, self.closed_interval))
+        factor = self.extended_factor if session == EXTENDED else 1.0
+        if unchanged:
+            factor *= min(2.0**unchanged, self.max_backoff)
+        elif volatility is not None and volatility < self.CALM:
+            factor *= 2
+        fast = subscribers >= self.hot_subscribers or (
+            volatility is not None and volatility >= self.VOLATILE
+        )
+        if fast:
+            factor /= 2
+        return self.base * min(factor, self.max_backoff * self.extended_factor)
@@ -19,6 +19,7 @@ class User(db.Model, UserMixin):
     reset_token_sent = db.Column(db.DateTime)
     alert_frequency = db.Column(db.Integer, default=24)
     last_alert_time = db.Column(db.DateTime, default=datetime.utcnow)
+    is_admin = db.Column(db.Boolean, default=False)
     mfa_enabled = db.Column(db.Boolean, default=False)
     mfa_code = db.Column(db.String(20))
     mfa_expiry = db.Column(db.DateTime)
@@ -64,6 +65,18 @@ class Alert(db.Model):
     )
 
 
+class AlertState(db.Model):
+    # whether an alert condition currently holds, see stockapp/alert_state.py
+    __table_args__ = (db.UniqueConstraint("user_id", "symbol", "condition"),)
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    # empty for custom rules, which are not tied to one symbol
+    symbol = db.Column(db.String(10), nullable=False, default="")
+    condition = db.Column(db.String(32), nullable=False)
+    active = db.Column(db.Boolean, nullable=False, default=False)
+    last_fired = db.Column(db.DateTime)
+
+
 class CustomAlertRule(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     description = db.Column(db.String(200))
@@ -148,3 +161,29 @@ class DataSnapshot(db.Model):
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     portfolio = db.Column(db.Text)
     watchlist = db.Column(db.Text)
+
+
+class Fundamentals(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    symbol = db.Column(db.String(10), unique=True, nullable=False, index=True)
+    name = db.Column(db.String(200))
+    logo_url = db.Column(db.String(300))
+    sector = db.Column(db.String(100))
+    industry = db.Column(db.String(100))
+    exchange = db.Column(db.String(50))
+    currency = db.Column(db.String(10))
+    debt_to_equity = db.Column(db.Float)
+    pb_ratio = db.Column(db.Float)
+    roe = db.Column(db.Float)
+    roa = db.Column(db.Float)
+    profit_margin = db.Column(db.Float)
+    analyst_rating = db.Column(db.String(50))
+    dividend_yield = db.Column(db.Float)
+    payout_ratio = db.Column(db.Float)
+    earnings_growth = db.Column(db.Float)
+    price_to_sales = db.Column(db.Float)
+    ev_to_ebitda = db.Column(db.Float)
+    price_to_fcf = db.Column(db.Float)
+    fcf_per_share = db.Column(db.Float)
+    current_ratio = db.Column(db.Float)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
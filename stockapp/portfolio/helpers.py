@@ -2,8 +2,7 @@ from __future__ import annotations
 import csv
 import io
 from typing import Callable, Dict, List, Tuple
-from statistics import correlation, stdev
-import random
+import numpy as np
 from babel.numbers import format_currency
 from flask_login import current_user
 
@@ -12,9 +11,9 @@ from datetime import datetime
 from ..extensions import db
 from ..models import PortfolioItem, Transaction, User
 from ..utils import get_locale, convert_currency, summarize_news
+from ..price_frame import PriceFrame
 from .. import brokerage
 
-
 # portfolio management helpers
 
 
@@ -257,6 +256,10 @@ def calculate_portfolio_analysis(
 
     diversification = []
     risk_assessment = None
+    correlations: List[Dict[str, object]] = []
+    sector_correlations: List[Dict[str, object]] = []
+    portfolio_volatility = beta = sharpe_ratio = max_drawdown = None
+    value_at_risk = monte_carlo_var = optimized_allocation = None
     if total_value > 0:
         for sec, val in sector_totals.items():
             pct = round(val / total_value * 100, 2)
@@ -271,188 +274,103 @@ def calculate_portfolio_analysis(
             else:
                 risk_assessment = "Well diversified across sectors."
 
-        returns: Dict[str, List[float]] = {}
         weights: Dict[str, float] = {}
+        series: Dict[str, Tuple[List[str], List[float]]] = {}
         for row in data:
             sym = row["item"].symbol
-            price_num = row["price_num"]
-            if price_num is None:
+            if row["price_num"] is None:
                 continue
-            weights[sym] = row["value_num"] / total_value if total_value else 0
-            _dates, prices = get_historical_prices_func(sym, days=days)
+            weights[sym] = row["value_num"] / total_value
+            dates, prices = get_historical_prices_func(sym, days=days)
             if len(prices) > 1:
-                r: List[float] = []
-                for i in range(1, len(prices)):
-                    try:
-                        if prices[i - 1]:
-                            r.append((prices[i] - prices[i - 1]) / prices[i - 1])
-                    except Exception:
-                        pass
-                if r:
-                    returns[sym] = r
-        correlations = []
-        sector_returns: Dict[str, List[float]] = {}
-        if returns:
-            syms = list(returns.keys())
-            for i in range(len(syms)):
-                r1 = returns[syms[i]]
-                for j in range(i + 1, len(syms)):
-                    r2 = returns[syms[j]]
-                    n = min(len(r1), len(r2))
-                    if n > 1:
-                        try:
-                            c = correlation(r1[-n:], r2[-n:])
-                            correlations.append(
-                                {"pair": f"{syms[i]}-{syms[j]}", "value": round(c, 2)}
-                            )
-                        except Exception:
-                            pass
-            # build sector level returns
-            n = min(len(r) for r in returns.values())
-            if n > 1:
-                for sym, r in returns.items():
-                    sector = sector_map.get(sym)
-                    if not sector:
-                        continue
-                    sector_returns.setdefault(sector, [])
-                    for idx in range(-n, 0):
-                        if len(sector_returns[sector]) < n:
-                            sector_returns[sector].append(0.0)
-                        sector_returns[sector][idx] += r[idx]
-                for sector in sector_returns:
-                    sector_returns[sector] = [
-                        val / list(sector_map.values()).count(sector)
-                        for val in sector_returns[sector]
+                series[sym] = (dates, prices)
+
+        # Join every holding on date once so returns cover the same periods
+        frame = PriceFrame.from_series(series, how="inner")
+        returns_matrix = frame.returns()
+        valid_rows = ~np.isnan(returns_matrix).any(axis=1)
+        returns_matrix = returns_matrix[valid_rows]
+        syms = frame.symbols
+        n = returns_matrix.shape[0]
+        returns: Dict[str, List[float]] = {
+            sym: returns_matrix[:, j].tolist() for j, sym in enumerate(syms)
+        }
+
+        if syms and n > 1:
+            correlations = _pairwise_correlations(syms, returns_matrix)
+
+            sector_cols: Dict[str, List[int]] = {}
+            for j, sym in enumerate(syms):
+                sector = sector_map.get(sym)
+                if sector:
+                    sector_cols.setdefault(sector, []).append(j)
+            sector_names = list(sector_cols.keys())
+            if sector_names:
+                sector_matrix = np.column_stack(
+                    [
+                        returns_matrix[:, sector_cols[s]].mean(axis=1)
+                        for s in sector_names
                     ]
-        portfolio_volatility = None
-        beta = None
-        sharpe_ratio = None
-        value_at_risk = None
-        monte_carlo_var = None
-        optimized_allocation = None
-        max_drawdown = None
-        sector_correlations = []
-        if returns and len(returns) > 0:
-            n = min(len(r) for r in returns.values())
-            if n > 1:
-                portfolio_returns: List[float] = []
-                for idx in range(-n, 0):
-                    day_ret = 0.0
-                    for sym, r in returns.items():
-                        if len(r) >= n:
-                            day_ret += weights.get(sym, 0) * r[idx]
-                    portfolio_returns.append(day_ret)
-                if len(portfolio_returns) > 1:
-                    try:
-                        vol_daily = stdev(portfolio_returns)
-                        vol = vol_daily * (252**0.5)
-                        portfolio_volatility = round(vol * 100, 2)
-                    except Exception:
-                        portfolio_volatility = None
-                    try:
-                        avg_return = sum(portfolio_returns) / len(portfolio_returns)
-                        sharpe_ratio = (
-                            round((avg_return / vol_daily) * (252**0.5), 2)
-                            if vol_daily
-                            else None
-                        )
-                    except Exception:
-                        sharpe_ratio = None
-                    try:
-                        cumulative = [1.0]
-                        for r in portfolio_returns:
-                            cumulative.append(cumulative[-1] * (1 + r))
-                        peak = cumulative[0]
-                        max_dd_val = 0.0
-                        for val in cumulative:
-                            if val > peak:
-                                peak = val
-                            draw = (peak - val) / peak
-                            if draw > max_dd_val:
-                                max_dd_val = draw
-                        max_drawdown = round(max_dd_val * 100, 2)
-                    except Exception:
-                        max_drawdown = None
-                    try:
-                        sorted_returns = sorted(portfolio_returns)
-                        idx_var = max(int(len(sorted_returns) * 0.05) - 1, 0)
-                        var_pct = sorted_returns[idx_var]
-                        value_at_risk = format_currency(
-                            -var_pct * total_value,
-                            totals_currency,
-                            locale=get_locale(),
+                )
+                sector_correlations = _pairwise_correlations(
+                    sector_names, sector_matrix
+                )
+
+            weight_vec = np.array([weights.get(sym, 0) for sym in syms])
+            portfolio_returns = returns_matrix @ weight_vec
+            vol_daily = float(portfolio_returns.std(ddof=1))
+            portfolio_volatility = round(vol_daily * (252**0.5) * 100, 2)
+            sharpe_ratio = (
+                round(float(portfolio_returns.mean()) / vol_daily * (252**0.5), 2)
+                if vol_daily
+                else None
+            )
+
+            cumulative = np.concatenate(([1.0], np.cumprod(1 + portfolio_returns)))
+            peak = np.maximum.accumulate(cumulative)
+            max_drawdown = round(float(((peak - cumulative) / peak).max()) * 100, 2)
+
+            sorted_returns = np.sort(portfolio_returns)
+            idx_var = max(int(n * 0.05) - 1, 0)
+            value_at_risk = format_currency(
+                -float(sorted_returns[idx_var]) * total_value,
+                totals_currency,
+                locale=get_locale(),
+            )
+
+            try:
+                m_dates, m_prices = get_historical_prices_func("SPY", days=days)
+                market = PriceFrame.from_series(
+                    {"SPY": (m_dates, m_prices)}, how="outer"
+                )
+                market_returns = market.reindex(frame.dates).returns()[:, 0]
+                market_returns = market_returns[valid_rows]
+                ok = np.isfinite(market_returns)
+                if ok.sum() > 1:
+                    market_var = float(np.var(market_returns[ok], ddof=1))
+                    if market_var:
+                        cov = float(
+                            np.cov(portfolio_returns[ok], market_returns[ok])[0, 1]
                         )
-                    except Exception:
-                        value_at_risk = None
-                    try:
-                        _m_dates, m_prices = get_historical_prices_func("SPY", days=30)
-                        market_returns: List[float] = []
-                        for i in range(1, len(m_prices)):
-                            if m_prices[i - 1]:
-                                market_returns.append(
-                                    (m_prices[i] - m_prices[i - 1]) / m_prices[i - 1]
-                                )
-                        if (
-                            len(market_returns) >= len(portfolio_returns)
-                            and stdev(market_returns[-n:]) != 0
-                        ):
-                            b = correlation(
-                                portfolio_returns[-n:], market_returns[-n:]
-                            ) * (
-                                stdev(portfolio_returns[-n:])
-                                / stdev(market_returns[-n:])
-                            )
-                            beta = round(b, 2)
-                    except Exception:
-                        beta = None
-                if sector_returns:
-                    sec_names = list(sector_returns.keys())
-                    for i in range(len(sec_names)):
-                        r1 = sector_returns[sec_names[i]]
-                        for j in range(i + 1, len(sec_names)):
-                            r2 = sector_returns[sec_names[j]]
-                            if len(r1) >= n and len(r2) >= n and n > 1:
-                                try:
-                                    c = correlation(r1[-n:], r2[-n:])
-                                    sector_correlations.append(
-                                        {
-                                            "pair": f"{sec_names[i]}-{sec_names[j]}",
-                                            "value": round(c, 2),
-                                        }
-                                    )
-                                except Exception:
-                                    pass
-                try:
-                    sims = []
-                    for _ in range(500):
-                        val = total_value
-                        for _ in range(n):
-                            r = random.choice(portfolio_returns)
-                            val *= 1 + r
-                        sims.append(val)
-                    sims.sort()
-                    mc_var_val = total_value - sims[int(len(sims) * 0.05)]
-                    monte_carlo_var = format_currency(
-                        mc_var_val,
-                        totals_currency,
-                        locale=get_locale(),
-                    )
-                except Exception:
-                    monte_carlo_var = None
-                try:
-                    optimized_allocation = optimize_portfolio(returns)
-                except Exception:
-                    optimized_allocation = None
-        else:
-            correlations = []
-            sector_correlations = []
-            portfolio_volatility = None
-            beta = None
-            sharpe_ratio = None
-            value_at_risk = None
-            optimized_allocation = None
-            monte_carlo_var = None
-            max_drawdown = None
+                        beta = round(cov / market_var, 2)
+            except Exception:
+                beta = None
+
+            try:
+                draws = np.random.default_rng().choice(portfolio_returns, size=(500, n))
+                sims = np.sort(total_value * np.prod(1 + draws, axis=1))
+                mc_var_val = total_value - float(sims[int(len(sims) * 0.05)])
+                monte_carlo_var = format_currency(
+                    mc_var_val,
+                    totals_currency,
+                    locale=get_locale(),
+                )
+            except Exception:
+                monte_carlo_var = None
+            try:
+                optimized_allocation = optimize_portfolio(returns)
+            except Exception:
+                optimized_allocation = None
 
     news_data = {
         row["item"].symbol: get_stock_news_func(row["item"].symbol, limit=3)
@@ -479,13 +397,34 @@ def calculate_portfolio_analysis(
     }
 
 
+def _pairwise_correlations(
+    names: List[str], matrix: np.ndarray
+) -> List[Dict[str, object]]:
+    """Return rounded correlations for each pair of columns in ``matrix``."""
+    if len(names) < 2:
+        return []
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = np.corrcoef(matrix, rowvar=False)
+    pairs = []
+    for i in range(len(names)):
+        for j in range(i + 1, len(names)):
+            if np.isfinite(corr[i, j]):
+                pairs.append(
+                    {
+                        "pair": f"{names[i]}-{names[j]}",
+                        "value": round(float(corr[i, j]), 2),
+                    }
+                )
+    return pairs
+
+
 def optimize_portfolio(
     returns: Dict[str, List[float]], risk_free_rate: float = 0.0, samples: int = 5000
 ) -> Dict[str, float] | None:
     """Return weights that maximize the Sharpe ratio.
 
-    This Monte Carlo approach avoids external dependencies and
-    works with a small number of assets.
+    Random long-only allocations are scored in one vectorised pass, which
+    works well for a small number of assets.
     """
 
     if not returns:
@@ -496,44 +435,19 @@ def optimize_portfolio(
         return None
 
     symbols = list(returns.keys())
-    truncated = {sym: r[-n:] for sym, r in returns.items()}
-
-    def mean(x: List[float]) -> float:
-        return sum(x) / len(x)
-
-    def cov(x: List[float], y: List[float]) -> float:
-        mx = mean(x)
-        my = mean(y)
-        return sum((xi - mx) * (yi - my) for xi, yi in zip(x, y)) / (len(x) - 1)
-
-    means = {sym: mean(vals) for sym, vals in truncated.items()}
-    cov_matrix = [
-        [cov(truncated[s1], truncated[s2]) for s2 in symbols] for s1 in symbols
-    ]
-
-    best_weights = None
-    best_sharpe = float("-inf")
-
-    for _ in range(samples):
-        raw = [random.random() for _ in symbols]
-        total = sum(raw)
-        weights = [r / total for r in raw]
-
-        exp_return = sum(means[s] * w for s, w in zip(symbols, weights))
-
-        variance = 0.0
-        for i in range(len(symbols)):
-            for j in range(len(symbols)):
-                variance += weights[i] * weights[j] * cov_matrix[i][j]
-
-        std = variance**0.5
-        if std == 0:
-            continue
-        sharpe = (exp_return - risk_free_rate) / std
-        if sharpe > best_sharpe:
-            best_sharpe = sharpe
-            best_weights = {
-                sym: round(weights[idx], 4) for idx, sym in enumerate(symbols)
-            }
+    matrix = np.array([r[-n:] for r in returns.values()], dtype=float)
+    means = matrix.mean(axis=1)
+    cov_matrix = np.atleast_2d(np.cov(matrix, ddof=1))
+
+    raw = np.random.default_rng().random((samples, len(symbols)))
+    weights = raw / raw.sum(axis=1, keepdims=True)
+    exp_returns = weights @ means
+    variance = np.einsum("ij,jk,ik->i", weights, cov_matrix, weights)
+    std = np.sqrt(np.clip(variance, 0, None))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, (exp_returns - risk_free_rate) / std, -np.inf)
+    if not np.isfinite(sharpe).any():
+        return None
 
-    return best_weights
+    best = int(np.argmax(sharpe))
+    return {sym: round(float(weights[best, idx]), 4) for idx, sym in enumerate(symbols)}
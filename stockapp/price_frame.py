@@ -0,0 +1,137 @@
+"""Date-aligned columnar price data for analytics code."""
+
+from __future__ import annotations
+
+from typing import Iterable, Mapping, Sequence
+
+import numpy as np
+
+
+class PriceFrame:
+    """Prices for several symbols joined on date.
+
+    Data is held as a ``(symbols, dates)`` float array so each symbol's
+    series is a contiguous row. Missing observations are ``nan``. Build
+    frames with :meth:`from_series` rather than calling the constructor.
+    """
+
+    def __init__(
+        self, dates: Sequence[str], symbols: Sequence[str], data: np.ndarray
+    ) -> None:
+        self.dates = list(dates)
+        self.symbols = list(symbols)
+        self._data = np.ascontiguousarray(data, dtype=float)
+        self._index = {sym: i for i, sym in enumerate(self.symbols)}
+
+    @classmethod
+    def from_series(
+        cls,
+        series: Mapping[str, tuple[Sequence[str], Sequence[float | None]]],
+        how: str = "inner",
+        fill: str | None = None,
+    ) -> "PriceFrame":
+        """Join ``{symbol: (dates, prices)}`` on date in a single pass.
+
+        ``how="inner"`` keeps only dates every symbol traded on while
+        ``how="outer"`` keeps the union. With ``fill="ffill"`` gaps are
+        filled with the previous known price before inner rows are
+        selected, so a holiday on one exchange does not drop the row.
+        """
+        if how not in ("inner", "outer"):
+            raise ValueError(f"Unsupported join: {how}")
+        symbols = list(series.keys())
+        all_dates = sorted({d for dates, _prices in series.values() for d in dates})
+        row_of = {d: i for i, d in enumerate(all_dates)}
+        data = np.full((len(symbols), len(all_dates)), np.nan)
+        for col, sym in enumerate(symbols):
+            dates, prices = series[sym]
+            n = min(len(dates), len(prices))
+            if not n:
+                continue
+            rows = np.fromiter((row_of[d] for d in dates[:n]), dtype=np.intp, count=n)
+            data[col, rows] = np.array(
+                [np.nan if p is None else p for p in prices[:n]], dtype=float
+            )
+        if fill == "ffill":
+            data = _ffill(data)
+        elif fill is not None:
+            raise ValueError(f"Unsupported fill: {fill}")
+        frame = cls(all_dates, symbols, data)
+        if how == "inner":
+            frame = frame.dropna()
+        return frame
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self._index
+
+    @property
+    def values(self) -> np.ndarray:
+        """Array view with one row per date and one column per symbol."""
+        return self._data.T
+
+    def column(self, symbol: str) -> np.ndarray:
+        """Return the contiguous price array for ``symbol``."""
+        return self._data[self._index[symbol]]
+
+    def dropna(self) -> "PriceFrame":
+        """Return a frame without dates that have any missing price."""
+        if not self.symbols:
+            return self
+        keep = ~np.isnan(self._data).any(axis=0)
+        if keep.all():
+            return self
+        dates = [d for d, k in zip(self.dates, keep) if k]
+        return PriceFrame(dates, self.symbols, self._data[:, keep])
+
+    def tail(self, n: int) -> "PriceFrame":
+        """Return the last ``n`` dates."""
+        if n >= len(self.dates):
+            return self
+        start = len(self.dates) - n if n > 0 else len(self.dates)
+        return PriceFrame(self.dates[start:], self.symbols, self._data[:, start:])
+
+    def select(self, symbols: Iterable[str]) -> "PriceFrame":
+        """Return a frame containing only ``symbols``."""
+        symbols = [s for s in symbols if s in self._index]
+        rows = [self._index[s] for s in symbols]
+        return PriceFrame(self.dates, symbols, self._data[rows])
+
+    def reindex(self, dates: Sequence[str]) -> "PriceFrame":
+        """Return prices for ``dates``, with ``nan`` where a date is unknown."""
+        row_of = {d: i for i, d in enumerate(self.dates)}
+        data = np.full((len(self.symbols), len(dates)), np.nan)
+        src = [row_of.get(d, -1) for d in dates]
+        mask = np.array([i >= 0 for i in src], dtype=bool)
+        if mask.any():
+            data[:, mask] = self._data[:, [i for i in src if i >= 0]]
+        return PriceFrame(dates, self.symbols, data)
+
+    def returns(self) -> np.ndarray:
+        """Simple period returns as a ``(dates - 1, symbols)`` array.
+
+        Returns following a zero or missing price are ``nan``.
+        """
+        prev = self._data[:, :-1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = (self._data[:, 1:] - prev) / prev
+        out[~np.isfinite(out)] = np.nan
+        return out.T
+
+    def to_series(self, symbol: str) -> tuple[list[str], list[float | None]]:
+        """Return ``(dates, prices)`` lists for ``symbol`` with ``None`` gaps."""
+        col = self.column(symbol)
+        return self.dates, [None if np.isnan(v) else float(v) for v in col]
+
+
+def _ffill(data: np.ndarray) -> np.ndarray:
+    """Forward-fill ``nan`` values along each row."""
+    if data.size == 0:
+        return data
+    mask = np.isnan(data)
+    idx = np.where(~mask, np.arange(data.shape[1]), 0)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    # leading gaps point at column 0 which is itself nan, so they stay empty
+    return data[np.arange(data.shape[0])[:, None], idx]
@@ -0,0 +1,876 @@
+"""Shared realtime price polling for streaming endpoints.
+
+A :class:`PriceHub` runs one background poller per symbol that has at
+least one subscriber and fans each tick out to every subscriber's queue.
+SSE and WebSocket connections only read from their own queue, so upstream
+quote requests scale with the number of distinct symbols being watched
+rather than with the number of open connections.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import re
+import socket
+import threading
+import time
+import uuid
+import weakref
+from collections import deque
+from typing import Any, Callable, Iterable
+
+from flask import Flask, current_app
+
+from .intraday import aggregator
+from .live_indicators import IndicatorSet, load_indicator_set
+from .market_hours import PollScheduler
+from . import utils
+from .async_loop import run_coroutine
+from .feeds import Feed, WebSocketFeed
+from .utils import get_realtime_data, get_realtime_data_async
+
+logger = logging.getLogger(__name__)
+
+_SYMBOL = re.compile(r"[A-Z0-9.^=-]{1,10}")
+# How long the multi-symbol WebSocket loop waits for ticks before checking
+# for client messages again
+_RECEIVE_STEP = 0.2
+# Recent ticks kept per symbol so reconnecting clients can resume
+RESUME_BUFFER = 100
+# Seconds the recent ticks of a symbol nobody watches are kept for resuming
+RESUME_GRACE = 300
+# Seconds between checks for a new daily bar to reseed live indicators from
+LIVE_REFRESH = 900
+
+
+class SubscriptionLimitError(ValueError):
+    """Raised when a connection asks for more symbols than allowed."""
+
+
+class DeltaEncoder:
+    """Reduce one connection's ticks to the fields that changed.
+
+    ``state`` is what the client already has: empty for a new client, so
+    its first frame is a full snapshot, or the tick a resuming client last
+    saw. Removed fields are sent as ``None``. Every frame carries ``seq``.
+    """
+
+    def __init__(self, state: dict[str, Any] | None = None) -> None:
+        self.state: dict[str, Any] = dict(state or {})
+
+    def encode(self, tick: dict[str, Any]) -> dict[str, Any] | None:
+        """Delta frame for ``tick``, or ``None`` if nothing changed."""
+        if "seq" in tick and tick["seq"] == self.state.get("seq"):
+            return None
+        delta = {
+            k: v
+            for k, v in tick.items()
+            if k != "seq" and (k not in self.state or self.state[k] != v)
+        }
+        delta.update({k: None for k in self.state if k not in tick})
+        delta.pop("seq", None)
+        self.state = dict(tick)
+        if not delta:
+            return None
+        delta["seq"] = tick.get("seq")
+        return delta
+
+
+class SlowConsumerError(Exception):
+    """Raised to a subscriber dropped for falling too far behind."""
+
+
+DROP_OLDEST = "drop_oldest"
+COALESCE = "coalesce"
+DISCONNECT = "disconnect"
+SLOW_CONSUMER_POLICIES = (DROP_OLDEST, COALESCE, DISCONNECT)
+
+
+class StreamMetrics:
+    """Counters for subscriber queues, shared by every queue of a hub."""
+
+    def __init__(self) -> None:
+        self.dropped = 0
+        self.coalesced = 0
+        self.disconnected = 0
+        self._queues: weakref.WeakSet[SendQueue] = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def track(self, q: "SendQueue") -> None:
+        with self._lock:
+            self._queues.add(q)
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            queues = list(self._queues)
+            counters = {
+                "dropped": self.dropped,
+                "coalesced": self.coalesced,
+                "disconnected": self.disconnected,
+            }
+        depths = [q.qsize() for q in queues]
+        return {
+            "queues": len(queues),
+            "depth_total": sum(depths),
+            "depth_max": max(depths, default=0),
+            "depth_high_water": max((q.high_water for q in queues), default=0),
+            **counters,
+        }
+
+
+class SendQueue:
+    """Bounded queue of ticks waiting to be sent to one connection.
+
+    Publishing never blocks the poller. When ``maxsize`` ticks are already
+    waiting, ``policy`` decides what happens to a new one:
+
+    * ``drop_oldest`` discards the oldest waiting tick;
+    * ``coalesce`` keeps only the newest tick per symbol, so a slow client
+      skips intermediate prices but never misses a symbol;
+    * ``disconnect`` makes the next :meth:`get` raise
+      :class:`SlowConsumerError` so the connection is closed (the client
+      can reconnect and resume from its last ``seq``).
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 100,
+        policy: str = COALESCE,
+        metrics: StreamMetrics | None = None,
+    ) -> None:
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: {policy}")
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self.metrics = metrics
+        self.high_water = 0
+        self.overflowed = False
+        self._items: deque = deque()
+        self._cond = threading.Condition()
+        if metrics is not None:
+            metrics.track(self)
+
+    def put(self, tick: dict[str, Any]) -> None:
+        event = None
+        with self._cond:
+            if self.overflowed:
+                return
+            if self.policy == COALESCE:
+                for i, waiting in enumerate(self._items):
+                    if waiting.get("symbol") == tick.get("symbol"):
+                        self._items[i] = tick
+                        event = "coalesced"
+                        break
+            if event is None:
+                if len(self._items) >= self.maxsize:
+                    if self.policy == DISCONNECT:
+                        self.overflowed = True
+                        self._items.clear()
+                        event = "disconnected"
+                    else:
+                        self._items.popleft()
+                        event = "dropped"
+                if not self.overflowed:
+                    self._items.append(tick)
+            self.high_water = max(self.high_water, len(self._items))
+            self._cond.notify()
+        if event and self.metrics is not None:
+            self.metrics.count(event)
+
+    def get(self, timeout: float | None = None) -> dict[str, Any]:
+        """Oldest waiting tick; raises :class:`queue.Empty` on timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self.overflowed, timeout):
+                raise queue.Empty
+            if self.overflowed:
+                raise SlowConsumerError("Subscriber fell too far behind")
+            return self._items.popleft()
+
+    def get_nowait(self) -> dict[str, Any]:
+        return self.get(timeout=0)
+
+    def qsize(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+
+class Subscription:
+    """A subscriber's queue of ticks for one symbol.
+
+    Use as a context manager so the subscription is released when the
+    connection ends, letting the poller stop once nobody is listening.
+    """
+
+    def __init__(
+        self, hub: "PriceHub", symbol: str, sink: SendQueue | None = None
+    ) -> None:
+        self.hub = hub
+        self.symbol = symbol
+        self.queue = hub.new_queue() if sink is None else sink
+
+    def put(self, tick: dict[str, Any]) -> None:
+        self.queue.put(tick)
+
+    def get(self, timeout: float | None = None) -> dict[str, Any] | None:
+        """Next tick, or ``None`` if none arrives within ``timeout`` seconds.
+
+        Raises :class:`SlowConsumerError` if the subscriber was dropped.
+        """
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        self.hub.unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+class _Poller:
+    """Polling thread state for one symbol."""
+
+    def __init__(self, symbol: str) -> None:
+        self.symbol = symbol
+        self.subscribers: set[Subscription] = set()
+        self.stopped = threading.Event()
+        self.last: dict[str, Any] | None = None
+        self.thread: threading.Thread | None = None
+        self.live: IndicatorSet | None = None
+        self.live_checked: float | None = None
+        # recent behaviour of the quote, used to pick the polling interval
+        self.volatility: float | None = None
+        self.unchanged = 0
+
+
+class RedisBackplane:
+    """Share ticks between processes through Redis.
+
+    For each symbol one process holds a lease (``SET NX PX``) and is the only
+    one polling upstream. It publishes every tick to the symbol's channel and
+    keeps the latest one under a key for late joiners. A listener thread in
+    each process relays channel messages for the symbols it has subscribers
+    for. Pub/sub calls are made only from the listener thread because Redis
+    pub/sub connections are not thread-safe.
+    """
+
+    def __init__(self, client: Any, worker_id: str | None = None) -> None:
+        self.client = client
+        self.worker_id = worker_id or (
+            f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        )
+        self._commands: queue.Queue = queue.Queue()
+        self._deliver: Callable[..., None] | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def channel(symbol: str) -> str:
+        return f"ticks:{symbol}"
+
+    def acquire(self, symbol: str, ttl_ms: int) -> bool:
+        """Take or renew the polling lease for ``symbol``.
+
+        Renewal is a read followed by an expiry update, so a lease lapsing in
+        between can briefly leave two pollers; each still publishes valid
+        ticks and the next round settles on one.
+        """
+        key = f"ticks:lease:{symbol}"
+        if self.client.set(key, self.worker_id, nx=True, px=ttl_ms):
+            return True
+        if self._owns(key):
+            self.client.pexpire(key, ttl_ms)
+            return True
+        return False
+
+    def release(self, symbol: str) -> None:
+        key = f"ticks:lease:{symbol}"
+        if self._owns(key):
+            self.client.delete(key)
+
+    def _owns(self, key: str) -> bool:
+        owner = self.client.get(key)
+        if isinstance(owner, bytes):
+            owner = owner.decode()
+        return owner == self.worker_id
+
+    def publish(self, symbol: str, tick: dict[str, Any], ttl_ms: int) -> None:
+        data = json.dumps(tick)
+        self.client.set(f"ticks:last:{symbol}", data, px=ttl_ms)
+        self.client.publish(self.channel(symbol), data)
+
+    def last(self, symbol: str) -> dict[str, Any] | None:
+        data = self.client.get(f"ticks:last:{symbol}")
+        return json.loads(data) if data else None
+
+    def start(self, deliver: Callable[..., None]) -> None:
+        """Relay ticks from watched channels to ``deliver(symbol, tick)``.
+
+        On subscribing to a channel the stored latest tick is passed as
+        ``deliver(symbol, tick, True)`` in case it was published just before.
+        """
+        with self._lock:
+            self._deliver = deliver
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._listen, name="tick-backplane", daemon=True
+                )
+                self._thread.start()
+
+    def watch(self, symbol: str) -> None:
+        self._commands.put(("subscribe", self.channel(symbol)))
+
+    def unwatch(self, symbol: str) -> None:
+        self._commands.put(("unsubscribe", self.channel(symbol)))
+
+    def _listen(self) -> None:
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        while True:
+            try:
+                while True:
+                    try:
+                        action, channel = self._commands.get_nowait()
+                    except queue.Empty:
+                        break
+                    getattr(pubsub, action)(channel)
+                    symbol = channel.split(":", 1)[1]
+                    # a tick published before the subscription took effect
+                    tick = self.last(symbol) if action == "subscribe" else None
+                    if tick and self._deliver:
+                        self._deliver(symbol, tick, True)
+                message = pubsub.get_message(timeout=_RECEIVE_STEP)
+                if message and message.get("type") == "message" and self._deliver:
+                    channel = message["channel"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    self._deliver(channel.split(":", 1)[1], json.loads(message["data"]))
+                elif not message:
+                    time.sleep(0.01)
+            except Exception:
+                logger.exception("Tick backplane listener error")
+                time.sleep(1)
+
+
+class PriceHub:
+    """Fan out realtime quotes from one poller per symbol to many subscribers.
+
+    The hub keeps a reference to the application so pollers run inside its
+    app context regardless of which request started them. New subscribers
+    receive the latest tick straight away instead of waiting a full
+    ``PRICE_STREAM_INTERVAL``.
+
+    With a :class:`RedisBackplane` each process still runs a poller thread
+    per watched symbol, but only the lease holder fetches quotes; every
+    process receives ticks through Redis, so upstream requests do not grow
+    with the number of workers or nodes.
+
+    With a :class:`~stockapp.feeds.Feed` pollers fetch one REST quote per
+    symbol for EPS and the starting price, then prices arrive as the feed
+    pushes trades. Feed ticks bypass the backplane: every process holds its
+    own feed connection.
+    """
+
+    def __init__(
+        self,
+        app: Flask | None = None,
+        backplane: RedisBackplane | None = None,
+        feed: Feed | None = None,
+    ) -> None:
+        self.app: Flask | None = None
+        self.backplane = backplane
+        self.feed = feed
+        self._pollers: dict[str, _Poller] = {}
+        self._history: dict[str, deque] = {}
+        # when each symbol with a resume buffer lost its last subscriber
+        self._idle: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.metrics = StreamMetrics()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        self.app = app
+        app.extensions["price_hub"] = self
+        if self.backplane is None and app.config.get("REALTIME_BACKPLANE"):
+            if utils._redis is not None:
+                self.backplane = RedisBackplane(utils._redis)
+            else:
+                logger.warning("REALTIME_BACKPLANE needs REDIS_URL; polling locally")
+        if self.backplane is not None:
+            self.backplane.start(self._deliver)
+        if self.feed is None and app.config.get("REALTIME_FEED_URL"):
+            self.feed = WebSocketFeed(app.config["REALTIME_FEED_URL"])
+        if self.feed is not None:
+            self.feed.start(self._on_trade)
+
+    def new_queue(self) -> SendQueue:
+        """A subscriber queue sized and bounded as configured."""
+        config = self.app.config if self.app is not None else {}
+        return SendQueue(
+            config.get("STREAM_QUEUE_SIZE", 100),
+            config.get("STREAM_SLOW_CONSUMER_POLICY", COALESCE),
+            self.metrics,
+        )
+
+    def subscribe(self, symbol: str, sink: SendQueue | None = None) -> Subscription:
+        """Register a subscriber for ``symbol``, starting its poller if needed.
+
+        Ticks go to ``sink`` when given so one queue can collect several
+        symbols; each tick carries its ``symbol``.
+        """
+        sub = Subscription(self, symbol, sink)
+        with self._lock:
+            poller = self._pollers.get(symbol)
+            if poller is None:
+                poller = self._pollers[symbol] = _Poller(symbol)
+                self._idle.pop(symbol, None)
+                self._prune_history()
+                history = self._history.get(symbol)
+                # carry on from the last known state so unchanged prices
+                # are not republished under a new sequence number
+                poller.last = history[-1] if history else None
+                if self.backplane is not None:
+                    self.backplane.watch(symbol)
+                if self.feed is not None:
+                    self.feed.subscribe(symbol)
+                poller.thread = threading.Thread(
+                    target=self._poll,
+                    args=(poller,),
+                    name=f"price-poller-{symbol}",
+                    daemon=True,
+                )
+                poller.thread.start()
+            last = poller.last
+            poller.subscribers.add(sub)
+        if last is None and self.backplane is not None:
+            try:
+                last = self.backplane.last(symbol)
+            except Exception:
+                logger.exception("Could not read the last tick for %s", symbol)
+        if last is not None:
+            sub.put(last)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        """Remove ``sub``; the symbol's poller stops with its last subscriber."""
+        with self._lock:
+            poller = self._pollers.get(sub.symbol)
+            if poller is None:
+                return
+            poller.subscribers.discard(sub)
+            if not poller.subscribers:
+                poller.stopped.set()
+                del self._pollers[sub.symbol]
+                if sub.symbol in self._history:
+                    self._idle[sub.symbol] = time.monotonic()
+                self._prune_history()
+                if self.backplane is not None:
+                    self.backplane.unwatch(sub.symbol)
+                if self.feed is not None:
+                    self.feed.unsubscribe(sub.symbol)
+
+    def _prune_history(self) -> None:
+        """Drop resume buffers of symbols unwatched for ``RESUME_GRACE``.
+
+        Called with the lock held.
+        """
+        now = time.monotonic()
+        for symbol, since in list(self._idle.items()):
+            if now - since >= RESUME_GRACE:
+                del self._idle[symbol]
+                self._history.pop(symbol, None)
+
+    def state_at(self, symbol: str, seq: int | None) -> dict[str, Any] | None:
+        """The tick numbered ``seq`` if it is still in the resume buffer."""
+        if seq is None:
+            return None
+        with self._lock:
+            for tick in reversed(self._history.get(symbol, ())):
+                if tick.get("seq") == seq:
+                    return tick
+        return None
+
+    def subscriber_counts(self) -> dict[str, int]:
+        """Number of subscribers per actively polled symbol."""
+        with self._lock:
+            return {s: len(p.subscribers) for s, p in self._pollers.items()}
+
+    def stats(self) -> dict[str, int]:
+        """Poller, subscriber and send queue figures for monitoring."""
+        counts = self.subscriber_counts()
+        return {
+            "symbols": len(counts),
+            "subscribers": sum(counts.values()),
+            **self.metrics.snapshot(),
+        }
+
+    def _publish(self, poller: _Poller, tick: dict[str, Any]) -> None:
+        with self._lock:
+            if poller.stopped.is_set():
+                return
+            poller.last = tick
+            history = self._history.get(poller.symbol)
+            if history is None:
+                history = self._history[poller.symbol] = deque(maxlen=RESUME_BUFFER)
+            history.append(tick)
+            subscribers = list(poller.subscribers)
+        aggregator.add_tick(poller.symbol, tick.get("price"))
+        for sub in subscribers:
+            sub.put(tick)
+
+    def _deliver(self, symbol: str, tick: dict[str, Any], replay: bool = False) -> None:
+        """Hand a tick received from the backplane to local subscribers."""
+        with self._lock:
+            poller = self._pollers.get(symbol)
+        if poller is None or (replay and tick == poller.last):
+            return
+        self._publish(poller, tick)
+
+    def _on_trade(self, symbol: str, price: float, timestamp: int | None) -> None:
+        """Publish a trade pushed by the feed as a tick."""
+        with self._lock:
+            poller = self._pollers.get(symbol)
+            last = poller.last if poller is not None else None
+        # wait for the REST snapshot, which supplies EPS
+        if poller is None or last is None:
+            return
+        tick: dict[str, Any] = {"symbol": symbol, "price": price}
+        if last.get("eps") is not None:
+            tick["eps"] = last["eps"]
+        if poller.live is not None:
+            tick["indicators"] = poller.live.peek(price)
+        sequenced = self._sequence(poller, tick)
+        if sequenced is not None:
+            self._publish(poller, sequenced)
+
+    def _follow_feed(self, poller: _Poller) -> None:
+        """Publish one REST snapshot, then leave prices to the feed."""
+        self._refresh_live(poller)
+        tick = self._sequence(poller, self._fetch(poller.symbol, poller.live))
+        if tick is not None:
+            self._publish(poller, tick)
+        while not poller.stopped.wait(LIVE_REFRESH):
+            self._refresh_live(poller)
+
+    def _poll(self, poller: _Poller) -> None:
+        assert self.app is not None
+        backplane = self.backplane
+        with self.app.app_context():
+            if self.feed is not None:
+                self._follow_feed(poller)
+                return
+            while not poller.stopped.is_set():
+                interval = self._interval(poller)
+                # hold the lease across a few missed rounds before it lapses
+                ttl_ms = int(max(interval * 3, 1) * 1000)
+                shared = backplane is not None
+                try:
+                    leader = backplane is None or backplane.acquire(
+                        poller.symbol, ttl_ms
+                    )
+                except Exception:
+                    logger.exception("Backplane unavailable; polling locally")
+                    leader, shared = True, False
+                if leader:
+                    self._refresh_live(poller)
+                    tick = self._fetch(poller.symbol, poller.live)
+                    self._observe(poller, tick)
+                    tick = self._sequence(poller, tick)
+                    if tick is None:
+                        poller.stopped.wait(interval)
+                        continue
+                    try:
+                        if shared and backplane is not None:
+                            backplane.publish(poller.symbol, tick, ttl_ms)
+                    except Exception:
+                        logger.exception("Backplane publish failed")
+                        shared = False
+                    if not shared:
+                        self._publish(poller, tick)
+                poller.stopped.wait(interval)
+            if backplane is not None:
+                try:
+                    backplane.release(poller.symbol)
+                except Exception:
+                    logger.exception("Could not release the lease on %s", poller.symbol)
+
+    def _interval(self, poller: _Poller) -> float:
+        """Seconds until ``poller`` next fetches a quote."""
+        config = current_app.config
+        base = config.get("PRICE_STREAM_INTERVAL", 5)
+        if not config.get("ADAPTIVE_POLLING"):
+            return base
+        scheduler = PollScheduler(
+            base, closed_interval=config.get("PRICE_STREAM_CLOSED_INTERVAL", 900)
+        )
+        with self._lock:
+            subscribers = len(poller.subscribers)
+        return scheduler.interval(
+            poller.symbol, subscribers, poller.volatility, poller.unchanged
+        )
+
+    @staticmethod
+    def _observe(poller: _Poller, tick: dict[str, Any]) -> None:
+        """Track how often and how far the quote for ``poller`` moves."""
+        last = {k: v for k, v in (poller.last or {}).items() if k != "seq"}
+        if tick == last or "error" in tick:
+            poller.unchanged += 1
+            return
+        poller.unchanged = 0
+        price, before = tick.get("price"), last.get("price")
+        if isinstance(price, (int, float)) and isinstance(before, (int, float)):
+            if before:
+                move = abs(price / before - 1)
+                poller.volatility = (
+                    move
+                    if poller.volatility is None
+                    else 0.8 * poller.volatility + 0.2 * move
+                )
+
+    @staticmethod
+    def _sequence(poller: _Poller, tick: dict[str, Any]) -> dict[str, Any] | None:
+        """Number ``tick``, or return ``None`` if it matches the last one.
+
+        Sequence numbers follow the clock in milliseconds, so they keep
+        increasing across restarts and changes of lease holder.
+        """
+        last = dict(poller.last or {})
+        last_seq = last.pop("seq", 0)
+        if tick == last:
+            return None
+        tick["seq"] = max(last_seq + 1, int(time.time() * 1000))
+        return tick
+
+    def _refresh_live(self, poller: _Poller) -> None:
+        """Load seeded indicators, reseeding once a new daily bar closes.
+
+        Checks at most every ``LIVE_REFRESH`` seconds; the seeded state is
+        replaced only when its latest bar differs from the one in use.
+        """
+        now = time.monotonic()
+        if poller.live_checked is not None and now - poller.live_checked < LIVE_REFRESH:
+            return
+        poller.live_checked = now
+        live = self._load_live(poller.symbol)
+        if live is None:
+            return
+        if poller.live is None or live.last_date != poller.live.last_date:
+            poller.live = live
+
+    @staticmethod
+    def _load_live(symbol: str) -> IndicatorSet | None:
+        try:
+            return load_indicator_set(symbol)
+        except Exception:
+            logger.exception("Live indicators unavailable for %s", symbol)
+            return None
+
+    def _fetch(self, symbol: str, live: IndicatorSet | None) -> dict[str, Any]:
+        """Fetch one quote and build the tick sent to subscribers."""
+        config = current_app.config
+        provider = config.get("REALTIME_PROVIDER", "fmp")
+        try:
+            if config.get("ASYNC_REALTIME"):
+                price, eps = run_coroutine(
+                    get_realtime_data_async(symbol, provider), timeout=30
+                )
+            else:
+                price, eps = get_realtime_data(symbol, provider)
+            tick: dict[str, Any] = {"symbol": symbol, "price": price, "eps": eps}
+            if live and price is not None:
+                tick["indicators"] = live.peek(price)
+            return tick
+        except Exception:
+            logger.exception("Realtime poll failed for %s", symbol)
+            return {"symbol": symbol, "error": "fetch"}
+
+
+class MultiSubscription:
+    """Ticks for a changing set of symbols delivered through one queue."""
+
+    def __init__(self, hub: PriceHub, max_symbols: int) -> None:
+        self.hub = hub
+        self.max_symbols = max_symbols
+        self.queue = hub.new_queue()
+        self._subs: dict[str, Subscription] = {}
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._subs
+
+    @property
+    def symbols(self) -> list[str]:
+        return sorted(self._subs)
+
+    def add(self, symbols: Iterable[str]) -> None:
+        """Subscribe to ``symbols``; all or none are added."""
+        new = [s for s in dict.fromkeys(symbols) if s not in self._subs]
+        if len(self._subs) + len(new) > self.max_symbols:
+            raise SubscriptionLimitError(
+                f"At most {self.max_symbols} symbols per connection"
+            )
+        for symbol in new:
+            self._subs[symbol] = self.hub.subscribe(symbol, sink=self.queue)
+
+    def remove(self, symbols: Iterable[str]) -> None:
+        for symbol in symbols:
+            sub = self._subs.pop(symbol, None)
+            if sub is not None:
+                sub.close()
+
+    def drain(self, timeout: float) -> dict[str, dict[str, Any]]:
+        """Latest tick per subscribed symbol.
+
+        Waits up to ``timeout`` seconds for a first tick, then takes
+        whatever else is already queued without blocking. Raises
+        :class:`SlowConsumerError` if the connection was dropped.
+        """
+        ticks: dict[str, dict[str, Any]] = {}
+        try:
+            tick = self.queue.get(timeout=timeout)
+            while True:
+                if tick.get("symbol") in self._subs:
+                    ticks[tick["symbol"]] = tick
+                tick = self.queue.get_nowait()
+        except queue.Empty:
+            pass
+        return ticks
+
+    def close(self) -> None:
+        self.remove(list(self._subs))
+
+    def __enter__(self) -> "MultiSubscription":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def valid_symbol(symbol: str) -> bool:
+    """Whether ``symbol`` is an upper-case ticker the hub may poll."""
+    return bool(_SYMBOL.fullmatch(symbol))
+
+
+def parse_symbols(raw: Any) -> list[str]:
+    """Validate a list of ticker symbols from a client message."""
+    if not isinstance(raw, list) or not all(isinstance(s, str) for s in raw):
+        raise ValueError("symbols must be a list of strings")
+    symbols = [s.strip().upper() for s in raw]
+    bad = [s for s in symbols if not valid_symbol(s)]
+    if bad:
+        raise ValueError(f"Invalid symbol: {bad[0]}")
+    return symbols
+
+
+def _handle_message(
+    message: str, subs: MultiSubscription, encoders: dict[str, DeltaEncoder]
+) -> dict[str, Any]:
+    """Apply one subscribe/unsubscribe message and return the reply frame.
+
+    A subscribe message may carry ``"since": {symbol: seq}`` with the last
+    sequence numbers a reconnecting client saw, so it receives only what
+    changed since then.
+    """
+    try:
+        msg = json.loads(message)
+    except ValueError:
+        return {"type": "error", "error": "invalid JSON"}
+    action = msg.get("action") if isinstance(msg, dict) else None
+    if action not in ("subscribe", "unsubscribe"):
+        return {"type": "error", "error": "action must be subscribe or unsubscribe"}
+    try:
+        symbols = parse_symbols(msg.get("symbols"))
+        since = msg.get("since") or {}
+        if not isinstance(since, dict) or not all(
+            isinstance(v, int) for v in since.values()
+        ):
+            raise ValueError("since must map symbols to sequence numbers")
+        if action == "subscribe":
+            subs.add(symbols)
+            for symbol in symbols:
+                if symbol not in encoders:
+                    seq = since.get(symbol, since.get(symbol.lower()))
+                    encoders[symbol] = DeltaEncoder(subs.hub.state_at(symbol, seq))
+        else:
+            subs.remove(symbols)
+            for symbol in symbols:
+                encoders.pop(symbol, None)
+    except ValueError as exc:
+        return {"type": "error", "error": str(exc), "symbols": subs.symbols}
+    return {"type": "subscribed", "symbols": subs.symbols}
+
+
+def stream_symbols(
+    ws: Any,
+    first_message: str,
+    hub: PriceHub,
+    max_symbols: int,
+    interval: float,
+    heartbeat: float = 15,
+    max_frames: int | None = None,
+) -> None:
+    """Serve the multi-symbol WebSocket protocol on ``ws``.
+
+    Clients send ``{"action": "subscribe" | "unsubscribe", "symbols": [...]}``
+    and get back ``{"type": "subscribed", "symbols": [...]}`` with the full
+    subscription, or an ``error`` frame. Updates arrive batched, at most one
+    ``{"type": "ticks", "ticks": {symbol: delta}}`` frame per ``interval``,
+    where each delta holds only the fields that changed plus ``seq``. A
+    ``{"type": "heartbeat"}`` frame is sent after ``heartbeat`` idle seconds.
+    """
+    encoders: dict[str, DeltaEncoder] = {}
+    with MultiSubscription(hub, max_symbols) as subs:
+        message: str | None = first_message
+        pending: dict[str, dict[str, Any]] = {}
+        next_flush = 0.0
+        last_sent = time.monotonic()
+        frames = 0
+        while True:
+            while message is not None:
+                reply = _handle_message(message, subs, encoders)
+                ws.send(json.dumps(reply))
+                last_sent = time.monotonic()
+                if reply["type"] == "subscribed":
+                    # let ticks for newly added symbols through straight away
+                    next_flush = 0.0
+                message = ws.receive(timeout=0)
+            try:
+                pending.update(subs.drain(_RECEIVE_STEP))
+            except SlowConsumerError as exc:
+                ws.send(json.dumps({"type": "error", "error": str(exc)}))
+                break
+            now = time.monotonic()
+            frame: dict[str, Any] | None = None
+            if pending and now >= next_flush:
+                deltas = {
+                    s: encoders[s].encode(t) for s, t in pending.items() if s in subs
+                }
+                pending = {}
+                ticks = {s: d for s, d in deltas.items() if d is not None}
+                if ticks:
+                    frame = {"type": "ticks", "ticks": ticks}
+                    next_flush = now + interval
+            if frame is None and now - last_sent >= heartbeat:
+                frame = {"type": "heartbeat"}
+            if frame is not None:
+                ws.send(json.dumps(frame))
+                last_sent = now
+                frames += 1
+                if max_frames and frames >= max_frames:
+                    break
+            message = ws.receive(timeout=0)
+
+
+def get_price_hub() -> PriceHub:
+    """The :class:`PriceHub` of the current application."""
+    return current_app.extensions["price_hub"]
@@ -23,27 +23,31 @@ def _parse_cron(expr: str) -> crontab:
 
 
 from .extensions import db
+from .activity import get_activity_recorder
+from .alert_state import should_alert
 from .models import (
     User,
     WatchlistItem,
     Alert,
+    AlertState,
     CustomAlertRule,
     PortfolioItem,
     History,
     StockRecord,
     DataSnapshot,
+    Fundamentals,
 )
 from .utils import (
     get_stock_data,
     get_historical_prices,
-    moving_average,
-    calculate_rsi,
+    latest_indicators,
     send_email,
     send_sms,
     send_mobile_push,
     notify_user_push,
     ALERT_PE_THRESHOLD,
     get_upcoming_dividends,
+    refresh_fundamentals,
     NotificationError,
 )
 from .portfolio.helpers import (
@@ -134,7 +138,19 @@ def init_celery(app: Flask) -> None:
                 app.config.get("DATA_SNAPSHOT_CRON", "0 7 * * *")
             ),
         },
+        "refresh-fundamentals-nightly": {
+            "task": "stockapp.tasks.refresh_fundamentals_task",
+            "schedule": _parse_cron(
+                app.config.get("FUNDAMENTALS_REFRESH_CRON", "30 2 * * *")
+            ),
+        },
     }
+    # a Redis activity queue is shared, so any worker can write it out
+    if app.config.get("ACTIVITY_BUFFER") == "redis":
+        celery.conf.beat_schedule["flush-activity"] = {
+            "task": "stockapp.tasks.flush_activity_task",
+            "schedule": timedelta(seconds=app.config.get("ACTIVITY_FLUSH_INTERVAL", 5)),
+        }
 
 
 def _get_price(symbol: str) -> float | None:
@@ -164,20 +180,66 @@ def _price_change(symbol: str, days: int) -> float | None:
     return None
 
 
+def notify_watchlist_alerts(user: User, messages: list[str]) -> None:
+    """Send alert ``messages`` over every channel ``user`` has enabled.
+
+    Users who prefer digests get one combined notification per channel.
+    """
+    if user.digest_pref:
+        batches = [("Watchlist Alerts", "\n".join(messages))]
+    else:
+        batches = [("Watchlist Alert", msg) for msg in messages]
+    for subject, body in batches:
+        if user.email:
+            send_email_task.delay(user.email, subject, body)
+        if user.sms_opt_in and user.phone_number:
+            send_sms_task.delay(user.phone_number, body)
+        if user.fcm_token:
+            send_mobile_push_task.delay(user.fcm_token, "MarketMinder Alert", body)
+        notify_user_push(user.id, body)
+
+
 def _check_watchlists() -> None:
-    """Check all user watchlists and send alerts when thresholds are exceeded."""
+    """Check all user watchlists and send alerts when thresholds are exceeded.
+
+    Quotes and history are fetched once per distinct symbol and RSI/MA
+    values for all symbols are computed in one batched pass.
+    """
     now = datetime.utcnow()
-    users = User.query.all()
-    for user in users:
+    users = []
+    for user in User.query.all():
         if not user.email:
             continue
         freq = user.alert_frequency or 24
         last = user.last_alert_time or datetime.min
         if now - last < timedelta(hours=freq):
             continue
-        items = WatchlistItem.query.filter_by(user_id=user.id).all()
-        messages = []
+        users.append(user)
+    watchlists = {
+        user.id: WatchlistItem.query.filter_by(user_id=user.id).all() for user in users
+    }
+    items_by_symbol: dict[str, list[WatchlistItem]] = {}
+    for items in watchlists.values():
         for item in items:
+            items_by_symbol.setdefault(item.symbol, []).append(item)
+    quotes = {symbol: get_stock_data(symbol) for symbol in items_by_symbol}
+    history = {}
+    for symbol, items in items_by_symbol.items():
+        if any(
+            i.rsi_threshold is not None or i.ma_threshold is not None for i in items
+        ):
+            _d, prices = get_historical_prices(symbol, days=60)
+            if prices:
+                history[symbol] = prices
+    latest = latest_indicators(history, {s: quotes[s][6] for s in history}, 14, 50)
+
+    for user in users:
+        messages = []
+        # (symbol, condition) -> [holds for any item, message of the first
+        # item it holds for]: alert state is per symbol and condition, so
+        # several watchlist entries for one symbol are judged together
+        conditions: dict[tuple[str, str], list] = {}
+        for item in watchlists[user.id]:
             (
                 _name,
                 _logo_url,
@@ -190,77 +252,72 @@ def _check_watchlists() -> None:
                 _market_cap,
                 debt_to_equity,
                 *_rest,
-            ) = get_stock_data(item.symbol)
-            alerts = []
+            ) = quotes[item.symbol]
+            checks = []  # (condition, holds, message)
             if price is not None and eps:
                 pe_ratio = round(price / eps, 2)
                 threshold = item.pe_threshold or ALERT_PE_THRESHOLD
-                if pe_ratio > threshold:
-                    alerts.append(
-                        f"{item.symbol} P/E ratio {pe_ratio} exceeds threshold {threshold}"
+                checks.append(
+                    (
+                        "pe",
+                        pe_ratio > threshold,
+                        f"{item.symbol} P/E ratio {pe_ratio} exceeds threshold {threshold}",
+                    )
+                )
+            if debt_to_equity is not None and item.de_threshold is not None:
+                checks.append(
+                    (
+                        "de",
+                        debt_to_equity > item.de_threshold,
+                        f"{item.symbol} Debt/Equity {round(debt_to_equity,2)} exceeds threshold {item.de_threshold}",
                     )
-            if (
-                debt_to_equity is not None
-                and item.de_threshold is not None
-                and debt_to_equity > item.de_threshold
-            ):
-                alerts.append(
-                    f"{item.symbol} Debt/Equity {round(debt_to_equity,2)} exceeds threshold {item.de_threshold}"
                 )
-            if item.rsi_threshold is not None or item.ma_threshold is not None:
-                _d, prices = get_historical_prices(item.symbol, days=60)
-                if prices:
-                    if item.rsi_threshold is not None:
-                        rsi = calculate_rsi(prices, 14)
-                        if rsi and rsi[-1] is not None and rsi[-1] > item.rsi_threshold:
-                            alerts.append(
-                                f"{item.symbol} RSI {rsi[-1]} exceeds threshold {item.rsi_threshold}"
-                            )
-                    if item.ma_threshold is not None and price is not None:
-                        ma = moving_average(prices, 50)
-                        if ma and ma[-1] is not None:
-                            diff = abs(price - ma[-1]) / ma[-1] * 100
-                            if diff > item.ma_threshold:
-                                alerts.append(
-                                    f"{item.symbol} price deviation {round(diff,2)}% exceeds {item.ma_threshold}% from 50d MA"
-                                )
-            for msg in alerts:
-                db.session.add(Alert(symbol=item.symbol, message=msg, user_id=user.id))
+            values = latest.get(item.symbol)
+            if values:
+                rsi = values["rsi"]
+                if item.rsi_threshold is not None and rsi is not None:
+                    checks.append(
+                        (
+                            "rsi",
+                            rsi > item.rsi_threshold,
+                            f"{item.symbol} RSI {rsi} exceeds threshold {item.rsi_threshold}",
+                        )
+                    )
+                diff = values["deviation"]
+                if item.ma_threshold is not None and diff is not None:
+                    checks.append(
+                        (
+                            "ma",
+                            diff > item.ma_threshold,
+                            f"{item.symbol} price deviation {diff}% exceeds {item.ma_threshold}% from 50d MA",
+                        )
+                    )
+            for condition, holds, msg in checks:
+                state = conditions.setdefault((item.symbol, condition), [False, None])
+                if holds and not state[0]:
+                    state[:] = [True, msg]
+        for (symbol, condition), (holds, msg) in conditions.items():
+            # a condition that still holds was already reported
+            if should_alert(user.id, symbol, condition, holds, now):
+                db.session.add(Alert(symbol=symbol, message=msg, user_id=user.id))
                 messages.append(msg)
         # Evaluate custom alert rules defined by the user
         rules = CustomAlertRule.query.filter_by(user_id=user.id).all()
         for rule in rules:
             context = {"price": _get_price, "change": _price_change}
             try:
-                if eval(rule.rule, {"__builtins__": {}}, context):
-                    message = rule.description or rule.rule
-                    db.session.add(Alert(symbol=None, message=message, user_id=user.id))
-                    messages.append(message)
+                holds = bool(eval(rule.rule, {"__builtins__": {}}, context))
             except Exception:  # pragma: no cover - rule error
                 logger.exception(
                     "Error evaluating rule '%s' for user %s", rule.rule, user.id
                 )
+                continue
+            if should_alert(user.id, None, f"rule:{rule.id}", holds, now):
+                message = rule.description or rule.rule
+                db.session.add(Alert(symbol=None, message=message, user_id=user.id))
+                messages.append(message)
         if messages:
-            if user.digest_pref:
-                body = "\n".join(messages)
-                send_email_task.delay(user.email, "Watchlist Alerts", body)
-                if user.sms_opt_in and user.phone_number:
-                    send_sms_task.delay(user.phone_number, body)
-                if user.fcm_token:
-                    send_mobile_push_task.delay(
-                        user.fcm_token, "MarketMinder Alert", body
-                    )
-                notify_user_push(user.id, body)
-            else:
-                for msg in messages:
-                    send_email_task.delay(user.email, "Watchlist Alert", msg)
-                    if user.sms_opt_in and user.phone_number:
-                        send_sms_task.delay(user.phone_number, msg)
-                    if user.fcm_token:
-                        send_mobile_push_task.delay(
-                            user.fcm_token, "MarketMinder Alert", msg
-                        )
-                    notify_user_push(user.id, msg)
+            notify_watchlist_alerts(user, messages)
             user.last_alert_time = now
     db.session.commit()
 
@@ -377,6 +434,9 @@ def _cleanup_old_data(days: int = 30) -> None:
     Alert.query.filter(Alert.timestamp < cutoff).delete()
     History.query.filter(History.timestamp < cutoff).delete()
     StockRecord.query.filter(StockRecord.timestamp < cutoff).delete()
+    AlertState.query.filter(
+        AlertState.active.is_(False), AlertState.last_fired < cutoff
+    ).delete()
     db.session.commit()
 
 
@@ -386,6 +446,14 @@ def cleanup_old_data_task() -> None:
     _cleanup_old_data()
 
 
+@celery.task(name="stockapp.tasks.flush_activity_task")
+def flush_activity_task() -> None:
+    """Write queued searches and lookups to the database."""
+    written = get_activity_recorder().flush()
+    if written:
+        logger.info("Wrote %s queued activity rows", written)
+
+
 def _create_snapshots() -> None:
     """Persist daily portfolio and watchlist data for each user."""
     now = datetime.utcnow()
@@ -422,3 +490,18 @@ def _create_snapshots() -> None:
 def create_snapshots_task() -> None:
     """Celery task wrapper for ``_create_snapshots``."""
     _create_snapshots()
+
+
+def _refresh_fundamentals() -> None:
+    """Refresh stored fundamentals for every watched, held or cached symbol."""
+    symbols = {s for (s,) in db.session.query(WatchlistItem.symbol).distinct()}
+    symbols |= {s for (s,) in db.session.query(PortfolioItem.symbol).distinct()}
+    symbols |= {s for (s,) in db.session.query(Fundamentals.symbol).distinct()}
+    count = refresh_fundamentals(symbols)
+    logger.info("Refreshed fundamentals for %s symbols", count)
+
+
+@celery.task(name="stockapp.tasks.refresh_fundamentals_task")
+def refresh_fundamentals_task() -> None:
+    """Celery task wrapper for ``_refresh_fundamentals``."""
+    _refresh_fundamentals()
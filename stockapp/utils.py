@@ -8,11 +8,14 @@ import requests
 import httpx
 import asyncio
 import smtplib
+import hashlib
 import os
+import threading
+from collections import OrderedDict
 from email.mime.text import MIMEText
-from typing import Any, Iterable, TYPE_CHECKING
+from typing import Any, Callable, Iterable, TYPE_CHECKING
 
-from flask import current_app, has_request_context, request
+from flask import current_app, has_app_context, has_request_context, request
 from flask_login import current_user
 from babel import Locale
 from babel.numbers import format_currency, format_decimal
@@ -23,6 +26,9 @@ from urllib3.util import Retry
 import urllib.parse
 from pywebpush import webpush
 
+from . import indicators
+from .async_loop import shared_http_client
+
 if TYPE_CHECKING:  # pragma: no cover - optional dependency types
     from .models import PushSubscription
 
@@ -93,9 +99,14 @@ session.mount("https://", adapter)
 
 # Cache configuration. Uses Redis when available with in-memory fallback
 CACHE_TTL = int(os.environ.get("API_CACHE_TTL", 3600))
+# Entries kept by the in-process fallback, least recently used evicted first
+CACHE_MAX_ENTRIES = int(os.environ.get("API_CACHE_MAX_ENTRIES", 10000))
 REDIS_URL = os.environ.get("REDIS_URL")
-_cache = {}
+_cache: OrderedDict = OrderedDict()
+_cache_lock = threading.Lock()
 _redis = None
+# Maximum age in seconds of stored fundamentals before they are refetched
+FUNDAMENTALS_MAX_AGE = int(os.environ.get("FUNDAMENTALS_MAX_AGE", 7 * 24 * 3600))
 if redis and REDIS_URL:
     try:
         _redis = redis.Redis.from_url(REDIS_URL)
@@ -115,13 +126,15 @@ def _get_cached(key: Any) -> Any | None:
             logger.error("Redis get error for %s: %s", key, e)
         except Exception:
             logger.exception("Unexpected Redis get error for %s", key)
-    data = _cache.get(key)
-    if not data:
-        return None
-    value, ts = data
-    if time.time() - ts < CACHE_TTL:
-        return value
-    _cache.pop(key, None)
+    with _cache_lock:
+        data = _cache.get(key)
+        if not data:
+            return None
+        value, ts = data
+        if time.time() - ts < CACHE_TTL:
+            _cache.move_to_end(key)
+            return value
+        _cache.pop(key, None)
     return None
 
 
@@ -134,7 +147,28 @@ def _set_cached(key: Any, value: Any) -> None:
             logger.error("Redis set error for %s: %s", key, e)
         except Exception:
             logger.exception("Unexpected Redis set error for %s", key)
-    _cache[key] = (value, time.time())
+    with _cache_lock:
+        _cache[key] = (value, time.time())
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def cache_timestamp(key: Any) -> float | None:
+    """Return when the cached value for ``key`` was stored, if still fresh."""
+    if _redis:
+        try:
+            ttl = _redis.ttl(key)
+            if ttl and ttl > 0:
+                return float(int(time.time()) - CACHE_TTL + ttl)
+        except RedisError as e:  # pragma: no cover - redis failure
+            logger.error("Redis ttl error for %s: %s", key, e)
+        except Exception:
+            logger.exception("Unexpected Redis ttl error for %s", key)
+    data = _cache.get(key)
+    if data and time.time() - data[1] < CACHE_TTL:
+        return data[1]
+    return None
 
 
 def _fetch_json(url: str, desc: str, symbol: str | None = None) -> Any:
@@ -210,12 +244,16 @@ async def _fetch_json_async(url: str, desc: str, symbol: str | None = None) -> A
     cached = _get_cached(url)
 
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
+        client = shared_http_client()
+        if client is not None:
             resp = await client.get(url)
-            resp.raise_for_status()
-            data = resp.json()
-            _set_cached(url, data)
-            return data
+        else:
+            async with httpx.AsyncClient(timeout=10) as client:
+                resp = await client.get(url)
+        resp.raise_for_status()
+        data = resp.json()
+        _set_cached(url, data)
+        return data
     except (
         httpx.RequestError,
         httpx.HTTPStatusError,
@@ -510,17 +548,17 @@ def get_historical_prices(symbol: str, days: int = 30) -> tuple[list[str], list[
         return cached if cached else ([], [])
 
 
-def get_historical_ohlc(
+def get_historical_bars(
     symbol: str, days: int = 30
-) -> tuple[list[str], list[float], list[float], list[float], list[float]]:
-    """Return historical open-high-low-close data for ``symbol``."""
-    cache_key = ("hist_ohlc", symbol, days)
+) -> tuple[list[str], list[float], list[float], list[float], list[float], list[float]]:
+    """Return historical dates, open, high, low, close and volume for ``symbol``."""
+    cache_key = ("hist_bars", symbol, days)
     cached = _get_cached(cache_key)
     if cached:
         return cached
     if API_KEY_MISSING:
         logger.warning("API key missing; returning empty OHLC data for %s", symbol)
-        return ([], [], [], [], [])
+        return ([], [], [], [], [], [])
     url = (
         f"https://financialmodelingprep.com/api/v3/historical-price-full/{symbol}"
         f"?timeseries={days}&apikey={API_KEY}"
@@ -529,20 +567,25 @@ def get_historical_ohlc(
         resp = session.get(url, timeout=10)
         resp.raise_for_status()
         data = resp.json()
-        hist = data.get("historical", [])
-        dates = [item.get("date") for item in hist][::-1]
-        opens = [item.get("open") for item in hist][::-1]
-        highs = [item.get("high") for item in hist][::-1]
-        lows = [item.get("low") for item in hist][::-1]
-        closes = [item.get("close") for item in hist][::-1]
-        result = (dates, opens, highs, lows, closes)
-        if dates:
+        hist = data.get("historical", [])[::-1]
+        result = tuple(
+            [item.get(field) for item in hist]
+            for field in ("date", "open", "high", "low", "close", "volume")
+        )
+        if result[0]:
             _set_cached(cache_key, result)
         return result
     except Exception as e:  # pragma: no cover - network failure
         logger.error("Historical OHLC error for %s: %s", symbol, e)
         cached = _get_cached(cache_key)
-        return cached if cached else ([], [], [], [], [])
+        return cached if cached else ([], [], [], [], [], [])
+
+
+def get_historical_ohlc(
+    symbol: str, days: int = 30
+) -> tuple[list[str], list[float], list[float], list[float], list[float]]:
+    """Return historical open-high-low-close data for ``symbol``."""
+    return get_historical_bars(symbol, days)[:5]
 
 
 def format_market_cap(value: float | None, currency: str) -> str:
@@ -612,6 +655,222 @@ def _get_asx_stock_data(symbol: str) -> tuple[Any, ...]:
         return (None,) * 23
 
 
+FUNDAMENTAL_FIELDS = (
+    "name",
+    "logo_url",
+    "sector",
+    "industry",
+    "exchange",
+    "currency",
+    "debt_to_equity",
+    "pb_ratio",
+    "roe",
+    "roa",
+    "profit_margin",
+    "analyst_rating",
+    "dividend_yield",
+    "payout_ratio",
+    "earnings_growth",
+    "price_to_sales",
+    "ev_to_ebitda",
+    "price_to_fcf",
+    "fcf_per_share",
+    "current_ratio",
+)
+_TEXT_FUNDAMENTALS = {
+    "name",
+    "logo_url",
+    "sector",
+    "industry",
+    "exchange",
+    "currency",
+    "analyst_rating",
+}
+
+
+def _to_float(value: Any) -> float | None:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _fetch_fundamentals(symbol: str) -> dict[str, Any]:
+    """Fetch profile, ratio, key metric, rating and growth data from FMP."""
+    profile_url = (
+        f"https://financialmodelingprep.com/api/v3/profile/{symbol}?apikey={API_KEY}"
+    )
+    ratios_url = (
+        f"https://financialmodelingprep.com/api/v3/ratios-ttm/{symbol}?apikey={API_KEY}"
+    )
+    metrics_url = f"https://financialmodelingprep.com/api/v3/key-metrics-ttm/{symbol}?apikey={API_KEY}"
+    rating_url = (
+        f"https://financialmodelingprep.com/api/v3/rating/{symbol}?apikey={API_KEY}"
+    )
+    growth_url = f"https://financialmodelingprep.com/api/v3/financial-growth/{symbol}?limit=1&apikey={API_KEY}"
+
+    data: dict[str, Any] = dict.fromkeys(FUNDAMENTAL_FIELDS)
+
+    profile_data = _fetch_json(profile_url, "profile", symbol)
+    if isinstance(profile_data, list) and len(profile_data) > 0:
+        profile = profile_data[0]
+        data["name"] = profile.get("companyName", "")
+        data["logo_url"] = profile.get("image", "")
+        data["sector"] = profile.get("sector", "")
+        data["industry"] = profile.get("industry", "")
+        data["exchange"] = profile.get("exchangeShortName", "")
+        data["currency"] = profile.get("currency", "USD")
+
+    ratio_data = _fetch_json(ratios_url, "ratios", symbol)
+    if isinstance(ratio_data, list) and len(ratio_data) > 0:
+        r = ratio_data[0]
+        data["debt_to_equity"] = r.get("debtEquityRatioTTM")
+        data["pb_ratio"] = r.get("priceToBookRatioTTM")
+        data["roe"] = r.get("returnOnEquityTTM")
+        data["roa"] = r.get("returnOnAssetsTTM")
+        data["profit_margin"] = r.get("netProfitMarginTTM")
+        data["dividend_yield"] = r.get("dividendYielTTM") or r.get("dividendYieldTTM")
+        data["payout_ratio"] = r.get("payoutRatioTTM") or r.get("payoutRatio")
+        data["price_to_sales"] = r.get("priceToSalesRatioTTM")
+        data["price_to_fcf"] = (
+            r.get("priceToFreeCashFlowRatioTTM")
+            or r.get("priceToFreeCashFlowsRatioTTM")
+            or r.get("priceFreeCashFlowRatioTTM")
+            or r.get("priceCashFlowRatioTTM")
+        )
+        data["current_ratio"] = r.get("currentRatioTTM")
+
+    metrics_data = _fetch_json(metrics_url, "key metrics", symbol)
+    if isinstance(metrics_data, list) and len(metrics_data) > 0:
+        m = metrics_data[0]
+        data["ev_to_ebitda"] = (
+            m.get("evToEbitdaTTM")
+            or m.get("evToEbitda")
+            or m.get("enterpriseValueOverEBITDA")
+        )
+        data["fcf_per_share"] = m.get("freeCashFlowPerShareTTM") or m.get(
+            "freeCashFlowPerShare"
+        )
+
+    rating_data = _fetch_json(rating_url, "rating", symbol)
+    if isinstance(rating_data, list) and len(rating_data) > 0:
+        data["analyst_rating"] = rating_data[0].get(
+            "ratingRecommendation"
+        ) or rating_data[0].get("rating")
+
+    growth_data = _fetch_json(growth_url, "growth", symbol)
+    if isinstance(growth_data, list) and len(growth_data) > 0:
+        data["earnings_growth"] = growth_data[0].get("growthEPS") or growth_data[0].get(
+            "epsgrowth"
+        )
+
+    return data
+
+
+def _load_fundamentals(symbol: str) -> tuple[dict[str, Any] | None, datetime | None]:
+    """Return stored fundamentals for ``symbol`` and when they were refreshed."""
+    if not has_app_context():
+        return None, None
+    from .models import Fundamentals
+
+    try:
+        row = Fundamentals.query.filter_by(symbol=symbol).first()
+    except Exception:
+        logger.exception("Error loading fundamentals for %s", symbol)
+        return None, None
+    if row is None:
+        return None, None
+    return {f: getattr(row, f) for f in FUNDAMENTAL_FIELDS}, row.updated_at
+
+
+def _write_fundamentals(session: Any, symbol: str, data: dict[str, Any]) -> None:
+    """Insert or update the fundamentals row for ``symbol`` in ``session``."""
+    from .models import Fundamentals
+
+    row = session.query(Fundamentals).filter_by(symbol=symbol).first()
+    if row is None:
+        row = Fundamentals(symbol=symbol)
+        session.add(row)
+    for field in FUNDAMENTAL_FIELDS:
+        value = data.get(field)
+        if field not in _TEXT_FUNDAMENTALS:
+            value = _to_float(value)
+        setattr(row, field, value)
+    row.updated_at = datetime.utcnow()
+
+
+def _store_fundamentals(symbol: str, data: dict[str, Any]) -> None:
+    """Persist fundamentals for ``symbol`` in a transaction of their own.
+
+    A separate session is used so that storing fundamentals while serving a
+    request never commits or rolls back the request's pending changes.
+    """
+    if not has_app_context():
+        return
+    from sqlalchemy.orm import Session
+
+    from .extensions import db
+
+    with Session(db.engine) as session:
+        try:
+            _write_fundamentals(session, symbol, data)
+            session.commit()
+        except Exception:
+            logger.exception("Error storing fundamentals for %s", symbol)
+            session.rollback()
+
+
+def get_fundamentals(symbol: str, refresh: bool = False) -> dict[str, Any]:
+    """Return company fundamentals for ``symbol``.
+
+    Values are read from the :class:`~stockapp.models.Fundamentals` table first
+    so they survive cache flushes and restarts. Missing or stale rows (older
+    than ``FUNDAMENTALS_MAX_AGE`` seconds) are fetched from the API and stored.
+    Pass ``refresh=True`` to bypass the stored copy.
+    """
+    stored, updated_at = (None, None) if refresh else _load_fundamentals(symbol)
+    if stored is not None and updated_at is not None:
+        if datetime.utcnow() - updated_at < timedelta(seconds=FUNDAMENTALS_MAX_AGE):
+            return stored
+    data = _fetch_fundamentals(symbol)
+    if any(value is not None for value in data.values()):
+        _store_fundamentals(symbol, data)
+        return data
+    if stored is not None:
+        logger.info("Using stale fundamentals for %s", symbol)
+        return stored
+    return data
+
+
+def refresh_fundamentals(symbols: Iterable[str]) -> int:
+    """Refetch and store fundamentals for ``symbols`` in a single transaction.
+
+    Returns the number of symbols that were refreshed.
+    """
+    if API_KEY_MISSING:
+        logger.warning("API key missing; skipping fundamentals refresh")
+        return 0
+    from .extensions import db
+
+    refreshed = 0
+    for symbol in sorted(set(symbols)):
+        if not symbol or symbol.lower().endswith(".ax"):
+            continue
+        data = _fetch_fundamentals(symbol)
+        if not any(value is not None for value in data.values()):
+            continue
+        # a savepoint per symbol keeps the rows already staged if one fails
+        try:
+            with db.session.begin_nested():
+                _write_fundamentals(db.session, symbol, data)
+        except Exception:
+            logger.exception("Error storing fundamentals for %s", symbol)
+            continue
+        refreshed += 1
+    db.session.commit()
+    return refreshed
+
+
 def get_stock_data(symbol: str) -> tuple[Any, ...]:
     cache_key = ("stock", symbol)
     cached = _get_cached(cache_key)
@@ -633,86 +892,17 @@ def get_stock_data(symbol: str) -> tuple[Any, ...]:
     quote_url = (
         f"https://financialmodelingprep.com/api/v3/quote/{symbol}?apikey={API_KEY}"
     )
-    profile_url = (
-        f"https://financialmodelingprep.com/api/v3/profile/{symbol}?apikey={API_KEY}"
-    )
-    ratios_url = (
-        f"https://financialmodelingprep.com/api/v3/ratios-ttm/{symbol}?apikey={API_KEY}"
-    )
-    rating_url = (
-        f"https://financialmodelingprep.com/api/v3/rating/{symbol}?apikey={API_KEY}"
-    )
-    growth_url = f"https://financialmodelingprep.com/api/v3/financial-growth/{symbol}?limit=1&apikey={API_KEY}"
     try:
         quote_data = _fetch_json(quote_url, "quote", symbol)
         if not isinstance(quote_data, list) or len(quote_data) == 0:
             raise ValueError("No quote data")
         quote = quote_data[0]
 
-        profile_data = _fetch_json(profile_url, "profile", symbol)
-        profile = (
-            profile_data[0]
-            if isinstance(profile_data, list) and len(profile_data) > 0
-            else {}
-        )
-
-        ratio_data = _fetch_json(ratios_url, "ratios", symbol)
-        debt_to_equity = pb_ratio = roe = roa = profit_margin = dividend_yield = (
-            payout_ratio
-        ) = None
-        price_to_sales = ev_to_ebitda = price_to_fcf = current_ratio = None
-        if isinstance(ratio_data, list) and len(ratio_data) > 0:
-            r = ratio_data[0]
-            debt_to_equity = r.get("debtEquityRatioTTM")
-            pb_ratio = r.get("priceToBookRatioTTM")
-            roe = r.get("returnOnEquityTTM")
-            roa = r.get("returnOnAssetsTTM")
-            profit_margin = r.get("netProfitMarginTTM")
-            dividend_yield = r.get("dividendYielTTM") or r.get("dividendYieldTTM")
-            payout_ratio = r.get("payoutRatioTTM") or r.get("payoutRatio")
-            price_to_sales = r.get("priceToSalesRatioTTM")
-            price_to_fcf = (
-                r.get("priceToFreeCashFlowRatioTTM")
-                or r.get("priceToFreeCashFlowsRatioTTM")
-                or r.get("priceFreeCashFlowRatioTTM")
-                or r.get("priceCashFlowRatioTTM")
-            )
-            current_ratio = r.get("currentRatioTTM")
-
-        metrics_url = f"https://financialmodelingprep.com/api/v3/key-metrics-ttm/{symbol}?apikey={API_KEY}"
-        metrics_data = _fetch_json(metrics_url, "key metrics", symbol)
-        fcf_per_share = None
-        if isinstance(metrics_data, list) and len(metrics_data) > 0:
-            m = metrics_data[0]
-            ev_to_ebitda = (
-                m.get("evToEbitdaTTM")
-                or m.get("evToEbitda")
-                or m.get("enterpriseValueOverEBITDA")
-            )
-            fcf_per_share = m.get("freeCashFlowPerShareTTM") or m.get(
-                "freeCashFlowPerShare"
-            )
-
-        rating_data = _fetch_json(rating_url, "rating", symbol)
-        analyst_rating = None
-        if isinstance(rating_data, list) and len(rating_data) > 0:
-            analyst_rating = rating_data[0].get("ratingRecommendation") or rating_data[
-                0
-            ].get("rating")
-
-        growth_data = _fetch_json(growth_url, "growth", symbol)
-        earnings_growth = None
-        if isinstance(growth_data, list) and len(growth_data) > 0:
-            earnings_growth = growth_data[0].get("growthEPS") or growth_data[0].get(
-                "epsgrowth"
-            )
-
-        name = profile.get("companyName", "")
-        logo_url = profile.get("image", "")
-        sector = profile.get("sector", "")
-        industry = profile.get("industry", "")
-        exchange = profile.get("exchangeShortName", "")
-        currency = profile.get("currency", "USD")
+        fundamentals = get_fundamentals(symbol)
+        earnings_growth = fundamentals["earnings_growth"]
+        price_to_fcf = fundamentals["price_to_fcf"]
+        fcf_per_share = fundamentals["fcf_per_share"]
+        currency = fundamentals["currency"] or "USD"
 
         price = quote.get("price")
         eps = quote.get("eps")
@@ -738,29 +928,29 @@ def get_stock_data(symbol: str) -> tuple[Any, ...]:
                 price_to_fcf = None
 
         result = (
-            name,
-            logo_url,
-            sector,
-            industry,
-            exchange,
+            fundamentals["name"] or "",
+            fundamentals["logo_url"] or "",
+            fundamentals["sector"] or "",
+            fundamentals["industry"] or "",
+            fundamentals["exchange"] or "",
             currency,
             price,
             eps,
             market_cap,
-            debt_to_equity,
-            pb_ratio,
-            roe,
-            roa,
-            profit_margin,
-            analyst_rating,
-            dividend_yield,
-            payout_ratio,
+            fundamentals["debt_to_equity"],
+            fundamentals["pb_ratio"],
+            fundamentals["roe"],
+            fundamentals["roa"],
+            fundamentals["profit_margin"],
+            fundamentals["analyst_rating"],
+            fundamentals["dividend_yield"],
+            fundamentals["payout_ratio"],
             earnings_growth,
             forward_pe,
-            price_to_sales,
-            ev_to_ebitda,
+            fundamentals["price_to_sales"],
+            fundamentals["ev_to_ebitda"],
             price_to_fcf,
-            current_ratio,
+            fundamentals["current_ratio"],
         )
         if any(item is not None for item in result):
             _set_cached(cache_key, result)
@@ -925,41 +1115,56 @@ def get_news_summary(symbol: str, period: str = "daily", limit: int = 20) -> str
     return summarize_news(articles, period)
 
 
+def series_fingerprint(*series: Iterable[float | None]) -> str:
+    """Return a short digest identifying the values of ``series``.
+
+    Any new or revised bar changes the digest, so cache keys built from it
+    are invalidated automatically when history updates.
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    for values in series:
+        data = indicators.to_array(values)
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data.tobytes())
+    return digest.hexdigest()
+
+
+def cached_indicator(symbol: str, func: Callable[..., Any], *args: Any) -> Any:
+    """Return ``func(*args)`` memoised in the shared cache.
+
+    List arguments are treated as price series and fingerprinted; other
+    arguments are indicator parameters. One entry is kept per symbol,
+    function and parameters, holding the fingerprint it was computed from,
+    so a new bar overwrites the previous result instead of adding a key.
+    The key is a string so results are shared through Redis between web
+    workers and Celery tasks.
+    """
+    series = [a for a in args if isinstance(a, (list, tuple))]
+    params = ",".join(repr(a) for a in args if not isinstance(a, (list, tuple)))
+    name = f"{func.__module__}.{func.__qualname__}"
+    key = f"indicator:{symbol}:{name}({params})"
+    fingerprint = series_fingerprint(*series)
+    cached = _get_cached(key)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    result = func(*args)
+    _set_cached(key, (fingerprint, result))
+    return result
+
+
 def moving_average(prices: list[float], period: int) -> list[float | None]:
     """Simple moving average for a list of prices."""
-    ma = []
-    for i in range(len(prices)):
-        if i + 1 < period:
-            ma.append(None)
-        else:
-            window = prices[i + 1 - period : i + 1]
-            ma.append(round(sum(window) / period, 2))
-    return ma
+    return indicators.to_list(indicators.sma(prices, period))
 
 
-def calculate_rsi(prices: list[float], period: int = 14) -> list[float | None]:
-    """Calculate the Relative Strength Index (RSI)."""
-    rsi = []
-    for i in range(len(prices)):
-        if i < period:
-            rsi.append(None)
-            continue
-        gains = []
-        losses = []
-        for j in range(i - period + 1, i + 1):
-            change = prices[j] - prices[j - 1]
-            if change > 0:
-                gains.append(change)
-            else:
-                losses.append(abs(change))
-        avg_gain = sum(gains) / period if gains else 0
-        avg_loss = sum(losses) / period if losses else 0
-        if avg_loss == 0:
-            rsi.append(100)
-        else:
-            rs = avg_gain / avg_loss
-            rsi.append(round(100 - (100 / (1 + rs)), 2))
-    return rsi
+def calculate_rsi(
+    prices: list[float], period: int = 14, method: str = "simple"
+) -> list[float | None]:
+    """Calculate the Relative Strength Index (RSI).
+
+    ``method`` is ``"simple"`` (trailing window average) or ``"wilder"``.
+    """
+    return indicators.to_list(indicators.rsi(prices, period, method))
 
 
 def calculate_macd(
@@ -994,24 +1199,16 @@ def bollinger_bands(
 ) -> tuple[list[float | None], list[float | None]]:
     """Return upper and lower Bollinger Bands."""
     ma = moving_average(prices, period)
-    stds = []
-    for i in range(len(prices)):
-        if i + 1 < period:
-            stds.append(None)
-        else:
-            window = prices[i + 1 - period : i + 1]
-            mean = sum(window) / period
-            variance = sum((p - mean) ** 2 for p in window) / period
-            stds.append(variance**0.5)
+    widths = (num_std * indicators.rolling_std(prices, period)).tolist()
     upper = []
     lower = []
-    for m, s in zip(ma, stds):
-        if m is None or s is None:
+    for m, w in zip(ma, widths):
+        if m is None or w != w:
             upper.append(None)
             lower.append(None)
         else:
-            upper.append(round(m + num_std * s, 2))
-            lower.append(round(m - num_std * s, 2))
+            upper.append(round(m + w, 2))
+            lower.append(round(m - w, 2))
     return upper, lower
 
 
@@ -1019,20 +1216,37 @@ def calculate_cci(
     highs: list[float], lows: list[float], closes: list[float], period: int = 20
 ) -> list[float | None]:
     """Compute the Commodity Channel Index."""
-    typical = [(h + l + c) / 3 for h, l, c in zip(highs, lows, closes)]
-    cci = []
-    for i in range(len(typical)):
-        if i + 1 < period:
-            cci.append(None)
-            continue
-        window = typical[i + 1 - period : i + 1]
-        sma = sum(window) / period
-        mean_dev = sum(abs(x - sma) for x in window) / period
-        if mean_dev == 0:
-            cci.append(0)
-        else:
-            cci.append(round((typical[i] - sma) / (0.015 * mean_dev), 2))
-    return cci
+    return indicators.to_list(indicators.cci(highs, lows, closes, period))
+
+
+def latest_indicators(
+    history: dict[str, list[float]],
+    prices: dict[str, float | None] | None = None,
+    rsi_period: int = 14,
+    ma_period: int = 50,
+) -> dict[str, dict[str, float | None]]:
+    """Return the latest RSI, moving average and price deviation per symbol.
+
+    ``history`` maps symbols to daily closes. They are stacked into one
+    right-aligned matrix so every symbol is evaluated in a single vectorised
+    pass. ``deviation`` is the percentage distance of ``prices[symbol]``
+    from the moving average and is ``None`` without a current price.
+    """
+    symbols = list(history)
+    closes = indicators.align_right([history[s] for s in symbols])
+    rsi = indicators.latest_rsi(closes, rsi_period)
+    ma = indicators.latest_sma(closes, ma_period)
+    current = indicators.to_array([(prices or {}).get(s) for s in symbols])
+    deviation = indicators.deviation_pct(current, ma)
+    columns = {
+        "rsi": indicators.to_list(rsi),
+        "ma": indicators.to_list(ma),
+        "deviation": indicators.to_list(deviation),
+    }
+    return {
+        sym: {name: values[i] for name, values in columns.items()}
+        for i, sym in enumerate(symbols)
+    }
 
 
 def get_dividend_history(symbol: str, limit: int = 5) -> list[dict]:
@@ -15,6 +15,7 @@ from babel.dates import format_datetime
 from fpdf import FPDF
 
 from ..extensions import db
+from ..activity import get_activity_recorder
 
 from ..models import (
     WatchlistItem,
@@ -255,6 +256,7 @@ def toggle_theme() -> Response:
 @login_required
 def export_history() -> Response | tuple[str, int]:
     fmt = request.args.get("format", "csv").lower()
+    get_activity_recorder().flush()
     entries = (
         History.query.filter_by(user_id=current_user.id)
         .order_by(History.timestamp.desc())
@@ -320,6 +322,7 @@ def export_history() -> Response | tuple[str, int]:
 @watch_bp.route("/records")
 @login_required
 def records() -> str:
+    get_activity_recorder().flush()
     entries = (
         StockRecord.query.filter_by(user_id=current_user.id)
         .order_by(StockRecord.timestamp.desc())
@@ -331,6 +334,7 @@ def records() -> str:
 @watch_bp.route("/clear_records")
 @login_required
 def clear_records() -> Response:
+    get_activity_recorder().discard("record", current_user.id)
     StockRecord.query.filter_by(user_id=current_user.id).delete()
     db.session.commit()
     return redirect(url_for("watch.records"))
@@ -13,6 +13,8 @@ def app(monkeypatch):
     app = create_app()
     app.config["TESTING"] = True
     app.config["WTF_CSRF_ENABLED"] = False
+    # poll at PRICE_STREAM_INTERVAL whatever the time of day
+    app.config["ADAPTIVE_POLLING"] = False
     from stockapp import tasks
 
     tasks.celery.conf.update(task_always_eager=True)
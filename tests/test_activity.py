@@ -0,0 +1,261 @@
+import time
+
+import pytest
+
+from stockapp.activity import ActivityRecorder, MemoryBuffer, RedisBuffer
+
+
+def _stock(symbol):
+    return ("Corp", "", "", "", "", "USD", 10.0, 2.0) + (None,) * 15
+
+
+def _user_id(app):
+    from stockapp.models import User
+
+    with app.app_context():
+        return User.query.filter_by(username="tester").first().id
+
+
+def test_searches_are_queued_but_shown_in_history(auth_client, app, monkeypatch):
+    from stockapp.models import History
+
+    app.extensions["activity"].interval = 60
+    auth_client.get("/?ticker=AAA")
+    resp = auth_client.get("/?ticker=BBB")
+    assert resp.data.index(b"BBB</li>") < resp.data.index(b"AAA</li>")
+
+    with app.app_context():
+        assert History.query.count() == 0
+        assert app.extensions["activity"].flush() == 2
+        assert [h.symbol for h in History.query.order_by(History.timestamp)] == [
+            "AAA",
+            "BBB",
+        ]
+        assert app.extensions["activity"].recent_history(_user_id(app)) == [
+            "BBB",
+            "AAA",
+        ]
+
+
+def test_clear_history_drops_queued_searches(auth_client, app):
+    app.extensions["activity"].interval = 60
+    auth_client.get("/?ticker=AAA")
+    auth_client.get("/clear_history")
+    assert b"AAA</li>" not in auth_client.get("/").data
+
+
+def test_records_page_includes_queued_lookups(auth_client, app, monkeypatch):
+    monkeypatch.setattr("stockapp.main.routes.get_stock_data", _stock)
+    app.extensions["activity"].interval = 60
+    auth_client.get("/fragments/summary?ticker=REC")
+    assert b"REC" in auth_client.get("/records").data
+
+
+def test_flush_size_triggers_background_write(app):
+    from stockapp.models import StockRecord
+
+    recorder = ActivityRecorder(buffer=MemoryBuffer())
+    recorder.init_app(app)
+    recorder.flush_size, recorder.interval = 3, 60
+    user_id = _user_id(app)
+    for price in (1.0, 2.0, 3.0):
+        recorder.record_lookup(user_id, "BULK", price, 1.0, price)
+
+    deadline = time.monotonic() + 5
+    with app.app_context():
+        while StockRecord.query.count() < 3 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert sorted(r.price for r in StockRecord.query) == [1.0, 2.0, 3.0]
+
+
+def test_failed_flush_keeps_rows(app, monkeypatch):
+    from stockapp.extensions import db
+
+    recorder = ActivityRecorder(buffer=MemoryBuffer())
+    recorder.init_app(app)
+    recorder.interval = 60
+    recorder.record_search(_user_id(app), "KEEP")
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    with app.app_context():
+        monkeypatch.setattr(db.session, "execute", broken)
+        with pytest.raises(RuntimeError):
+            recorder.flush()
+        monkeypatch.undo()
+        assert [row["symbol"] for row in recorder.buffer.pending()] == ["KEEP"]
+        assert recorder.flush() == 1
+
+
+def test_rejected_row_is_dropped_without_holding_back_others(app):
+    from datetime import datetime
+
+    from stockapp.models import History, StockRecord
+
+    recorder = ActivityRecorder(buffer=MemoryBuffer())
+    recorder.init_app(app)
+    recorder.interval = 60
+    user_id = _user_id(app)
+    # too long for History.symbol: never queued
+    recorder.record_search(user_id, "X" * 11)
+    assert recorder.buffer.pending() == []
+
+    recorder.record_search(user_id, "GOOD")
+    # a row the database refuses (StockRecord.symbol is NOT NULL)
+    recorder.buffer.push(
+        {
+            "kind": "record",
+            "user_id": user_id,
+            "symbol": None,
+            "price": 1.0,
+            "eps": 1.0,
+            "pe_ratio": 1.0,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+    )
+    recorder.record_lookup(user_id, "OK", 2.0, 1.0, 2.0)
+    with app.app_context():
+        assert recorder.flush() == 2
+        assert recorder.buffer.pending() == []
+        assert [h.symbol for h in History.query] == ["GOOD"]
+        assert [r.symbol for r in StockRecord.query] == ["OK"]
+
+
+def test_unbuffered_recorder_writes_in_the_request(app):
+    from stockapp.models import History
+
+    app.config["ACTIVITY_BUFFER"] = "off"
+    recorder = ActivityRecorder(app)
+    with app.app_context():
+        recorder.record_search(_user_id(app), "NOW")
+        assert History.query.filter_by(symbol="NOW").count() == 1
+
+
+class ListRedis:
+    """The Redis commands :class:`RedisBuffer` uses."""
+
+    def __init__(self):
+        self.lists = {}
+        self.sets = {}
+        self.values = {}
+
+    @property
+    def items(self):
+        return self.lists.get("activity:pending", [])
+
+    def rpush(self, key, *values):
+        items = self.lists.setdefault(key, [])
+        items.extend(v.encode() for v in values)
+        return len(items)
+
+    def lrange(self, key, start, end):
+        items = self.lists.get(key, [])
+        return list(items[start : None if end == -1 else end + 1])
+
+    def lrem(self, key, count, value):
+        self.lists[key].remove(value)
+
+    def lmove(self, source, destination, src, dest):
+        items = self.lists.get(source)
+        if not items:
+            return None
+        value = items.pop(0 if src == "LEFT" else -1)
+        target = self.lists.setdefault(destination, [])
+        target.insert(0 if dest == "LEFT" else len(target), value)
+        return value
+
+    def delete(self, key):
+        self.lists.pop(key, None)
+        self.values.pop(key, None)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def exists(self, key):
+        return int(key in self.values)
+
+    def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(member.encode())
+
+    def smembers(self, key):
+        return set(self.sets.get(key, ()))
+
+    def srem(self, key, member):
+        self.sets.get(key, set()).discard(member.encode())
+
+    def pipeline(self):
+        return ListPipeline(self)
+
+
+class ListPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [
+            getattr(self.redis, name)(*args, **kwargs)
+            for name, args, kwargs in self.calls
+        ]
+
+
+def test_redis_buffer_is_shared_between_recorders(app):
+    from stockapp.models import History
+
+    client = ListRedis()
+    web = ActivityRecorder(buffer=RedisBuffer(client))
+    web.init_app(app)
+    web.interval = 60
+    user_id = _user_id(app)
+    web.record_search(user_id, "AAA")
+    web.record_search(user_id, "BBB")
+    web.discard("record", user_id)
+
+    worker = ActivityRecorder(buffer=RedisBuffer(client))
+    worker.init_app(app)
+    with app.app_context():
+        assert worker.recent_history(user_id) == ["BBB", "AAA"]
+        assert worker.flush() == 2
+        assert History.query.count() == 2
+    assert client.items == []
+
+
+def test_redis_batch_of_a_dead_worker_is_written_by_another(app, monkeypatch):
+    from stockapp.extensions import db
+    from stockapp.models import History
+
+    client = ListRedis()
+    user_id = _user_id(app)
+    dead = ActivityRecorder(buffer=RedisBuffer(client, worker_id="dead"))
+    dead.init_app(app)
+    dead.interval = 60
+    for symbol in ("AAA", "BBB", "CCC"):
+        dead.record_search(user_id, symbol)
+    # the worker dies after taking a batch, before writing it
+    assert [r["symbol"] for r in dead.buffer.drain(2)] == ["AAA", "BBB"]
+    assert len(client.items) == 1
+
+    worker = ActivityRecorder(buffer=RedisBuffer(client, worker_id="live"))
+    worker.init_app(app)
+    with app.app_context():
+        # the dead worker's lease still runs: its batch is left alone
+        assert worker.flush() == 1
+        client.delete("activity:pending:lease:dead")
+
+        def broken(*args, **kwargs):
+            raise RuntimeError("database unavailable")
+
+        monkeypatch.setattr(db.session, "execute", broken)
+        with pytest.raises(RuntimeError):
+            worker.flush()
+        monkeypatch.undo()
+        # a batch that could not be written is back in the queue, in order
+        assert [r["symbol"] for r in worker.buffer.pending()] == ["AAA", "BBB"]
+        assert worker.flush() == 2
+        assert sorted(h.symbol for h in History.query) == ["AAA", "BBB", "CCC"]
+    assert client.lists.get("activity:pending:processing:dead") == []
+    assert client.items == []
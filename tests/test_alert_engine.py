@@ -0,0 +1,178 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from stockapp.alert_engine import AlertEngine, ThresholdIndex, tick_values
+from stockapp.extensions import db
+from stockapp.models import Alert, AlertState, User, WatchlistItem
+from stockapp.realtime import get_price_hub
+
+
+def test_threshold_index_finds_only_crossed_levels():
+    index = ThresholdIndex()
+    for i, threshold in enumerate([10, 20, 20, 30]):
+        index.add("AAA", "pe", threshold, SimpleNamespace(id=i, user_id=100 + i))
+    assert index.crossed("AAA", "pe", 15, 25) == [(20.0, 1, 101), (20.0, 2, 102)]
+    assert index.crossed("AAA", "pe", 20, 21) == [(20.0, 1, 101), (20.0, 2, 102)]
+    assert index.crossed("AAA", "pe", 21, 29) == []
+    # falling values and other symbols never fire
+    assert index.crossed("AAA", "pe", 35, 5) == []
+    assert index.crossed("BBB", "pe", 0, 100) == []
+
+
+def test_tick_values():
+    tick = {"price": 90.0, "eps": 5.0}
+    closes = [100.0] * 45 + [101.0, 100.0] * 3
+    assert tick_values(tick) == {"pe": 18.0}
+    # RSI from the closes alone; the MA deviation is absolute
+    assert tick_values(tick, closes) == {"pe": 18.0, "rsi": 50.0, "ma": 10.05}
+    assert tick_values({"symbol": "AAA", "error": "fetch"}) == {}
+
+
+def test_engine_fires_on_crossings_from_ticks(app, monkeypatch):
+    monkeypatch.setattr(
+        "stockapp.realtime.get_realtime_data", lambda symbol, provider=None: (1.0, 1.0)
+    )
+    monkeypatch.setattr("stockapp.realtime.load_indicator_set", lambda s: None)
+    monkeypatch.setattr(
+        "stockapp.alert_engine.get_historical_prices", lambda s, days=60: ([], [])
+    )
+    sent = []
+    monkeypatch.setattr(
+        "stockapp.tasks.notify_watchlist_alerts",
+        lambda user, messages: sent.append((user.username, messages)),
+    )
+    with app.app_context():
+        user = User.query.filter_by(username="tester").first()
+        db.session.add_all(
+            [
+                WatchlistItem(symbol="AAA", user_id=user.id, pe_threshold=20),
+                WatchlistItem(symbol="AAA", user_id=user.id, rsi_threshold=70),
+                WatchlistItem(symbol="BBB", user_id=user.id, pe_threshold=50),
+            ]
+        )
+        user.alert_frequency = 1
+        user.last_alert_time = datetime.utcnow() - timedelta(hours=2)
+        db.session.commit()
+        # re-arm as soon as the P/E falls back below the threshold
+        app.config["ALERT_COOLDOWN"] = 0
+        engine = AlertEngine(get_price_hub())
+        engine.load()
+        assert get_price_hub().subscriber_counts() == {"AAA": 1, "BBB": 1}
+
+        ticks = [
+            {"symbol": "AAA", "price": 90.0, "eps": 5.0},  # P/E 18: baseline
+            {"symbol": "AAA", "price": 105.0, "eps": 5.0},  # 21: crosses 20
+            {"symbol": "AAA", "price": 110.0, "eps": 5.0},  # still above
+            {"symbol": "AAA", "price": 95.0, "eps": 5.0},
+            {
+                "symbol": "AAA",
+                "price": 160.0,
+                "eps": 5.0,
+            },  # 32: crosses 20 and the default 30, one P/E alert per user
+            {"symbol": "CCC", "price": 1.0, "eps": 1.0},  # not watched
+        ]
+        fired = [len(engine.process(t)) for t in ticks]
+        assert fired == [0, 1, 0, 0, 1, 0]
+        messages = [a.message for a in Alert.query.order_by(Alert.id)]
+        assert messages == [
+            "AAA P/E ratio 21.0 exceeds threshold 20.0",
+            "AAA P/E ratio 32.0 exceeds threshold 20.0",
+        ]
+        # the second alert is recorded but, within the user's alert
+        # frequency of the first, not sent
+        assert sent == [("tester", ["AAA P/E ratio 21.0 exceeds threshold 20.0"])]
+        assert datetime.utcnow() - user.last_alert_time < timedelta(minutes=1)
+
+        db.session.delete(WatchlistItem.query.filter_by(symbol="BBB").first())
+        db.session.commit()
+        engine.load()
+        assert get_price_hub().subscriber_counts() == {"AAA": 1}
+        engine.close()
+        assert get_price_hub().subscriber_counts() == {}
+
+
+def test_engine_treats_a_users_thresholds_for_one_condition_as_one(app, monkeypatch):
+    monkeypatch.setattr(
+        "stockapp.realtime.get_realtime_data", lambda symbol, provider=None: (1.0, 1.0)
+    )
+    monkeypatch.setattr("stockapp.realtime.load_indicator_set", lambda s: None)
+    monkeypatch.setattr(
+        "stockapp.alert_engine.get_historical_prices", lambda s, days=60: ([], [])
+    )
+    monkeypatch.setattr(
+        "stockapp.tasks.notify_watchlist_alerts", lambda user, messages: None
+    )
+    with app.app_context():
+        user = User.query.filter_by(username="tester").first()
+        db.session.add_all(
+            [
+                WatchlistItem(symbol="AAA", user_id=user.id, pe_threshold=20),
+                # P/E falls back to the default threshold of 30
+                WatchlistItem(symbol="AAA", user_id=user.id, rsi_threshold=70),
+            ]
+        )
+        db.session.commit()
+        app.config["ALERT_COOLDOWN"] = 0
+        engine = AlertEngine(get_price_hub())
+        engine.load()
+        # P/E 18, 25, 35, 25, 35: dropping back through 30 leaves it above 20
+        prices = [90.0, 125.0, 175.0, 125.0, 175.0]
+        fired = [
+            len(engine.process({"symbol": "AAA", "price": p, "eps": 5.0}))
+            for p in prices
+        ]
+        engine.close()
+        assert fired == [0, 1, 0, 0, 0]
+
+
+def test_engine_and_scheduled_check_agree_on_indicator_values(app, monkeypatch):
+    closes = [100.0 + i % 5 for i in range(60)]
+    history = lambda symbol, days=60: ([str(i) for i in range(60)], closes)
+    monkeypatch.setattr("stockapp.alert_engine.get_historical_prices", history)
+    monkeypatch.setattr("stockapp.tasks.get_historical_prices", history)
+    monkeypatch.setattr("stockapp.realtime.load_indicator_set", lambda s: None)
+    stock = ("Test Corp", "", "Tech", "Software", "NASDAQ", "USD", 110.0, 1.0)
+    monkeypatch.setattr("stockapp.tasks.get_stock_data", lambda s: stock + (None,) * 15)
+    sent = []
+    monkeypatch.setattr(
+        "stockapp.tasks.notify_watchlist_alerts",
+        lambda user, messages: sent.append(messages),
+    )
+    from stockapp import tasks
+
+    with app.app_context():
+        user = User.query.filter_by(username="tester").first()
+        user.email = "t@example.com"
+        db.session.add(
+            WatchlistItem(
+                symbol="AAA",
+                user_id=user.id,
+                pe_threshold=1000,
+                rsi_threshold=10,
+                ma_threshold=5,
+            )
+        )
+        db.session.commit()
+        engine = AlertEngine(get_price_hub())
+        engine.load()
+        # deviation about 1% then, at the quoted price, about 7.8%
+        for price in (103.0, 110.0):
+            engine.process({"symbol": "AAA", "price": price, "eps": 1.0})
+        engine.close()
+        live = [a.message for a in Alert.query.order_by(Alert.id)]
+        assert len(live) == 1 and "price deviation" in live[0]
+        assert AlertState.query.filter_by(condition="ma").one().active
+        values = tick_values({"price": 110.0}, closes)
+
+        # the same price through the scheduled check, from a clean slate
+        AlertState.query.delete()
+        Alert.query.delete()
+        user.last_alert_time = datetime.utcnow() - timedelta(days=2)
+        db.session.commit()
+        tasks._check_watchlists()
+        assert sent[-1] == [
+            f"AAA RSI {values['rsi']} exceeds threshold 10.0",
+            live[0],
+        ]
+        states = {s.condition: s.active for s in AlertState.query}
+        assert states == {"rsi": True, "ma": True}
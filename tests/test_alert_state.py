@@ -0,0 +1,158 @@
+from datetime import datetime, timedelta
+
+from stockapp.alert_state import should_alert
+from stockapp.extensions import db
+from stockapp.models import Alert, AlertState, User, WatchlistItem
+
+
+def _stock(price=100, eps=2):
+    return ("Test Corp", "", "Tech", "Software", "NASDAQ", "USD", price, eps) + (
+        None,
+    ) * 15
+
+
+def _user_id(app):
+    with app.app_context():
+        return User.query.filter_by(username="tester").first().id
+
+
+def test_should_alert_only_when_condition_starts_to_hold(app):
+    user_id = _user_id(app)
+    start = datetime(2024, 1, 1, 12)
+    with app.app_context():
+        assert should_alert(user_id, "AAA", "pe", False, start) is False
+        assert AlertState.query.count() == 0
+        assert should_alert(user_id, "AAA", "pe", True, start) is True
+        assert should_alert(user_id, "AAA", "pe", True, start) is False
+        # other symbols and conditions are tracked separately
+        assert should_alert(user_id, "BBB", "pe", True, start) is True
+        assert should_alert(user_id, "AAA", "rsi", True, start) is True
+        db.session.commit()
+
+        # clearing re-arms the condition, subject to the cooldown
+        assert should_alert(user_id, "AAA", "pe", False, start) is False
+        soon = start + timedelta(minutes=10)
+        assert should_alert(user_id, "AAA", "pe", True, soon) is False
+        assert should_alert(user_id, "AAA", "pe", False, soon) is False
+        later = start + timedelta(hours=2)
+        assert should_alert(user_id, "AAA", "pe", True, later) is True
+        db.session.commit()
+
+        state = AlertState.query.filter_by(symbol="AAA", condition="pe").one()
+        assert state.active and state.last_fired == later
+
+
+def test_should_alert_without_cooldown(app):
+    app.config["ALERT_COOLDOWN"] = 0
+    user_id = _user_id(app)
+    with app.app_context():
+        assert should_alert(user_id, None, "rule:1", True) is True
+        assert should_alert(user_id, None, "rule:1", False) is False
+        assert should_alert(user_id, None, "rule:1", True) is True
+
+
+def test_should_alert_loses_insert_race_without_breaking_the_session(app, monkeypatch):
+    from stockapp import alert_state
+
+    user_id = _user_id(app)
+    start = datetime(2024, 1, 1, 12)
+    with app.app_context():
+        # another worker inserts the row after this check looked it up
+        db.session.add(
+            AlertState(
+                user_id=user_id,
+                symbol="AAA",
+                condition="pe",
+                active=True,
+                last_fired=start,
+            )
+        )
+        db.session.commit()
+        misses = iter([None])
+        find = alert_state._find
+        monkeypatch.setattr(
+            alert_state, "_find", lambda *key: next(misses, None) or find(*key)
+        )
+        db.session.add(Alert(symbol="AAA", message="kept", user_id=user_id))
+
+        assert should_alert(user_id, "AAA", "pe", True, start) is False
+        db.session.commit()
+        assert AlertState.query.count() == 1
+        assert Alert.query.filter_by(message="kept").count() == 1
+
+
+def test_alerts_fragment_alerts_once_while_condition_holds(
+    auth_client, app, monkeypatch
+):
+    monkeypatch.setattr("stockapp.main.routes.get_stock_data", lambda s: _stock())
+    pushed = []
+    monkeypatch.setattr(
+        "stockapp.main.routes.notify_user_push", lambda uid, msg: pushed.append(msg)
+    )
+
+    for _ in range(3):
+        resp = auth_client.get("/fragments/alerts?ticker=AAA")
+        # the warning is still shown on every view
+        assert b"P/E ratio 50.0 exceeds threshold" in resp.data
+
+    assert len(pushed) == 1
+    with app.app_context():
+        assert Alert.query.filter_by(symbol="AAA").count() == 1
+
+
+def test_check_watchlists_skips_conditions_that_still_hold(app, monkeypatch):
+    monkeypatch.setattr("stockapp.tasks.get_stock_data", lambda s: _stock())
+    notified = []
+    monkeypatch.setattr(
+        "stockapp.tasks.notify_watchlist_alerts",
+        lambda user, messages: notified.append(messages),
+    )
+    from stockapp import tasks
+
+    with app.app_context():
+        user = User.query.filter_by(username="tester").first()
+        user.email = "t@example.com"
+        user.alert_frequency = 1
+        db.session.add(WatchlistItem(symbol="AAA", user_id=user.id, pe_threshold=10))
+        db.session.commit()
+
+        for _ in range(2):
+            user.last_alert_time = datetime.utcnow() - timedelta(hours=2)
+            db.session.commit()
+            tasks._check_watchlists()
+
+        assert notified == [["AAA P/E ratio 50.0 exceeds threshold 10.0"]]
+        assert Alert.query.filter_by(symbol="AAA").count() == 1
+
+
+def test_check_watchlists_judges_items_for_one_symbol_together(app, monkeypatch):
+    # P/E 25: above the first item's 20, below the second's default of 30
+    monkeypatch.setattr("stockapp.tasks.get_stock_data", lambda s: _stock(50, 2))
+    notified = []
+    monkeypatch.setattr(
+        "stockapp.tasks.notify_watchlist_alerts",
+        lambda user, messages: notified.append(messages),
+    )
+    from stockapp import tasks
+
+    app.config["ALERT_COOLDOWN"] = 0
+    with app.app_context():
+        user = User.query.filter_by(username="tester").first()
+        user.email = "t@example.com"
+        user.alert_frequency = 1
+        db.session.add_all(
+            [
+                WatchlistItem(symbol="AAA", user_id=user.id, pe_threshold=20),
+                WatchlistItem(symbol="AAA", user_id=user.id),
+            ]
+        )
+        db.session.commit()
+
+        for _ in range(3):
+            user.last_alert_time = datetime.utcnow() - timedelta(hours=2)
+            db.session.commit()
+            tasks._check_watchlists()
+
+        assert notified == [["AAA P/E ratio 25.0 exceeds threshold 20.0"]]
+        state = AlertState.query.filter_by(symbol="AAA", condition="pe").one()
+        assert state.active
@@ -108,8 +108,9 @@ def test_api_endpoints(auth_client, app):
 
 
 def test_stream_price(client, monkeypatch):
+    monkeypatch.setattr("stockapp.realtime.load_indicator_set", lambda s: None)
     monkeypatch.setattr(
-        "stockapp.main.routes.get_realtime_data",
+        "stockapp.realtime.get_realtime_data",
         lambda symbol, provider=None: (100, 5),
     )
     resp = client.get("/stream_price?symbol=AAA")
@@ -123,8 +124,9 @@ def test_stream_price_async(client, app, monkeypatch):
     async def fake_rt(symbol, provider=None):
         return 200, 10
 
+    monkeypatch.setattr("stockapp.realtime.load_indicator_set", lambda s: None)
     monkeypatch.setattr(
-        "stockapp.main.routes.get_realtime_data_async",
+        "stockapp.realtime.get_realtime_data_async",
         fake_rt,
     )
     app.config["ASYNC_REALTIME"] = True
@@ -136,9 +138,11 @@ def test_stream_price_async(client, app, monkeypatch):
 
 
 def test_ws_price_route(app):
+    # WebSocket routes always build as absolute ws:// or wss:// URLs
     with app.test_request_context():
-        url = url_for("main.ws_price")
-    assert url == "/ws/price"
+        assert url_for("main.ws_price") == "ws://localhost/ws/price"
+    with app.test_request_context(base_url="https://example.com"):
+        assert url_for("main.ws_price") == "wss://example.com/ws/price"
 
 
 def test_push_subscribe(auth_client):
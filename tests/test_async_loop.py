@@ -0,0 +1,38 @@
+import asyncio
+import threading
+
+from stockapp.async_loop import BackgroundLoop
+
+
+def test_background_loop_reuses_one_loop_and_client():
+    runner = BackgroundLoop()
+
+    async def info():
+        return asyncio.get_running_loop(), runner.client()
+
+    loop1, client1 = runner.run(info())
+    loop2, client2 = runner.run(info())
+    assert loop1 is loop2 and client1 is client2 and client1 is not None
+    # other loops never see the shared client
+    assert asyncio.run(info())[1] is None
+
+    async def double(x):
+        await asyncio.sleep(0.01)
+        return x * 2
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda i=i: results.append(runner.run(double(i))))
+        for i in range(10)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(results) == [i * 2 for i in range(10)]
+    thread = runner._thread
+    runner.stop()
+    thread.join(2)
+    assert not loop1.is_running()
+    # the next call starts a fresh loop
+    assert runner.run(info())[0] is not loop1
@@ -0,0 +1,74 @@
+import copy
+import json
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks import feeds, suite
+from benchmarks.__main__ import main
+from benchmarks.synthetic import SyntheticPortfolio, price_series
+
+
+def test_synthetic_data_is_deterministic():
+    assert price_series(50, seed=3) == price_series(50, seed=3)
+    assert price_series(50, seed=3) != price_series(50, seed=4)
+    portfolio = SyntheticPortfolio(4, days=20, seed=1)
+    dates, prices = portfolio.historical_prices("S001", days=10)
+    assert len(dates) == len(prices) == 10
+    assert len(portfolio.returns()["S000"]) == 19
+
+
+def test_suite_detects_regressions(tmp_path):
+    cases = suite.build_cases((250,), (5,))
+    assert {c.key for c in cases} >= {
+        "calculate_cci[250]",
+        "calculate_portfolio_analysis[5]",
+    }
+    results = suite.run(cases, repeat=1)
+    assert all(r["peak_bytes"] > 0 for r in results["results"].values())
+    assert suite.compare(results, results) == []
+
+    baseline = copy.deepcopy(results)
+    for r in baseline["results"].values():
+        r["best"] = r["best"] / 10
+        r["peak_bytes"] = 0
+    regressions = suite.compare(results, baseline)
+    assert any("peak" in r for r in regressions)
+
+    path = tmp_path / "baseline.json"
+    argv = ["--quick", "-k", "moving_average", "--repeat", "1", "--baseline", str(path)]
+    assert main(argv + ["--save"]) == 0
+    assert main(argv + ["--threshold", "1000"]) == 0
+    saved = suite.load(path)
+    for r in saved["results"].values():
+        r["peak_bytes"] = 0
+    suite.save(saved, path)
+    assert main(argv) == 1
+
+
+def test_stream_benchmark_serves_concurrent_connections(tmp_path):
+    pytest.importorskip("gevent")
+    out = tmp_path / "streams.json"
+    # gevent monkey-patches the interpreter, so run it in its own process
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.streams", "--connections", "50"]
+        + ["--symbols", "5", "--frames", "2", "--interval", "0.1"]
+        + ["--output", str(out)],
+        check=True,
+        capture_output=True,
+        timeout=120,
+    )
+    result = json.loads(out.read_text())
+    assert result["completed"] == 50 and result["errors"] == 0
+    # one poller per symbol, however many connections follow it
+    assert result["upstream_calls"] < 50
+
+
+def test_feed_benchmark_beats_polling_latency():
+    poll, feed = feeds.run(symbols=2, seconds=0.6, poll_interval=0.2)
+    assert poll["mode"] == "poll" and feed["mode"] == "feed"
+    assert feed["ticks"] > poll["ticks"]
+    assert feed["latency_p50_ms"] < poll["latency_p50_ms"]
+    # feed mode only fetches one REST snapshot per symbol
+    assert feed["upstream_requests"] == 2
@@ -0,0 +1,97 @@
+import base64
+import math
+import struct
+from datetime import date, timedelta
+
+
+def _history(n):
+    start = date(2023, 1, 2)
+    dates = [(start + timedelta(days=i)).isoformat() for i in range(n)]
+    closes = [100 + math.sin(i / 7) for i in range(n)]
+    highs = [c + 1 for c in closes]
+    lows = [c - 1 for c in closes]
+    volumes = [1000 + i for i in range(n)]
+    return dates, closes, highs, lows, closes, volumes
+
+
+def test_chart_api_columns_range_and_etag(client, app, monkeypatch):
+    history = _history(300)
+    monkeypatch.setattr(
+        "stockapp.api.routes.get_historical_bars", lambda s, days=30: history
+    )
+    app.config["CHART_MAX_POINTS"] = 50
+
+    resp = client.get("/api/chart/aaa?indicators=rsi:14")
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["symbol"] == "AAA" and data["downsampled"]
+    assert set(data["columns"]) == {"close", "rsi:14"}
+    assert len(data["t"]) == 50 and len(data["columns"]["rsi:14"]) == 50
+    assert len(data["candles"]["open"]) == 50
+    assert data["t"][0] == (date(2023, 1, 2) - date(1970, 1, 1)).days
+    assert resp.headers["Cache-Control"] == "public, max-age=300"
+
+    etag = resp.headers["ETag"]
+    again = client.get(
+        "/api/chart/aaa?indicators=rsi:14", headers={"If-None-Match": etag}
+    )
+    assert again.status_code == 304
+    other = client.get("/api/chart/aaa?indicators=rsi:7")
+    assert other.headers["ETag"] != etag
+
+    full = client.get(
+        "/api/chart/AAA?full=1&start=2023-03-01&end=2023-03-10&indicators=sma:50"
+    )
+    data = full.get_json()
+    assert not data["downsampled"] and len(data["t"]) == 10
+    assert full.headers["ETag"] != etag
+    # indicators are computed on the whole history, so the range starts warm
+    assert data["columns"]["sma:50"][0] is not None
+
+
+def test_chart_api_float32_encoding_and_validation(client, monkeypatch):
+    history = _history(30)
+    monkeypatch.setattr(
+        "stockapp.api.routes.get_historical_bars", lambda s, days=30: history
+    )
+    data = client.get("/api/chart/AAA?encoding=f32&indicators=rsi").get_json()
+    raw = base64.b64decode(data["columns"]["close"])
+    values = struct.unpack("<30f", raw)
+    assert values[5] == struct.unpack("<f", struct.pack("<f", history[4][5]))[0]
+    rsi = struct.unpack("<30f", base64.b64decode(data["columns"]["rsi:14"]))
+    assert math.isnan(rsi[0]) and not math.isnan(rsi[-1])
+
+    assert client.get("/api/chart/AAA?encoding=xml").status_code == 400
+    assert client.get("/api/chart/AAA?days=0").status_code == 400
+    assert client.get("/api/chart/AAA?start=yesterday").status_code == 400
+
+
+def test_chart_api_indicator_selection(client, monkeypatch):
+    history = _history(80)
+    monkeypatch.setattr(
+        "stockapp.api.routes.get_historical_bars", lambda s, days=30: history
+    )
+    resp = client.get("/api/chart/AAA?indicators=bollinger:20:2,macd,obv,atr:5")
+    columns = resp.get_json()["columns"]
+    assert set(columns) == {
+        "close",
+        "bollinger:20:2.upper",
+        "bollinger:20:2.lower",
+        "macd:26:12:9.macd",
+        "macd:26:12:9.signal",
+        "obv",
+        "atr:5",
+    }
+    closes, volumes = history[4], history[5]
+    expected = sum(
+        v if c > p else -v for p, c, v in zip(closes, closes[1:], volumes[1:])
+    )
+    assert columns["obv"][-1] == expected
+
+    assert client.get("/api/chart/AAA?indicators=foo").status_code == 400
+    assert client.get("/api/chart/AAA?indicators=sma:0").status_code == 400
+    assert client.get("/api/chart/AAA?indicators=sma:20:3").status_code == 400
+
+    schemas = {i["name"]: i for i in client.get("/api/indicators").get_json()}
+    assert {"sma", "ema", "atr", "stochastic", "obv", "vwap"} <= set(schemas)
+    assert [p["name"] for p in schemas["macd"]["params"]] == ["slow", "fast", "signal"]
@@ -0,0 +1,29 @@
+import math
+
+from stockapp.downsample import bucket_ohlc, lttb_indices
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    prices = [math.sin(i / 10) * 10 + 100 for i in range(500)]
+    prices[137] = 150.0
+    prices[321] = 40.0
+    keep = lttb_indices(prices, 60).tolist()
+    assert len(keep) == 60
+    assert keep[0] == 0 and keep[-1] == 499
+    assert keep == sorted(keep)
+    assert 137 in keep and 321 in keep
+    assert lttb_indices(prices[:10], 60).tolist() == list(range(10))
+
+
+def test_bucket_ohlc_merges_candles():
+    dates = [f"d{i}" for i in range(10)]
+    opens = list(range(10))
+    highs = [o + 5 for o in opens]
+    lows = [o - 5 for o in opens]
+    closes = [o + 1 for o in opens]
+    bars = bucket_ohlc(dates, opens, highs, lows, closes, 3)
+    assert bars["t"] == ["d0", "d3", "d6"]
+    assert bars["open"] == [0, 3, 6]
+    assert bars["high"] == [7, 10, 14]
+    assert bars["low"] == [-5, -2, 1]
+    assert bars["close"] == [3, 6, 10]
@@ -328,12 +328,11 @@ def test_check_watchlists(app, monkeypatch):
     emails = []
     sms = []
     monkeypatch.setattr("stockapp.tasks.get_stock_data", fake_get_stock)
+    # steadily rising closes: RSI 100 and a 50d MA far below the price of 100
     monkeypatch.setattr(
         "stockapp.tasks.get_historical_prices",
-        lambda s, days=60: (["d"] * 60, [100] * 60),
+        lambda s, days=60: (["d"] * 60, [60 + i * 0.5 for i in range(60)]),
     )
-    monkeypatch.setattr("stockapp.tasks.moving_average", lambda prices, p: [80])
-    monkeypatch.setattr("stockapp.tasks.calculate_rsi", lambda prices, p=14: [80])
     monkeypatch.setattr(
         "stockapp.tasks.send_email_task.delay",
         lambda to, subject, body: emails.append((to, subject, body)),
@@ -593,7 +592,7 @@ def test_currency_conversion_in_index(auth_client, app, monkeypatch):
         user.default_currency = "EUR"
         db.session.commit()
 
-    resp = auth_client.get("/?ticker=AAA")
+    resp = auth_client.get("/fragments/summary?ticker=AAA")
     assert b"\xe2\x82\xac50.00" in resp.data
 
 
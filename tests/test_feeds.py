@@ -0,0 +1,61 @@
+import json
+import time
+
+import pytest
+
+from stockapp.feeds import Feed, SimulatedFeedServer, WebSocketFeed
+from stockapp.realtime import PriceHub
+
+
+def test_websocket_feed_follows_subscriptions():
+    trades = []
+    with SimulatedFeedServer(interval=0.02) as server:
+        feed = WebSocketFeed(server.url)
+        feed.subscribe("AAA")
+        feed.start(lambda symbol, price, ts: trades.append((symbol, price, ts)))
+        assert feed.connected.wait(5)
+        feed.subscribe("BBB")
+        deadline = time.monotonic() + 5
+        while {t[0] for t in trades} != {"AAA", "BBB"}:
+            assert time.monotonic() < deadline
+            time.sleep(0.02)
+        feed.unsubscribe("AAA")
+        time.sleep(0.2)
+        count = len(trades)
+        time.sleep(0.2)
+        assert {t[0] for t in trades[count:]} == {"BBB"}
+        feed.stop()
+    assert all(isinstance(p, float) and ts > 0 for _, p, ts in trades)
+
+
+def test_feed_handles_batches_and_ignores_noise():
+    trades = []
+    feed = WebSocketFeed("ws://unused")
+    feed.symbols = {"AAA"}
+    feed._on_trade = lambda *t: trades.append(t)
+    feed._handle("not json")
+    feed._handle(json.dumps({"type": "ping"}))
+    batch = [{"s": "AAA", "p": 1, "t": 1}, {"s": "AAA", "p": 2, "t": 2}]
+    feed._handle(json.dumps({"type": "trade", "data": batch + [{"s": "ZZZ", "p": 3}]}))
+    assert trades == [("AAA", 2.0, 2)]
+    with pytest.raises(TypeError):
+        Feed()
+
+
+def test_hub_pushes_feed_trades_without_polling(app, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        "stockapp.realtime.get_realtime_data",
+        lambda symbol, provider=None: calls.append(symbol) or (100.0, 4.0),
+    )
+    monkeypatch.setattr("stockapp.realtime.load_indicator_set", lambda s: None)
+    with SimulatedFeedServer(interval=0.02) as server:
+        hub = PriceHub(app, feed=WebSocketFeed(server.url))
+        with hub.subscribe("AAA") as sub:
+            ticks = [sub.get(timeout=5) for _ in range(10)]
+        hub.feed.stop()
+    assert ticks[0]["price"] == 100.0
+    assert all(t["symbol"] == "AAA" and t["eps"] == 4.0 for t in ticks)
+    assert len({t["price"] for t in ticks[1:]}) > 1
+    # one REST snapshot for EPS; every later price came from the feed
+    assert calls == ["AAA"]
@@ -0,0 +1,91 @@
+from stockapp.models import Fundamentals, WatchlistItem, User
+from stockapp.extensions import db
+
+
+def _fake_fetch(calls):
+    def fetch(url, desc, symbol=None):
+        calls.append(desc)
+        if desc == "quote":
+            return [{"price": 100, "eps": 5, "marketCap": 1_000_000_000}]
+        if desc == "profile":
+            return [{"companyName": "Test Co", "sector": "Tech", "currency": "USD"}]
+        if desc == "ratios":
+            return [{"debtEquityRatioTTM": 0.5, "currentRatioTTM": 1.2}]
+        if desc == "growth":
+            return [{"growthEPS": 0.1}]
+        return []
+
+    return fetch
+
+
+def test_get_stock_data_reads_stored_fundamentals(app, monkeypatch):
+    import stockapp.utils as utils
+
+    calls = []
+    monkeypatch.setattr(utils, "API_KEY_MISSING", False)
+    monkeypatch.setattr(utils, "_fetch_json", _fake_fetch(calls))
+    with app.app_context():
+        utils._cache.clear()
+        data = utils.get_stock_data("FUND")
+        assert data[0] == "Test Co" and data[9] == 0.5
+        row = Fundamentals.query.filter_by(symbol="FUND").first()
+        assert row is not None and row.sector == "Tech"
+
+        # Simulate a cache flush: only the quote should be refetched.
+        utils._cache.clear()
+        calls.clear()
+        data = utils.get_stock_data("FUND")
+        assert calls == ["quote"]
+        assert data[0] == "Test Co" and data[22] == 1.2
+
+
+def test_refresh_fundamentals_task(app, monkeypatch):
+    import stockapp.utils as utils
+    from stockapp import tasks
+
+    calls = []
+    monkeypatch.setattr(utils, "API_KEY_MISSING", False)
+    monkeypatch.setattr(utils, "_fetch_json", _fake_fetch(calls))
+    with app.app_context():
+        user = User.query.filter_by(username="tester").first()
+        db.session.add(WatchlistItem(symbol="NITE", user_id=user.id))
+        db.session.commit()
+        tasks._refresh_fundamentals()
+        row = Fundamentals.query.filter_by(symbol="NITE").first()
+        assert row is not None and row.earnings_growth == 0.1
+        assert "quote" not in calls
+
+
+def test_get_stock_data_does_not_commit_request_session(app, monkeypatch):
+    import stockapp.utils as utils
+
+    monkeypatch.setattr(utils, "API_KEY_MISSING", False)
+    monkeypatch.setattr(utils, "_fetch_json", _fake_fetch([]))
+    with app.app_context():
+        utils._cache.clear()
+        commits = []
+        monkeypatch.setattr(db.session, "commit", lambda: commits.append(1))
+        utils.get_stock_data("SIDE")
+        monkeypatch.undo()
+        assert commits == []
+        assert Fundamentals.query.filter_by(symbol="SIDE").count() == 1
+
+
+def test_refresh_fundamentals_keeps_other_symbols_on_error(app, monkeypatch):
+    import stockapp.utils as utils
+
+    write = utils._write_fundamentals
+
+    def failing_write(session, symbol, data):
+        write(session, symbol, data)
+        if symbol == "BBB":
+            session.flush()
+            raise RuntimeError("bad row")
+
+    monkeypatch.setattr(utils, "API_KEY_MISSING", False)
+    monkeypatch.setattr(utils, "_fetch_json", _fake_fetch([]))
+    monkeypatch.setattr(utils, "_write_fundamentals", failing_write)
+    with app.app_context():
+        assert utils.refresh_fundamentals(["AAA", "BBB", "CCC"]) == 2
+        stored = sorted(f.symbol for f in Fundamentals.query)
+        assert stored == ["AAA", "CCC"]
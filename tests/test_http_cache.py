@@ -0,0 +1,112 @@
+import time
+
+
+def _stock(price):
+    return ("Cache Corp", "", "", "", "", "USD", price, 2.0) + (None,) * 15
+
+
+def test_anonymous_dashboard_is_shared_and_revalidated(client, monkeypatch):
+    stock = {"price": 100.0}
+    monkeypatch.setattr(
+        "stockapp.main.routes.get_stock_data", lambda s: _stock(stock["price"])
+    )
+    rendered = []
+    from stockapp.main import routes
+
+    real_render = routes.render_template
+    monkeypatch.setattr(
+        routes,
+        "render_template",
+        lambda *a, **kw: rendered.append(a[0]) or real_render(*a, **kw),
+    )
+
+    resp = client.get("/dashboard?symbol=hc1")
+    assert resp.status_code == 200 and b"Cache Corp" not in resp.data
+    cache_control = resp.headers["Cache-Control"]
+    assert "public" in cache_control and "s-maxage=300" in cache_control
+    assert {"Accept-Language", "Cookie"} <= set(resp.vary)
+    assert "Set-Cookie" not in resp.headers
+    etag = resp.headers["ETag"]
+
+    again = client.get("/dashboard?symbol=HC1")
+    assert again.headers["ETag"] == etag and again.data == resp.data
+    assert rendered == ["dashboard.html"]
+
+    unchanged = client.get("/dashboard?symbol=HC1", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304 and not unchanged.data
+
+    # other locales are cached separately
+    german = client.get("/dashboard?symbol=HC1", headers={"Accept-Language": "de"})
+    assert german.headers["ETag"] != etag
+
+    stock["price"] = 110.0
+    refreshed = client.get("/dashboard?symbol=HC1", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200 and refreshed.headers["ETag"] != etag
+
+
+def test_last_modified_follows_the_data_cache(client, monkeypatch):
+    from stockapp import utils
+
+    monkeypatch.setattr("stockapp.main.routes.get_stock_data", lambda s: _stock(50))
+    fetched = float(int(time.time()) - 100)
+    monkeypatch.setitem(utils._cache, ("stock", "HC2"), (_stock(50), fetched))
+
+    resp = client.get("/dashboard?symbol=HC2")
+    assert resp.last_modified.timestamp() == fetched
+    again = client.get(
+        "/dashboard?symbol=HC2",
+        headers={"If-Modified-Since": resp.headers["Last-Modified"]},
+    )
+    assert again.status_code == 304
+
+
+def test_news_summary_is_rendered_once_per_article_set(client, monkeypatch):
+    articles = [{"headline": "Up", "published": "2024-01-01", "sentiment": 1}]
+    monkeypatch.setattr(
+        "stockapp.api.routes.get_stock_news", lambda s, limit=20: articles
+    )
+    calls = []
+
+    def summary(symbol, period="daily"):
+        calls.append(symbol)
+        return "positive"
+
+    monkeypatch.setattr("stockapp.api.routes.get_news_summary", summary)
+
+    first = client.get("/api/news_summary/hc3")
+    assert first.get_json() == {"symbol": "HC3", "summary": "positive"}
+    client.get("/api/news_summary/hc3")
+    assert calls == ["HC3"]
+    weekly = client.get("/api/news_summary/hc3?period=weekly")
+    assert weekly.headers["ETag"] != first.headers["ETag"]
+    assert calls == ["HC3", "HC3"]
+
+
+def test_signed_in_views_are_private(auth_client, monkeypatch):
+    monkeypatch.setattr("stockapp.main.routes.get_stock_data", lambda s: _stock(50))
+    resp = auth_client.get("/dashboard?symbol=HC4")
+    assert resp.status_code == 200
+    assert "private" in resp.headers["Cache-Control"]
+    assert "ETag" not in resp.headers
+
+
+def test_searching_leaves_anonymous_visitors_without_a_cookie(client, monkeypatch):
+    monkeypatch.setattr("stockapp.main.routes.get_stock_data", lambda s: _stock(10))
+    assert "Set-Cookie" not in client.get("/?ticker=HC3").headers
+    resp = client.get("/fragments/summary?ticker=HC3")
+    assert "public" in resp.headers["Cache-Control"]
+
+
+def test_in_process_cache_evicts_least_recently_used(monkeypatch):
+    from collections import OrderedDict
+
+    from stockapp import utils
+
+    monkeypatch.setattr(utils, "_cache", OrderedDict())
+    monkeypatch.setattr(utils, "CACHE_MAX_ENTRIES", 3)
+    for i in range(5):
+        utils._set_cached(f"response:{i}", i)
+    assert list(utils._cache) == ["response:2", "response:3", "response:4"]
+    assert utils._get_cached("response:2") == 2
+    utils._set_cached("response:5", 5)
+    assert list(utils._cache) == ["response:4", "response:2", "response:5"]
@@ -0,0 +1,80 @@
+def _stock(price=100, eps=2):
+    return ("Test Corp", "", "Tech", "Software", "NASDAQ", "USD", price, eps) + (
+        None,
+    ) * 15
+
+
+def test_index_shell_does_not_fetch_stock_data(client, monkeypatch):
+    def unavailable(symbol):
+        raise AssertionError("the shell must not wait on market data")
+
+    monkeypatch.setattr("stockapp.main.routes.get_stock_data", unavailable)
+
+    resp = client.get("/?ticker=aaa")
+    assert resp.status_code == 200
+    assert b"/fragments/summary?ticker=AAA" in resp.data
+    assert b"/fragments/alerts?ticker=AAA" in resp.data
+    assert b"/api/chart/AAA" in resp.data
+    # anonymous history is kept in localStorage, not the session cookie
+    assert "Set-Cookie" not in resp.headers
+    assert b'id="local-history"' in resp.data
+
+
+def test_summary_fragment(client, monkeypatch):
+    monkeypatch.setattr("stockapp.main.routes.get_stock_data", lambda s: _stock())
+
+    resp = client.get("/fragments/summary?ticker=aaa")
+    assert resp.status_code == 200
+    assert b"Test Corp" in resp.data and b"Overvalued?" in resp.data
+    assert b'id="price_value">$100.00' in resp.data
+    assert "public" in resp.headers["Cache-Control"]
+
+    assert client.get("/fragments/summary").status_code == 400
+
+
+def test_summary_fragment_reports_missing_data(client, monkeypatch):
+    monkeypatch.setattr(
+        "stockapp.main.routes.get_stock_data", lambda s: _stock(eps=None)
+    )
+    resp = client.get("/fragments/summary?ticker=AAA")
+    assert b"Price or EPS data is missing." in resp.data
+
+
+def test_summary_fragment_records_lookup(auth_client, app, monkeypatch):
+    monkeypatch.setattr("stockapp.main.routes.get_stock_data", lambda s: _stock())
+
+    resp = auth_client.get("/fragments/summary?ticker=AAA")
+    assert "private" in resp.headers["Cache-Control"]
+
+    from stockapp.models import StockRecord
+
+    with app.app_context():
+        assert app.extensions["activity"].flush() == 1
+        record = StockRecord.query.filter_by(symbol="AAA").one()
+        assert record.pe_ratio == 50
+
+
+def test_alerts_fragment(auth_client, app, monkeypatch):
+    monkeypatch.setattr("stockapp.main.routes.get_stock_data", lambda s: _stock())
+    pushed = []
+    monkeypatch.setattr(
+        "stockapp.main.routes.notify_user_push", lambda uid, msg: pushed.append(msg)
+    )
+
+    resp = auth_client.get("/fragments/alerts?ticker=AAA")
+    assert b"P/E ratio 50.0 exceeds threshold" in resp.data
+    assert pushed == ["P/E ratio 50.0 exceeds threshold of 30"]
+
+    from stockapp.models import Alert
+
+    with app.app_context():
+        assert Alert.query.filter_by(symbol="AAA").count() == 1
+
+
+def test_alerts_fragment_is_empty_below_threshold(client, monkeypatch):
+    monkeypatch.setattr(
+        "stockapp.main.routes.get_stock_data", lambda s: _stock(price=20)
+    )
+    resp = client.get("/fragments/alerts?ticker=AAA")
+    assert resp.status_code == 200
+    assert b"alert" not in resp.data
@@ -0,0 +1,251 @@
+import random
+
+import numpy as np
+import pytest
+
+from stockapp import indicators
+from stockapp.utils import bollinger_bands, calculate_cci, calculate_rsi, moving_average
+
+
+def _ref_sma(prices, period):
+    out = []
+    for i in range(len(prices)):
+        if i + 1 < period:
+            out.append(None)
+        else:
+            out.append(round(sum(prices[i + 1 - period : i + 1]) / period, 2))
+    return out
+
+
+def _ref_rsi(prices, period):
+    out = []
+    for i in range(len(prices)):
+        if i < period:
+            out.append(None)
+            continue
+        changes = [prices[j] - prices[j - 1] for j in range(i - period + 1, i + 1)]
+        avg_gain = sum(c for c in changes if c > 0) / period
+        avg_loss = sum(-c for c in changes if c < 0) / period
+        if avg_loss == 0:
+            out.append(100)
+        else:
+            out.append(round(100 - 100 / (1 + avg_gain / avg_loss), 2))
+    return out
+
+
+def _ref_cci(highs, lows, closes, period):
+    typical = [(h + l + c) / 3 for h, l, c in zip(highs, lows, closes)]
+    out = []
+    for i in range(len(typical)):
+        if i + 1 < period:
+            out.append(None)
+            continue
+        window = typical[i + 1 - period : i + 1]
+        sma = sum(window) / period
+        mean_dev = sum(abs(x - sma) for x in window) / period
+        out.append(
+            0 if mean_dev == 0 else round((typical[i] - sma) / (0.015 * mean_dev), 2)
+        )
+    return out
+
+
+def _assert_close(actual, expected):
+    # values agree up to a cent flip when a result sits on a rounding tie
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected):
+        assert (a is None) == (e is None)
+        if a is not None:
+            assert a == pytest.approx(e, abs=0.0100001)
+
+
+def test_vectorised_indicators_match_reference():
+    rng = random.Random(7)
+    prices = [round(100 * (1 + rng.gauss(0, 0.02)), 2) for _ in range(300)]
+    highs = [p * 1.01 for p in prices]
+    lows = [p * 0.99 for p in prices]
+    for period in (1, 3, 14, 20, 50):
+        _assert_close(moving_average(prices, period), _ref_sma(prices, period))
+        _assert_close(calculate_rsi(prices, period), _ref_rsi(prices, period))
+        _assert_close(
+            calculate_cci(highs, lows, prices, period),
+            _ref_cci(highs, lows, prices, period),
+        )
+    upper, lower = bollinger_bands(prices, 20, 2)
+    window = prices[-20:]
+    mean = sum(window) / 20
+    std = (sum((p - mean) ** 2 for p in window) / 20) ** 0.5
+    assert upper[-1] == pytest.approx(round(mean, 2) + 2 * std, abs=0.0100001)
+    assert lower[-1] == pytest.approx(round(mean, 2) - 2 * std, abs=0.0100001)
+    assert upper[18] is None
+
+
+def test_gap_only_blanks_the_windows_that_contain_it():
+    prices = [float(p) for p in range(1, 13)]
+    prices[4] = None
+    expected = [None, None, 2, 3, None, None, None, 7, 8, 9, 10, 11]
+    assert moving_average(prices, 3) == expected
+    assert calculate_rsi(prices, 3) == [None] * 3 + [100] + [None] * 4 + [100] * 4
+    upper, _lower = bollinger_bands(prices, 3, 2)
+    assert upper[3] is not None and upper[5] is None
+    assert upper[-1] == pytest.approx(11 + 2 * (2 / 3) ** 0.5, abs=0.0100001)
+
+
+def test_rsi_edge_cases_and_wilder_smoothing():
+    assert calculate_rsi([5.0] * 6, 3) == [None, None, None, 100, 100, 100]
+    assert calculate_rsi([1, 2], 3) == [None, None]
+    assert calculate_cci([2] * 4, [2] * 4, [2] * 4, 2) == [None, 0, 0, 0]
+    prices = [44.34, 44.09, 44.15, 43.61, 44.33, 44.83, 45.10, 45.42, 45.84]
+    wilder = calculate_rsi(prices, 3, method="wilder")
+    gains = [0, 0.06, 0]
+    losses = [0.25, 0, 0.54]
+    avg_gain, avg_loss = sum(gains) / 3, sum(losses) / 3
+    assert wilder[3] == round(100 - 100 / (1 + avg_gain / avg_loss), 2)
+    change = prices[4] - prices[3]
+    avg_gain = (avg_gain * 2 + change) / 3
+    avg_loss = avg_loss * 2 / 3
+    assert wilder[4] == round(100 - 100 / (1 + avg_gain / avg_loss), 2)
+    with pytest.raises(ValueError):
+        indicators.rsi(prices, 3, method="bogus")
+    with pytest.raises(ValueError):
+        moving_average(prices, 0)
+
+
+def test_cached_indicator_reuses_results_until_series_changes():
+    from stockapp import utils
+
+    calls = []
+
+    def fake_rsi(prices, period):
+        calls.append(period)
+        return [len(prices)]
+
+    prices = [1.0, 2.0, 3.0]
+    assert utils.cached_indicator("MEMO", fake_rsi, prices, 14) == [3]
+    assert utils.cached_indicator("MEMO", fake_rsi, list(prices), 14) == [3]
+    assert calls == [14]
+    assert utils.cached_indicator("MEMO", fake_rsi, prices, 7) == [3]
+    assert utils.cached_indicator("MEMO", fake_rsi, prices + [4.0], 14) == [4]
+    assert calls == [14, 7, 14]
+    # a new bar replaces the entry rather than adding one
+    keys = [k for k in utils._cache if str(k).startswith("indicator:MEMO:")]
+    assert len(keys) == 2
+    assert utils.series_fingerprint([1, None]) != utils.series_fingerprint([1, 0])
+
+
+def test_latest_indicators_batches_symbols_of_different_lengths():
+    from stockapp.utils import latest_indicators
+
+    rng = random.Random(11)
+    history = {
+        "LONG": [round(50 + rng.random() * 5, 2) for _ in range(80)],
+        "SHORT": [round(20 + rng.random(), 2) for _ in range(30)],
+        "TINY": [10.0, 11.0],
+    }
+    result = latest_indicators(history, {"LONG": 60.0, "SHORT": 21.0})
+    for sym, closes in history.items():
+        assert result[sym]["rsi"] == calculate_rsi(closes, 14)[-1]
+        assert result[sym]["ma"] == moving_average(closes, 50)[-1]
+    ma = sum(history["LONG"][-50:]) / 50
+    assert result["LONG"]["deviation"] == pytest.approx(
+        abs(60.0 - ma) / ma * 100, abs=0.01
+    )
+    assert result["SHORT"]["ma"] is None and result["SHORT"]["deviation"] is None
+    assert result["TINY"]["rsi"] is None
+
+
+def test_new_indicators_match_reference():
+    from stockapp.utils import calculate_macd
+
+    rng = random.Random(3)
+    closes = [round(100 * (1 + rng.gauss(0, 0.02)), 2) for _ in range(120)]
+    highs = [c + rng.random() for c in closes]
+    lows = [c - rng.random() for c in closes]
+    volumes = [rng.randint(100, 1000) for _ in closes]
+
+    line, signal = indicators.macd(closes)
+    expected_line, expected_signal = calculate_macd(closes)
+    assert indicators.to_list(line) == pytest.approx(expected_line, abs=0.0100001)
+    assert indicators.to_list(signal) == pytest.approx(expected_signal, abs=0.0100001)
+
+    k, d = indicators.stochastic(highs, lows, closes, 14, 3)
+    expected_k = [
+        (closes[i] - min(lows[i - 13 : i + 1]))
+        / (max(highs[i - 13 : i + 1]) - min(lows[i - 13 : i + 1]))
+        * 100
+        for i in range(117, 120)
+    ]
+    assert k[-1] == pytest.approx(expected_k[-1])
+    assert d[-1] == pytest.approx(sum(expected_k) / 3)
+    assert indicators.to_list(k)[:13] == [None] * 13
+
+    tr = [
+        max(h - lo, abs(h - p), abs(lo - p))
+        for h, lo, p in zip(highs[1:], lows[1:], closes)
+    ]
+    avg = sum(tr[:14]) / 14
+    for value in tr[14:]:
+        avg = (avg * 13 + value) / 14
+    assert indicators.atr(highs, lows, closes, 14)[-1] == pytest.approx(avg)
+
+    typical = [(h + lo + c) / 3 for h, lo, c in zip(highs, lows, closes)]
+    window = range(100, 120)
+    expected = sum(typical[i] * volumes[i] for i in window) / sum(
+        volumes[i] for i in window
+    )
+    assert indicators.vwap(highs, lows, closes, volumes, 20)[-1] == pytest.approx(
+        expected
+    )
+
+
+def test_smoothed_indicators_skip_missing_closes():
+    assert indicators.to_list(indicators.ema([1, 2, None, 4], 3)) == [
+        1,
+        1.5,
+        None,
+        2.75,
+    ]
+    assert indicators.to_list(indicators.ema([None, 2, 4], 3)) == [None, 2, 3]
+
+    rng = random.Random(5)
+    closes = [round(100 * (1 + rng.gauss(0, 0.02)), 2) for _ in range(80)]
+    gappy = list(closes)
+    gappy[40] = None
+    line, signal = indicators.macd(gappy)
+    assert np.isnan(line[40]) and np.isfinite(line[-1]) and np.isfinite(signal[-1])
+    highs = [c + 1 for c in closes]
+    lows = [c - 1 for c in closes]
+    values = indicators.atr(highs, lows, gappy, 14)
+    # only the true range that needs the missing close as the previous one
+    assert np.isnan(values[41]) and np.isfinite(values[42:]).all()
+    assert np.isfinite(indicators.rsi(gappy, 14, method="wilder")[-1])
+
+
+def test_indicator_registry_parses_and_memoises(monkeypatch):
+    from stockapp import indicator_registry as registry
+
+    parsed = registry.parse_request("SMA:30, bollinger::2.5,bollinger:20:2.5,rsi")
+    assert [(i.name, p) for i, p in parsed] == [
+        ("sma", (30,)),
+        ("bollinger", (20, 2.5)),
+        ("rsi", (14,)),
+    ]
+    assert registry.column_key(*parsed[1], "upper") == "bollinger:20:2.5.upper"
+    too_many = ",".join(f"sma:{n}" for n in range(2, 15))
+    for bad in ("nope", "sma:x", "sma:9999", "rsi:14:1", too_many):
+        with pytest.raises(registry.IndicatorError):
+            registry.parse_request(bad)
+
+    calls = []
+    spec = registry.REGISTRY["sma"]
+    original = spec.func
+
+    def counting_sma(values, period):
+        calls.append(period)
+        return original(values, period)
+
+    monkeypatch.setattr(spec, "func", counting_sma)
+    columns = {"close": [1.0, 2.0, 3.0, 4.0]}
+    request = registry.parse_request("sma:2")
+    assert registry.compute("REG", columns, request) == {"sma:2": [None, 1.5, 2.5, 3.5]}
+    registry.compute("REG", columns, request)
+    assert calls == [2]
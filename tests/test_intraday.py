@@ -0,0 +1,33 @@
+from stockapp.intraday import BarAggregator, aggregator
+
+
+def test_bar_aggregation_and_ring_buffer():
+    agg = BarAggregator(intervals=(60, 300), max_bars=3)
+    agg.add_tick("AAA", 10, ts=0)
+    agg.add_tick("AAA", 12, ts=30)
+    agg.add_tick("AAA", 9, ts=59)
+    agg.add_tick("AAA", 11, ts=61)
+    bars = agg.get_bars("AAA", 60)
+    assert bars["t"] == [0, 60]
+    assert (bars["open"][0], bars["high"][0], bars["low"][0], bars["close"][0]) == (
+        10,
+        12,
+        9,
+        9,
+    )
+    five = agg.get_bars("AAA", 300)
+    assert five["t"] == [0] and five["close"] == [11]
+
+    for minute in range(2, 6):
+        agg.add_tick("AAA", 20, ts=minute * 60)
+    assert len(agg.get_bars("AAA", 60)["t"]) == 3
+
+
+def test_intraday_endpoint(client):
+    aggregator.clear()
+    aggregator.add_tick("BAR", 5, ts=120)
+    resp = client.get("/api/intraday/bar?interval=1")
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["symbol"] == "BAR" and data["close"] == [5]
+    assert client.get("/api/intraday/BAR?interval=2").status_code == 400
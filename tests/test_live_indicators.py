@@ -0,0 +1,71 @@
+import json
+import random
+
+import pytest
+
+from stockapp import indicators, live_indicators
+from stockapp.live_indicators import CCI, RSI, SMA, Bollinger, IndicatorSet
+from stockapp.utils import calculate_macd
+
+
+def test_streaming_indicators_match_batch_results():
+    rng = random.Random(3)
+    prices = [round(100 * (1 + rng.gauss(0, 0.02)), 2) for _ in range(120)]
+    batch = {
+        "sma": indicators.sma(prices, 20).tolist(),
+        "rsi": indicators.rsi(prices, 14, "wilder").tolist(),
+        "simple": indicators.rsi(prices, 14).tolist(),
+        "upper": indicators.bollinger(prices, 20, 2)[0].tolist(),
+        "cci": indicators.cci(prices, prices, prices, 20).tolist(),
+    }
+    streams = {
+        "sma": SMA(20),
+        "rsi": RSI(14),
+        "simple": RSI(14, "simple"),
+        "upper": Bollinger(20, 2),
+        "cci": CCI(20),
+    }
+    for i, price in enumerate(prices):
+        for key, ind in streams.items():
+            preview = ind.peek(price)
+            value = ind.update(price)
+            assert preview == pytest.approx(value)
+            if key == "upper" and value is not None:
+                value = value[0]
+            expected = batch[key][i]
+            if expected != expected:
+                assert value is None
+            else:
+                assert value == pytest.approx(expected, abs=1e-6)
+    macd, signal = calculate_macd(prices)
+    live = IndicatorSet.default().seed(prices)
+    assert live.values()["macd"] == [macd[-1], signal[-1]]
+
+
+def test_peek_does_not_mutate_and_state_round_trips():
+    live = IndicatorSet.default().seed([float(p) for p in range(1, 60)])
+    before = live.values()
+    preview = live.peek(10.0)
+    assert live.values() == before
+    assert preview["rsi14"] < before["rsi14"]
+
+    restored = IndicatorSet.from_state(json.loads(json.dumps(live.to_state())))
+    assert restored.peek(10.0) == preview
+    assert restored.update(70.0) == live.update(70.0)
+    with pytest.raises(TypeError):
+        live_indicators.StreamingIndicator()
+
+
+def test_load_indicator_set_seeds_once(monkeypatch):
+    calls = []
+
+    def fake_history(symbol, days=30):
+        calls.append(symbol)
+        return [f"d{i}" for i in range(60)], [100 + i for i in range(60)]
+
+    monkeypatch.setattr(live_indicators, "get_historical_prices", fake_history)
+    live = live_indicators.load_indicator_set("LIVE")
+    again = live_indicators.load_indicator_set("LIVE")
+    assert calls == ["LIVE"]
+    assert live.last_date == "d59"
+    assert again.peek(200)["sma20"] == live.peek(200)["sma20"]
@@ -0,0 +1,76 @@
+from datetime import date, datetime, timezone
+
+from stockapp.market_hours import (
+    ASX,
+    CLOSED,
+    EXTENDED,
+    REGULAR,
+    US,
+    PollScheduler,
+    asx_holidays,
+    exchange_for,
+    us_holidays,
+)
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_holiday_calendars():
+    assert us_holidays(2024) == {
+        date(2024, 1, 1),
+        date(2024, 1, 15),
+        date(2024, 2, 19),
+        date(2024, 3, 29),
+        date(2024, 5, 27),
+        date(2024, 6, 19),
+        date(2024, 7, 4),
+        date(2024, 9, 2),
+        date(2024, 11, 28),
+        date(2024, 12, 25),
+    }
+    # 2022-01-01 fell on a Saturday and was not observed
+    assert date(2021, 12, 31) not in us_holidays(2021)
+    assert date(2026, 7, 3) in us_holidays(2026)
+    assert asx_holidays(2022) >= {
+        date(2022, 1, 3),
+        date(2022, 4, 15),
+        date(2022, 4, 18),
+        date(2022, 6, 13),
+        date(2022, 12, 26),
+        date(2022, 12, 27),
+    }
+
+
+def test_sessions_follow_local_exchange_time():
+    assert exchange_for("bhp.ax") is ASX and exchange_for("AAPL") is US
+    # 2024-03-05 is a Tuesday; New York is on daylight time from March 10
+    assert US.session(utc(2024, 3, 5, 15, 0)) == REGULAR
+    assert US.session(utc(2024, 3, 5, 12, 0)) == EXTENDED
+    assert US.session(utc(2024, 3, 6, 2, 0)) == CLOSED
+    assert US.session(utc(2024, 3, 29, 15, 0)) == CLOSED  # Good Friday
+    assert ASX.session(utc(2024, 3, 5, 0, 0)) == REGULAR  # 11:00 in Sydney
+    assert ASX.session(utc(2024, 3, 5, 12, 0)) == CLOSED
+    assert US.next_open(utc(2024, 3, 29, 15, 0)) == datetime(
+        2024, 4, 1, 4, 0, tzinfo=US.tz
+    )
+
+
+def test_poll_interval_adapts_to_session_activity_and_demand():
+    scheduler = PollScheduler(5, closed_interval=900)
+    regular = utc(2024, 3, 5, 15, 0)
+    assert scheduler.interval("AAPL", now=regular) == 5
+    assert scheduler.interval("AAPL", now=utc(2024, 3, 5, 12, 0)) == 15
+    # Saturday: wait until Monday's pre-market, checking every 15 minutes
+    assert scheduler.interval("AAPL", now=utc(2024, 3, 9, 15, 0)) == 900
+    assert scheduler.interval("AAPL", now=utc(2024, 3, 11, 7, 59)) == 60
+    # repeated identical quotes back off up to 8x; busy symbols poll faster
+    assert [scheduler.interval("X", unchanged=n, now=regular) for n in (1, 2, 5)] == [
+        10,
+        20,
+        40,
+    ]
+    assert scheduler.interval("AAPL", volatility=0.00001, now=regular) == 10
+    assert scheduler.interval("AAPL", volatility=0.01, now=regular) == 2.5
+    assert scheduler.interval("AAPL", subscribers=100, now=regular) == 2.5
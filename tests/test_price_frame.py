@@ -0,0 +1,34 @@
+import math
+
+from stockapp.price_frame import PriceFrame
+
+
+def test_inner_join_aligns_on_date():
+    frame = PriceFrame.from_series(
+        {
+            "US": (["2024-01-01", "2024-01-02", "2024-01-04"], [10, 11, 12]),
+            "AX": (["2024-01-02", "2024-01-03", "2024-01-04"], [5, 6, 7]),
+        }
+    )
+    assert frame.dates == ["2024-01-02", "2024-01-04"]
+    assert frame.column("US").tolist() == [11, 12]
+    assert frame.column("AX").tolist() == [5, 7]
+    assert frame.column("US").flags["C_CONTIGUOUS"]
+    assert frame.returns().shape == (1, 2)
+
+
+def test_outer_join_with_forward_fill_and_reindex():
+    frame = PriceFrame.from_series(
+        {
+            "A": (["d1", "d3"], [1, None]),
+            "B": (["d2", "d3"], [2, 3]),
+        },
+        how="outer",
+        fill="ffill",
+    )
+    assert frame.dates == ["d1", "d2", "d3"]
+    assert frame.column("A").tolist() == [1, 1, 1]
+    assert math.isnan(frame.column("B")[0])
+    assert frame.dropna().dates == ["d2", "d3"]
+    shifted = frame.reindex(["d2", "d9"])
+    assert shifted.column("B")[0] == 2 and math.isnan(shifted.column("B")[1])
@@ -0,0 +1,410 @@
+import json
+import queue
+import threading
+import time
+
+import pytest
+
+from stockapp.realtime import (
+    DeltaEncoder,
+    PriceHub,
+    RedisBackplane,
+    SendQueue,
+    SlowConsumerError,
+    StreamMetrics,
+    get_price_hub,
+    stream_symbols,
+)
+
+
+def test_price_hub_polls_each_symbol_once_for_many_subscribers(app, monkeypatch):
+    calls = {}
+    lock = threading.Lock()
+
+    def fake_rt(symbol, provider=None):
+        with lock:
+            calls[symbol] = calls.get(symbol, 0) + 1
+        return 100.0, 5.0
+
+    monkeypatch.setattr("stockapp.realtime.get_realtime_data", fake_rt)
+    monkeypatch.setattr("stockapp.realtime.load_indicator_set", lambda s: None)
+    app.config["PRICE_STREAM_INTERVAL"] = 0.05
+    with app.app_context():
+        hub = get_price_hub()
+    subs = [hub.subscribe("AAA") for _ in range(20)] + [hub.subscribe("BBB")]
+    for sub in subs:
+        tick = dict(sub.get(timeout=2))
+        assert tick.pop("seq") > 0
+        assert tick == {"symbol": sub.symbol, "price": 100.0, "eps": 5.0}
+    assert hub.subscriber_counts() == {"AAA": 20, "BBB": 1}
+    time.sleep(0.2)
+    # each poll feeds every subscriber, so upstream calls track symbols only
+    assert calls["AAA"] <= calls["BBB"] + 2
+    late = hub.subscribe("AAA")
+    assert late.get(timeout=0) is not None
+
+    for sub in subs + [late]:
+        sub.close()
+    assert hub.subscriber_counts() == {}
+    time.sleep(0.1)
+    settled = dict(calls)
+    time.sleep(0.2)
+    assert calls == settled
+
+
+class FakeSocket:
+    def __init__(self, *messages):
+        self.inbox = list(messages)
+        self.sent = []
+
+    def receive(self, timeout=None):
+        return self.inbox.pop(0) if self.inbox else None
+
+    def send(self, data):
+        self.sent.append(json.loads(data))
+
+
+def test_multi_symbol_protocol_batches_ticks_and_enforces_limit(app, monkeypatch):
+    prices = {"AAA": 1.0, "BBB": 2.0, "CCC": 3.0}
+
+    def fake_rt(symbol, provider=None):
+        prices[symbol] += 0.5
+        return prices[symbol], None
+
+    monkeypatch.setattr("stockapp.realtime.get_realtime_data", fake_rt)
+    monkeypatch.setattr("stockapp.realtime.load_indicator_set", lambda s: None)
+    app.config["PRICE_STREAM_INTERVAL"] = 0.05
+    with app.app_context():
+        hub = get_price_hub()
+    ws = FakeSocket(
+        json.dumps({"action": "subscribe", "symbols": ["ccc"]}),
+        json.dumps({"action": "subscribe", "symbols": ["CCC", "DDD"]}),
+        json.dumps({"action": "unsubscribe", "symbols": ["ccc"]}),
+        json.dumps({"action": "subscribe", "symbols": ["bad symbol"]}),
+        "not json",
+    )
+    first = json.dumps({"action": "subscribe", "symbols": ["aaa", "BBB", "aaa"]})
+    stream_symbols(ws, first, hub, max_symbols=3, interval=0.05, max_frames=3)
+
+    replies = [f for f in ws.sent if f["type"] != "ticks"]
+    assert replies[0] == {"type": "subscribed", "symbols": ["AAA", "BBB"]}
+    assert replies[1] == {"type": "subscribed", "symbols": ["AAA", "BBB", "CCC"]}
+    assert replies[2]["type"] == "error" and "At most 3" in replies[2]["error"]
+    assert replies[3] == {"type": "subscribed", "symbols": ["AAA", "BBB"]}
+    assert replies[4]["type"] == "error" and "Invalid symbol" in replies[4]["error"]
+    assert replies[5] == {"type": "error", "error": "invalid JSON"}
+
+    frames = [f["ticks"] for f in ws.sent if f["type"] == "ticks"]
+    assert len(frames) == 3
+    assert set().union(*frames) <= {"AAA", "BBB", "CCC"}
+    deltas = {}
+    for frame in frames:
+        for symbol, delta in frame.items():
+            deltas.setdefault(symbol, []).append(delta)
+    for symbol in ("AAA", "BBB"):
+        # a full snapshot first, then only the fields that changed
+        assert set(deltas[symbol][0]) == {"symbol", "price", "eps", "seq"}
+        assert all(set(d) == {"price", "seq"} for d in deltas[symbol][1:])
+        seqs = [d["seq"] for d in deltas[symbol]]
+        assert seqs == sorted(set(seqs))
+    # the connection released its subscriptions when the stream ended
+    assert hub.subscriber_counts() == {}
+
+
+def test_delta_encoder_sends_changed_fields_and_resumes():
+    encoder = DeltaEncoder()
+    tick = {"symbol": "AAA", "price": 1.0, "eps": None, "seq": 1}
+    assert encoder.encode(tick) == tick
+    assert encoder.encode(tick) is None
+    assert (
+        encoder.encode({"symbol": "AAA", "price": 1.0, "eps": None, "seq": 2}) is None
+    )
+    assert encoder.encode({"symbol": "AAA", "price": 1.5, "seq": 3}) == {
+        "price": 1.5,
+        "eps": None,
+        "seq": 3,
+    }
+    resumed = DeltaEncoder({"symbol": "AAA", "price": 1.5, "seq": 3})
+    assert resumed.encode({"symbol": "AAA", "price": 2.0, "seq": 4}) == {
+        "price": 2.0,
+        "seq": 4,
+    }
+
+
+def test_unchanged_quotes_send_heartbeats_and_resume_from_seq(app, monkeypatch):
+    monkeypatch.setattr(
+        "stockapp.realtime.get_realtime_data", lambda symbol, provider=None: (7.0, 1.0)
+    )
+    monkeypatch.setattr("stockapp.realtime.load_indicator_set", lambda s: None)
+    app.config["PRICE_STREAM_INTERVAL"] = 0.05
+    with app.app_context():
+        hub = get_price_hub()
+    ws = FakeSocket()
+    first = json.dumps({"action": "subscribe", "symbols": ["AAA"]})
+    stream_symbols(ws, first, hub, 5, interval=0.05, heartbeat=0.3, max_frames=2)
+    assert [f["type"] for f in ws.sent] == ["subscribed", "ticks", "heartbeat"]
+    seq = ws.sent[1]["ticks"]["AAA"]["seq"]
+
+    # a client resuming from the current seq has nothing to catch up on
+    ws = FakeSocket()
+    first = json.dumps(
+        {"action": "subscribe", "symbols": ["AAA"], "since": {"AAA": seq}}
+    )
+    stream_symbols(ws, first, hub, 5, interval=0.05, heartbeat=0.3, max_frames=1)
+    assert [f["type"] for f in ws.sent] == ["subscribed", "heartbeat"]
+
+
+class FakeRedis:
+    """Just enough of redis-py for leases, keys and pub/sub in one process."""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.channels = {}
+        self.lock = threading.Lock()
+
+    def _alive(self, key):
+        if key in self.expires and self.expires[key] <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def set(self, key, value, nx=False, px=None):
+        with self.lock:
+            if nx and self._alive(key):
+                return None
+            self.data[key] = value.encode() if isinstance(value, str) else value
+            if px:
+                self.expires[key] = time.monotonic() + px / 1000
+            return True
+
+    def get(self, key):
+        with self.lock:
+            return self.data.get(key) if self._alive(key) else None
+
+    def pexpire(self, key, px):
+        with self.lock:
+            self.expires[key] = time.monotonic() + px / 1000
+
+    def delete(self, key):
+        with self.lock:
+            self.data.pop(key, None)
+
+    def publish(self, channel, data):
+        with self.lock:
+            listeners = list(self.channels.get(channel, ()))
+        for inbox in listeners:
+            inbox.put({"type": "message", "channel": channel.encode(), "data": data})
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub(self)
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.inbox = queue.Queue()
+
+    def subscribe(self, channel):
+        with self.redis.lock:
+            self.redis.channels.setdefault(channel, set()).add(self.inbox)
+
+    def unsubscribe(self, channel):
+        with self.redis.lock:
+            self.redis.channels.get(channel, set()).discard(self.inbox)
+
+    def get_message(self, timeout=0):
+        try:
+            return self.inbox.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+def test_backplane_elects_one_poller_across_workers(app, monkeypatch):
+    calls = []
+    price = [42.0]
+    monkeypatch.setattr(
+        "stockapp.realtime.get_realtime_data",
+        lambda symbol, provider=None: calls.append(symbol) or (price[0], 2.0),
+    )
+    monkeypatch.setattr("stockapp.realtime.load_indicator_set", lambda s: None)
+    app.config["PRICE_STREAM_INTERVAL"] = 0.05
+    redis = FakeRedis()
+    workers = [
+        PriceHub(app, backplane=RedisBackplane(redis, worker_id=f"w{i}"))
+        for i in range(3)
+    ]
+    subs = [hub.subscribe("AAA") for hub in workers for _ in range(2)]
+    for sub in subs:
+        tick = dict(sub.get(timeout=2))
+        assert tick.pop("seq") > 0
+        assert tick == {"symbol": "AAA", "price": 42.0, "eps": 2.0}
+    time.sleep(0.3)
+    polls = len(calls)
+    # one lease holder polls; the others only relay ticks from the channel
+    assert 2 <= polls <= 0.3 / 0.05 + 3
+    assert redis.get("ticks:lease:AAA") in (b"w0", b"w1", b"w2")
+
+    leader = redis.get("ticks:lease:AAA").decode()
+    i = [hub.backplane.worker_id for hub in workers].index(leader)
+    for sub in subs[2 * i : 2 * i + 2]:
+        sub.close()
+    remaining = subs[: 2 * i] + subs[2 * i + 2 :]
+    # unchanged quotes are not republished, so move the price
+    price[0] = 43.0
+    # another worker takes over once the leader has no subscribers left
+    deadline = time.monotonic() + 3
+    while redis.get("ticks:lease:AAA") in (None, leader.encode()):
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+    for sub in remaining:
+        tick = sub.get(timeout=2)
+        while tick["price"] != 43.0:
+            tick = sub.get(timeout=2)
+    for sub in remaining:
+        sub.close()
+
+
+def test_send_queue_policies_bound_slow_consumers():
+    metrics = StreamMetrics()
+    ticks = [{"symbol": s, "price": p} for p in (1, 2, 3) for s in ("A", "B")]
+
+    oldest = SendQueue(3, "drop_oldest", metrics)
+    for tick in ticks:
+        oldest.put(tick)
+    assert [oldest.get(timeout=0) for _ in range(3)] == ticks[3:]
+
+    latest = SendQueue(3, "coalesce", metrics)
+    for tick in ticks:
+        latest.put(tick)
+    assert [latest.get(timeout=0) for _ in range(2)] == ticks[4:]
+    with pytest.raises(queue.Empty):
+        latest.get(timeout=0)
+
+    strict = SendQueue(3, "disconnect", metrics)
+    for tick in ticks:
+        strict.put(tick)
+    with pytest.raises(SlowConsumerError):
+        strict.get(timeout=0)
+
+    stats = metrics.snapshot()
+    assert stats["dropped"] == 3 and stats["coalesced"] == 4
+    assert stats["disconnected"] == 1
+    assert stats["queues"] == 3 and stats["depth_high_water"] == 3
+    with pytest.raises(ValueError):
+        SendQueue(3, "block")
+
+
+def test_slow_sse_client_is_disconnected_without_stalling_others(
+    app, client, monkeypatch
+):
+    price = [1.0]
+
+    def fake_rt(symbol, provider=None):
+        price[0] += 1
+        return price[0], None
+
+    monkeypatch.setattr("stockapp.realtime.get_realtime_data", fake_rt)
+    monkeypatch.setattr("stockapp.realtime.load_indicator_set", lambda s: None)
+    app.config.update(
+        PRICE_STREAM_INTERVAL=0.01,
+        STREAM_QUEUE_SIZE=3,
+        STREAM_SLOW_CONSUMER_POLICY="disconnect",
+    )
+    with app.app_context():
+        hub = get_price_hub()
+    fast = hub.subscribe("AAA")
+    slow = client.get("/stream_price?symbol=AAA")
+    deadline = time.monotonic() + 2
+    seen = []
+    while len(seen) < 20:
+        assert time.monotonic() < deadline
+        seen.append(fast.get(timeout=1)["price"])
+    # the fast reader kept up; the SSE reader stalled after its first frame
+    # and the stream ended instead of buffering ticks
+    assert seen == sorted(seen)
+    assert b"".join(slow.response).count(b"data: ") <= 1
+    fast.close()
+    assert client.get("/api/realtime/stats").status_code == 302
+    client.post("/login", data={"username": "tester", "password": "password"})
+    assert client.get("/api/realtime/stats").status_code == 403
+    with app.app_context():
+        from stockapp.extensions import db
+        from stockapp.models import User
+
+        User.query.filter_by(username="tester").one().is_admin = True
+        db.session.commit()
+    stats = client.get("/api/realtime/stats").get_json()
+    assert stats["disconnected"] >= 1 and stats["subscribers"] == 0
+
+
+def test_sse_stream_subscribes_lazily_and_validates_symbol(client, app, monkeypatch):
+    monkeypatch.setattr(
+        "stockapp.realtime.get_realtime_data", lambda symbol, provider=None: (7.0, 1.0)
+    )
+    monkeypatch.setattr("stockapp.realtime.load_indicator_set", lambda s: None)
+    with app.app_context():
+        hub = get_price_hub()
+
+    assert client.get("/stream_price?symbol=NOT A TICKER").status_code == 400
+    assert client.get(f"/stream_price?symbol={'A' * 11}").status_code == 400
+    # a HEAD request never streams the body, so it must not subscribe
+    assert client.head("/stream_price?symbol=AAA").status_code == 200
+    assert hub.subscriber_counts() == {}
+    resp = client.get("/stream_price?symbol=AAA")
+    assert hub.subscriber_counts() == {"AAA": 1}
+    resp.close()
+    assert hub.subscriber_counts() == {}
+
+
+def test_resume_buffer_is_dropped_once_unwatched(app, monkeypatch):
+    monkeypatch.setattr(
+        "stockapp.realtime.get_realtime_data", lambda symbol, provider=None: (7.0, 1.0)
+    )
+    monkeypatch.setattr("stockapp.realtime.load_indicator_set", lambda s: None)
+    with app.app_context():
+        hub = get_price_hub()
+    with hub.subscribe("AAA") as sub:
+        seq = sub.get(timeout=2)["seq"]
+    # kept for a reconnecting client...
+    assert hub.state_at("AAA", seq) is not None
+
+    # ...until the grace period has passed
+    monkeypatch.setattr("stockapp.realtime.RESUME_GRACE", 0)
+    with hub.subscribe("BBB") as sub:
+        sub.get(timeout=2)
+    assert hub.state_at("AAA", seq) is None
+    assert hub.state_at("BBB", seq) is None
+
+
+def test_price_hub_reseeds_indicators_after_a_new_daily_bar(app, monkeypatch):
+    from stockapp.live_indicators import SMA, IndicatorSet
+
+    bars = {"date": "2024-01-01", "closes": [10.0, 20.0]}
+
+    def fake_load(symbol):
+        live = IndicatorSet({"sma2": SMA(2)}).seed(bars["closes"])
+        live.last_date = bars["date"]
+        return live
+
+    monkeypatch.setattr("stockapp.realtime.load_indicator_set", fake_load)
+    monkeypatch.setattr(
+        "stockapp.realtime.get_realtime_data", lambda s, provider=None: (30.0, None)
+    )
+    monkeypatch.setattr("stockapp.realtime.LIVE_REFRESH", 0)
+    app.config["PRICE_STREAM_INTERVAL"] = 0.05
+    with app.app_context():
+        hub = get_price_hub()
+    sub = hub.subscribe("AAA")
+    try:
+        assert sub.get(timeout=2)["indicators"] == {"sma2": 25.0}
+        bars.update(date="2024-01-02", closes=[20.0, 40.0])
+        deadline = time.time() + 2
+        tick = None
+        while time.time() < deadline:
+            tick = sub.get(timeout=2)
+            if tick["indicators"] != {"sma2": 25.0}:
+                break
+        assert tick["indicators"] == {"sma2": 35.0}
+    finally:
+        sub.close()